@@ -0,0 +1,342 @@
+import hashlib
+
+import sqlparse
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+from sqlparse import tokens as T
+from sqlparse.sql import Parenthesis, Where
+
+from benchmark.utils import analyze_table, drop_indexes, run_benchmarks
+from benchmark.workloads import create_index_sql, get_workload, workload_tables
+
+console = Console()
+
+# InnoDB refuses indexes with more key parts than this.
+MAX_KEY_PARTS = 16
+
+RANGE_OPERATORS = {"<", ">", "<=", ">=", "<>", "!="}
+RANGE_KEYWORDS = {"BETWEEN", "LIKE"}
+EQUALITY_KEYWORDS = {"IN", "IS"}
+AGGREGATES = {"MIN", "MAX", "SUM", "AVG", "COUNT"}
+
+
+def _is_subquery(token):
+    return isinstance(token, Parenthesis) and any(
+        t.ttype is T.DML and t.normalized == "SELECT" for t in token.tokens
+    )
+
+
+def _leaves(token, subqueries):
+    # Flattens a token tree but hands nested SELECTs to the caller as
+    # separate query blocks, so their predicates are not mixed into ours.
+    for child in token.tokens:
+        if _is_subquery(child):
+            subqueries.append(child)
+            yield child
+        elif child.is_group:
+            yield from _leaves(child, subqueries)
+        elif not child.is_whitespace:
+            yield child
+
+
+def _add(target, column):
+    if column not in target:
+        target.append(column)
+
+
+def _column_at(leaves, i, known_columns):
+    token = leaves[i]
+    if token.ttype not in (T.Name, T.Keyword) or not hasattr(token, "value"):
+        return None
+    name = token.value.strip("`")
+    following = leaves[i + 1] if i + 1 < len(leaves) else None
+    if following is not None and following.value in (".", "("):
+        return None
+    return name if name in known_columns else None
+
+
+def _scan_predicates(leaves, block, known_columns):
+    last_column = None
+    for i, token in enumerate(leaves):
+        column = _column_at(leaves, i, known_columns)
+        if column:
+            if last_column is not None and last_column[1] == "=":
+                # Right-hand side of "a = b": a join or correlation column.
+                _add(block["eq"], column)
+                last_column = None
+            else:
+                last_column = (column, None)
+            continue
+
+        operator = token.value.upper() if token.ttype is not None else ""
+        if last_column is None:
+            continue
+        if last_column[1] == "=":
+            last_column = None
+            continue
+        if token.ttype is T.Operator.Comparison:
+            if operator in RANGE_OPERATORS:
+                _add(block["range"], last_column[0])
+                last_column = None
+            else:
+                _add(block["eq"], last_column[0])
+                last_column = (last_column[0], "=")
+        elif operator in RANGE_KEYWORDS:
+            _add(block["range"], last_column[0])
+            last_column = None
+        elif operator in EQUALITY_KEYWORDS:
+            _add(block["eq"], last_column[0])
+            last_column = None
+
+
+def _scan_columns(leaves, target, known_columns, aggregates=None):
+    for i, token in enumerate(leaves):
+        column = _column_at(leaves, i, known_columns)
+        if column:
+            _add(target, column)
+        if aggregates is None or token.value.upper() not in AGGREGATES:
+            continue
+        # The aggregated column is the first one inside the parentheses,
+        # possibly qualified by a table alias.
+        for j in range(i + 2, len(leaves)):
+            if leaves[j].value == ")":
+                break
+            argument = _column_at(leaves, j, known_columns)
+            if argument:
+                _add(aggregates, argument)
+                break
+
+
+def analyze_block(statement, known_columns):
+    block = {
+        "eq": [],
+        "range": [],
+        "group_by": [],
+        "order_by": [],
+        "select": [],
+        "aggregates": [],
+    }
+    blocks = [block]
+    subqueries = []
+    clause = None
+
+    for token in statement.tokens:
+        if token.is_whitespace:
+            continue
+        if isinstance(token, Where):
+            leaves = list(_leaves(token, subqueries))
+            _scan_predicates(leaves, block, known_columns)
+            clause = None
+            continue
+        keyword = token.normalized if token.ttype in T.Keyword else None
+        if keyword in ("SELECT", "FROM", "GROUP BY", "ORDER BY", "LIMIT", "HAVING"):
+            clause = keyword
+            continue
+
+        leaves = list(_leaves(token, subqueries)) if token.is_group else [token]
+        if clause == "SELECT":
+            _scan_columns(leaves, block["select"], known_columns, block["aggregates"])
+        elif clause == "GROUP BY":
+            _scan_columns(leaves, block["group_by"], known_columns)
+        elif clause == "ORDER BY":
+            _scan_columns(leaves, block["order_by"], known_columns)
+        elif clause == "FROM":
+            # JOIN ... ON conditions live in the FROM clause.
+            _scan_predicates(leaves, block, known_columns)
+
+    for subquery in subqueries:
+        inner = sqlparse.sql.TokenList(subquery.tokens[1:-1])
+        blocks.extend(analyze_block(inner, known_columns))
+    return blocks
+
+
+def analyze_query(sql, known_columns):
+    statement = sqlparse.parse(sql)[0]
+    return analyze_block(statement, known_columns)
+
+
+def _trim(columns):
+    unique = []
+    for column in columns:
+        _add(unique, column)
+    return tuple(unique[:MAX_KEY_PARTS])
+
+
+def candidate_indexes(blocks):
+    candidates = []
+    for block in blocks:
+        eq, ranges = block["eq"], block["range"]
+        shapes = [
+            eq + ranges[:1],
+            eq + block["group_by"],
+            eq + block["order_by"],
+            eq + block["aggregates"],
+        ]
+        shapes.extend([column] for column in ranges)
+        referenced = (
+            block["select"]
+            + block["group_by"]
+            + block["order_by"]
+            + block["aggregates"]
+            + ranges[1:]
+        )
+        shapes.append(eq + ranges[:1] + referenced)
+        for shape in shapes:
+            columns = _trim(shape)
+            if columns and columns not in candidates:
+                candidates.append(columns)
+    return candidates
+
+
+def workload_candidates(workload, known_columns):
+    candidates = []
+    for query in get_workload(workload)["queries"]:
+        for columns in candidate_indexes(analyze_query(query["sql"], known_columns)):
+            if columns not in candidates:
+                candidates.append(columns)
+    return candidates
+
+
+def index_name(columns):
+    digest = hashlib.sha1(",".join(columns).encode()).hexdigest()[:10]
+    return f"adv_{digest}"
+
+
+def workload_table(workload):
+    # Candidates are single-table indexes, so the workload must read one table:
+    # test_data, or e.g. test_data_hot for the split layout.
+    tables = workload_tables(workload)
+    if len(tables) != 1:
+        raise ValueError(
+            f"Workload {workload!r} reads {tables}; the advisor needs "
+            "a single-table workload"
+        )
+    return tables[0]
+
+
+def table_columns(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            [table],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def index_size_bytes(name, table):
+    # Reads the persistent statistics. InnoDB computes them for an index as it
+    # is added, so only the existing indexes need the ANALYZE TABLE that
+    # evaluate_candidates runs once per round.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT stat_value * @@innodb_page_size
+            FROM mysql.innodb_index_stats
+            WHERE database_name = DATABASE() AND table_name = %s
+              AND index_name = %s AND stat_name = 'size'
+            """,
+            [table, name],
+        )
+        row = cursor.fetchone()
+        return int(row[0]) if row else 0
+
+
+def weighted_latency(workload, **bench_options):
+    results = run_benchmarks(workload=workload, show=False, **bench_options)
+    return sum(r["weight"] * r["p50_ms"] for r in results), results
+
+
+def evaluate_candidates(workload, candidates, table, **bench_options):
+    drop_indexes()
+    baseline_ms, _ = weighted_latency(workload, **bench_options)
+    analyze_table(table)
+    clustered_bytes = index_size_bytes("PRIMARY", table) or 1
+
+    evaluated = []
+    with connection.cursor() as cursor:
+        for columns in candidates:
+            index = {"name": index_name(columns), "table": table, "columns": columns}
+            console.print(f"[bold]Trying {index['name']} ({', '.join(columns)})[/bold]")
+            cursor.execute(create_index_sql(index))
+            try:
+                latency_ms, _ = weighted_latency(workload, **bench_options)
+                size = index_size_bytes(index["name"], table)
+            finally:
+                cursor.execute(f"DROP INDEX {index['name']} ON {table}")
+            evaluated.append(
+                {
+                    **index,
+                    "latency_ms": round(latency_ms, 3),
+                    "gain_ms": round(baseline_ms - latency_ms, 3),
+                    "size_bytes": size,
+                    # Bytes of secondary index written per byte of row written.
+                    "write_amplification": round(size / clustered_bytes, 4),
+                }
+            )
+    return baseline_ms, evaluated
+
+
+def apply_indexes(indexes):
+    with connection.cursor() as cursor:
+        for index in indexes:
+            cursor.execute(create_index_sql(index))
+
+
+def drop_advised(indexes):
+    with connection.cursor() as cursor:
+        for index in indexes:
+            cursor.execute(f"DROP INDEX {index['name']} ON {index['table']}")
+
+
+def recommend(baseline_ms, evaluated, budget_bytes, write_weight):
+    # Greedy knapsack on net benefit per byte: latency gained minus the
+    # write cost of maintaining the index, expressed in baseline milliseconds.
+    for candidate in evaluated:
+        candidate["score_ms"] = round(
+            candidate["gain_ms"]
+            - write_weight * candidate["write_amplification"] * baseline_ms,
+            3,
+        )
+
+    chosen, used = [], 0
+    ranked = sorted(
+        (c for c in evaluated if c["score_ms"] > 0),
+        key=lambda c: c["score_ms"] / max(c["size_bytes"], 1),
+        reverse=True,
+    )
+    for candidate in ranked:
+        if used + candidate["size_bytes"] > budget_bytes:
+            continue
+        # An index whose columns prefix an already chosen one adds nothing.
+        if any(
+            c["columns"][: len(candidate["columns"])] == candidate["columns"]
+            for c in chosen
+        ):
+            continue
+        chosen.append(candidate)
+        used += candidate["size_bytes"]
+    return chosen
+
+
+def print_candidates(evaluated, chosen):
+    chosen_names = {c["name"] for c in chosen}
+    table = Table(title="Index Candidates")
+    table.add_column("Index")
+    table.add_column("Columns")
+    for column in ["Latency (ms)", "Gain (ms)", "Size (MB)", "Write amp.", "Score"]:
+        table.add_column(column, justify="right")
+    table.add_column("Chosen")
+    for c in sorted(evaluated, key=lambda c: c["score_ms"], reverse=True):
+        table.add_row(
+            c["name"],
+            ", ".join(c["columns"]),
+            str(c["latency_ms"]),
+            str(c["gain_ms"]),
+            f"{c['size_bytes'] / 1024 / 1024:.1f}",
+            str(c["write_amplification"]),
+            str(c["score_ms"]),
+            "[green]yes[/green]" if c["name"] in chosen_names else "",
+        )
+    console.print(table)
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class BenchmarkConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'benchmark'
+
+    def ready(self):
+        from django.db.models.signals import post_save, pre_save
+
+        from benchmark.cache import bump_for_model
+        from benchmark.models import OrderAttributes, OrderFact, TestData
+        from benchmark.summary import after_save, before_save
+
+        for model in (TestData, OrderFact, OrderAttributes):
+            post_save.connect(bump_for_model, sender=model)
+        pre_save.connect(before_save, sender=TestData)
+        post_save.connect(after_save, sender=TestData)
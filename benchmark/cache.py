@@ -0,0 +1,341 @@
+import hashlib
+import random
+import time
+
+import sqlparse
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from rich.console import Console
+from rich.table import Table
+from sqlparse import tokens as T
+from sqlparse.sql import Identifier, IdentifierList, Parenthesis
+
+from benchmark.utils import summarize
+from benchmark.workloads import get_workload
+
+console = Console()
+
+VERSION_TABLE = "_result_cache_versions"
+
+stats = {"hits": 0, "shared_hits": 0, "misses": 0, "skipped": 0}
+
+_state = {"version_table": False}
+
+
+def local_tier():
+    return caches[getattr(settings, "RESULT_CACHE_ALIAS", "default")]
+
+
+def shared_tier():
+    alias = getattr(settings, "RESULT_CACHE_SHARED_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _version_store():
+    # Versions must be visible to every process that writes: generate_data
+    # workers, LOAD DATA and other app processes. The shared tier provides
+    # that; the in-process tier can't, so without a shared tier they live in
+    # a table in the database instead.
+    return shared_tier()
+
+
+def _version_table_exists(cursor):
+    if not _state["version_table"]:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            [VERSION_TABLE],
+        )
+        _state["version_table"] = cursor.fetchone()[0] > 0
+    return _state["version_table"]
+
+
+def _ensure_version_table(cursor):
+    # DDL commits implicitly on MySQL, so only the read path creates the
+    # table, at most once per process and never inside a writer's transaction.
+    if _version_table_exists(cursor):
+        return
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT UNSIGNED NOT NULL
+        )
+        """
+    )
+    _state["version_table"] = True
+
+
+def _db_table_version(table):
+    with connection.cursor() as cursor:
+        _ensure_version_table(cursor)
+        cursor.execute(
+            f"SELECT version FROM {VERSION_TABLE} WHERE table_name = %s", [table]
+        )
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute(
+            f"INSERT IGNORE INTO {VERSION_TABLE} (table_name, version) "
+            "VALUES (%s, %s)",
+            [table, time.time_ns()],
+        )
+        cursor.execute(
+            f"SELECT version FROM {VERSION_TABLE} WHERE table_name = %s", [table]
+        )
+        return cursor.fetchone()[0]
+
+
+def _db_bump(table):
+    # A single upsert, so concurrent bumps from different processes never
+    # collapse into one. Without the table no process has read a version yet,
+    # so there is nothing cached to invalidate.
+    with connection.cursor() as cursor:
+        if not _version_table_exists(cursor):
+            return
+        cursor.execute(
+            f"INSERT INTO {VERSION_TABLE} (table_name, version) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE version = version + 1",
+            [table, time.time_ns()],
+        )
+
+
+def table_version(table):
+    store = _version_store()
+    if store is None:
+        return _db_table_version(table)
+    key = f"rc:version:{table}"
+    version = store.get(key)
+    if version is None:
+        # A fresh counter starts from the clock rather than zero, so a counter
+        # evicted by the LRU can never come back at a value that old entries
+        # were stored under.
+        store.add(key, time.time_ns(), timeout=None)
+        version = store.get(key)
+    return version
+
+
+def _bump(table):
+    store = _version_store()
+    if store is None:
+        _db_bump(table)
+        return
+    key = f"rc:version:{table}"
+    try:
+        store.incr(key)
+    except ValueError:
+        store.set(key, time.time_ns(), timeout=None)
+
+
+def bump_table_version(table):
+    # Bumping once the write commits keeps the version row's lock out of the
+    # writer's transaction, and stops a concurrent reader from caching the old
+    # rows under the new version before the write is visible. Outside a
+    # transaction this runs immediately.
+    transaction.on_commit(lambda: _bump(table))
+
+
+def normalize_sql(sql):
+    formatted = sqlparse.format(
+        sql, strip_comments=True, keyword_case="upper", strip_whitespace=True
+    )
+    return " ".join(formatted.split()).rstrip("; ")
+
+
+def _is_table_keyword(token):
+    return token.ttype in T.Keyword and (
+        token.normalized == "FROM" or token.normalized.endswith("JOIN")
+    )
+
+
+def _collect_tables(token_list, tables):
+    # Walks the parse tree: every identifier right after FROM or a JOIN is a
+    # table (or a comma-separated list of them, as in "FROM a, b"), and
+    # parenthesized subqueries anywhere are searched the same way.
+    after_from = False
+    for token in token_list.tokens:
+        if token.is_whitespace or token.ttype in T.Comment:
+            continue
+        if after_from and isinstance(token, (Identifier, IdentifierList)):
+            identifiers = (
+                token.get_identifiers()
+                if isinstance(token, IdentifierList)
+                else [token]
+            )
+            for identifier in identifiers:
+                if not isinstance(identifier, Identifier):
+                    continue
+                if isinstance(identifier.token_first(), Parenthesis):
+                    _collect_tables(identifier.token_first(), tables)
+                else:
+                    tables.add(identifier.get_real_name().lower())
+            after_from = False
+            continue
+        after_from = _is_table_keyword(token)
+        if token.is_group:
+            _collect_tables(token, tables)
+
+
+def tables_in(sql):
+    tables = set()
+    for statement in sqlparse.parse(sql):
+        _collect_tables(statement, tables)
+    return sorted(tables)
+
+
+def cache_key(normalized, params, tables):
+    versions = ",".join(f"{table}={table_version(table)}" for table in tables)
+    digest = hashlib.sha1(
+        f"{normalized}|{params!r}|{versions}".encode("utf-8")
+    ).hexdigest()
+    return f"rc:{digest}"
+
+
+def cached_query(sql, params=None):
+    normalized = normalize_sql(sql)
+    key = cache_key(normalized, params, tables_in(normalized))
+    local, shared = local_tier(), shared_tier()
+
+    rows = local.get(key)
+    if rows is not None:
+        stats["hits"] += 1
+        return rows, "hit"
+
+    if shared is not None:
+        rows = shared.get(key)
+        if rows is not None:
+            stats["shared_hits"] += 1
+            local.set(key, rows)
+            return rows, "shared-hit"
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    stats["misses"] += 1
+
+    if len(repr(rows)) > getattr(settings, "RESULT_CACHE_MAX_ENTRY_BYTES", 1 << 20):
+        stats["skipped"] += 1
+        return rows, "miss"
+    local.set(key, rows)
+    if shared is not None:
+        shared.set(key, rows)
+    return rows, "miss"
+
+
+def reset_stats():
+    for key in stats:
+        stats[key] = 0
+
+
+def hit_ratio():
+    lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+    return (stats["hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+
+
+def local_tier_bytes():
+    # LocMemCache keeps pickled values in an internal dict; other backends
+    # don't expose their footprint.
+    entries = getattr(local_tier(), "_cache", None)
+    if entries is None:
+        return None
+    return sum(len(value) for value in list(entries.values()))
+
+
+def bump_for_model(sender, **kwargs):
+    bump_table_version(sender._meta.db_table)
+
+
+def _timed(sql):
+    start = time.perf_counter_ns()
+    _, outcome = cached_query(sql)
+    return (time.perf_counter_ns() - start) / 1_000_000, outcome
+
+
+def cache_benchmark(
+    workload="default",
+    iterations=5,
+    hit_iterations=100,
+    reads=500,
+    write_every=0,
+    write=None,
+    seed=0,
+):
+    queries = get_workload(workload)["queries"]
+    local_tier().clear()
+
+    latency = []
+    for q in queries:
+        tables = tables_in(normalize_sql(q["sql"]))
+        misses = []
+        for _ in range(iterations):
+            # A version bump stands in for a write, so every run is a miss.
+            for table in tables:
+                bump_table_version(table)
+            misses.append(_timed(q["sql"])[0])
+        hits = [_timed(q["sql"])[0] for _ in range(hit_iterations)]
+        latency.append(
+            {
+                "label": q["label"],
+                "miss": summarize(misses),
+                "hit": summarize(hits),
+            }
+        )
+
+    # Mixed phase: weighted reads with an optional write every N reads, which
+    # is what decides the hit ratio in practice.
+    local_tier().clear()
+    reset_stats()
+    rng = random.Random(seed)
+    writes = 0
+    for i, q in enumerate(
+        rng.choices(queries, weights=[q["weight"] for q in queries], k=reads), 1
+    ):
+        cached_query(q["sql"])
+        if write is not None and write_every and i % write_every == 0:
+            write()
+            writes += 1
+
+    entries = getattr(local_tier(), "_cache", None)
+    result = {
+        "workload": workload,
+        "latency": latency,
+        "reads": reads,
+        "writes": writes,
+        **stats,
+        "hit_ratio": round(hit_ratio(), 4),
+        "local_entries": len(entries) if entries is not None else None,
+        "local_bytes": local_tier_bytes(),
+    }
+
+    table = Table(title=f"Result cache latency ({workload})")
+    table.add_column("Query")
+    for column in ["Miss p50", "Miss p95", "Hit p50", "Hit p95"]:
+        table.add_column(f"{column} (ms)", justify="right")
+    table.add_column("Speedup", justify="right")
+    for r in latency:
+        hit_p50 = r["hit"]["p50_ms"]
+        speedup = r["miss"]["p50_ms"] / hit_p50 if hit_p50 else float("inf")
+        table.add_row(
+            r["label"],
+            str(r["miss"]["p50_ms"]),
+            str(r["miss"]["p95_ms"]),
+            str(hit_p50),
+            str(r["hit"]["p95_ms"]),
+            f"{speedup:.0f}x",
+        )
+    console.print(table)
+
+    table = Table(title=f"Mixed phase: {reads} reads, {writes} writes")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Hit ratio", f"{result['hit_ratio']:.1%}")
+    table.add_row("Local hits", str(stats["hits"]))
+    table.add_row("Shared hits", str(stats["shared_hits"]))
+    table.add_row("Misses", str(stats["misses"]))
+    table.add_row("Too large to cache", str(stats["skipped"]))
+    table.add_row("Local entries", str(result["local_entries"]))
+    if result["local_bytes"] is not None:
+        table.add_row("Local memory (KB)", f"{result['local_bytes'] / 1024:.1f}")
+    console.print(table)
+    return result
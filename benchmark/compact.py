@@ -0,0 +1,119 @@
+from django.db import connection
+from rich.console import Console
+
+from benchmark.cache import bump_table_version
+from benchmark.datagen import ip_is_packed
+from benchmark.online import pending_change, shadow_copy
+from benchmark.utils import (
+    PRICE_RATING_CACHE,
+    PRICE_RATING_CACHE_TYPE,
+    analyze_table,
+    has_column,
+)
+from benchmark.vectorized import INT_RANGES, VOCABULARIES
+
+console = Console()
+
+COMPACT_TABLE = "test_data"
+ENUM_COLUMNS = [
+    "status",
+    "platform",
+    "device_type",
+    "gift_wrap",
+    "browser",
+    "os",
+    "membership_level",
+]
+# Signed types only: the generated ranges all fit, and MySQL raises an error
+# rather than going negative when UNSIGNED columns are subtracted.
+INT_TYPES = [
+    ("TINYINT", 127),
+    ("SMALLINT", 32767),
+    ("MEDIUMINT", 8388607),
+    ("INT", 2147483647),
+]
+
+
+def enum_type(values):
+    # ENUMs sort by member position, so members are listed in collation order
+    # and ORDER BY, MIN() and MAX() behave as they did on the VARCHAR.
+    members = ", ".join(f"'{v}'" for v in sorted(values, key=str.lower))
+    return f"ENUM({members})"
+
+
+def int_type(low, high):
+    for name, limit in INT_TYPES:
+        if -limit - 1 <= low and high <= limit:
+            return name
+    return "BIGINT"
+
+
+def column_ranges(cursor, table=COMPACT_TABLE):
+    # Widths must hold the values already in the table as well as the ones
+    # the generator draws: appended or imported rows, or dates past the
+    # generated window, can fall outside INT_RANGES.
+    columns = list(INT_RANGES)
+    cursor.execute(
+        "SELECT "
+        + ", ".join(f"MIN(`{c}`), MAX(`{c}`)" for c in columns)
+        + f" FROM {table}"
+    )
+    row = cursor.fetchone()
+    ranges = {}
+    for i, column in enumerate(columns):
+        low, high = INT_RANGES[column]
+        actual_low, actual_high = row[2 * i], row[2 * i + 1]
+        if actual_low is not None:
+            low, high = min(low, actual_low), max(high, actual_high)
+        ranges[column] = (low, high)
+    return ranges
+
+
+def compact_clauses(has_cache=True, ranges=None):
+    clauses = [
+        f"MODIFY COLUMN `{column}` {enum_type(VOCABULARIES[column])} NOT NULL"
+        for column in ENUM_COLUMNS
+    ]
+    clauses += [
+        f"MODIFY COLUMN `{column}` {int_type(low, high)} NOT NULL"
+        for column, (low, high) in (ranges or INT_RANGES).items()
+    ]
+    clauses.append("MODIFY COLUMN ip_address INT UNSIGNED NOT NULL")
+    if has_cache:
+        clauses.append(
+            f"MODIFY COLUMN price_rating_cache {PRICE_RATING_CACHE_TYPE} "
+            "GENERATED ALWAYS AS (price * rating) STORED"
+        )
+    else:
+        clauses.append(PRICE_RATING_CACHE)
+    return ", ".join(clauses)
+
+
+def compact_schema(online=False, **online_options):
+    with connection.cursor() as cursor:
+        if ip_is_packed(cursor, COMPACT_TABLE):
+            console.print("[green]Schema is already compact.[/green]")
+            return False
+        # An interrupted copy resumes with the clauses it started with, even if
+        # the column ranges have moved since.
+        clauses = pending_change(COMPACT_TABLE) or compact_clauses(
+            has_column(cursor, COMPACT_TABLE, "price_rating_cache"),
+            column_ranges(cursor),
+        )
+
+    # No ALTER can turn dotted quads into numbers, so the change is always a
+    # shadow copy that applies INET_ATON() on the way in. test_data keeps its
+    # VARCHAR addresses until the atomic rename, so a failed run leaves it
+    # untouched. Without --online the copy runs in large, unthrottled chunks.
+    console.print("[bold]Copying test_data into the compact schema...[/bold]")
+    report = shadow_copy(
+        COMPACT_TABLE,
+        clauses,
+        transforms={"ip_address": "INET_ATON({})"},
+        **(online_options if online else {"chunk_size": 50000}),
+    )
+    console.print(f"[green]{report}[/green]")
+    analyze_table(COMPACT_TABLE)
+    bump_table_version(COMPACT_TABLE)
+    console.print("[green]Compact schema applied.[/green]")
+    return True
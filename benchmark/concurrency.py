@@ -0,0 +1,177 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections
+from rich.table import Table
+
+from benchmark.pooled_mysql.pool import DEFAULTS as POOL_DEFAULTS
+from benchmark.utils import console, summarize, time_query
+
+
+def parse_mix(spec, queries):
+    labels = [q["label"] for q in queries]
+    if not spec:
+        mix = {q["label"]: float(q["weight"]) for q in queries}
+    else:
+        mix = {}
+        for part in spec.split(","):
+            label, _, weight = part.rpartition("=")
+            label = label.strip()
+            if label not in labels:
+                raise ValueError(f"Unknown query in mix: {label!r}")
+            try:
+                mix[label] = float(weight)
+            except ValueError:
+                raise ValueError(f"Invalid weight for {label!r}: {weight!r}")
+    # random.choices fails in every worker on zero or negative weights, so
+    # they're rejected here instead.
+    bad = [label for label, weight in mix.items() if not weight > 0]
+    if bad:
+        raise ValueError(f"Mix weights must be positive: {bad}")
+    return mix
+
+
+def parse_levels(spec):
+    try:
+        levels = [int(level) for level in spec.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid concurrency levels: {spec!r}")
+    if not all(level > 0 for level in levels):
+        raise ValueError(f"Concurrency levels must be positive: {spec!r}")
+    return levels
+
+
+def check_pool_capacity(levels, alias="default"):
+    # Every load worker holds one connection for the whole run, so clients
+    # beyond the pool's max_size would queue for one (and time out), and the
+    # numbers would belong to a lower concurrency than the one reported.
+    options = connections[alias].settings_dict["OPTIONS"].get("pool")
+    if not options:
+        return
+    options = {**POOL_DEFAULTS, **(options if isinstance(options, dict) else {})}
+    if max(levels) > options["max_size"]:
+        raise ValueError(
+            f"{max(levels)} concurrent clients exceed the connection pool's "
+            f"max_size of {options['max_size']}; raise OPTIONS['pool']"
+            "['max_size'] or set OPTIONS['pool'] to False"
+        )
+
+
+def _error_message(e):
+    return f"{type(e).__name__}: {e}"
+
+
+def _worker(worker_id, queries, mix, deadline):
+    # Django connections are per thread, so every worker talks to MySQL over
+    # its own connection and can actually contend with the others.
+    rng = random.Random(worker_id)
+    by_label = {q["label"]: q for q in queries}
+    labels = list(mix)
+    weights = [mix[label] for label in labels]
+    samples = {label: [] for label in labels}
+    errors = {label: 0 for label in labels}
+    first_errors = {}
+
+    label = rng.choices(labels, weights)[0]
+    try:
+        cursor = connection.cursor()
+    except Exception as e:
+        # A worker that can't connect fails its first query rather than the
+        # whole run.
+        errors[label] += 1
+        first_errors[label] = _error_message(e)
+        connection.close()
+        return samples, errors, first_errors
+
+    try:
+        with cursor:
+            while time.monotonic() < deadline:
+                try:
+                    samples[label].append(time_query(cursor, by_label[label]["sql"]))
+                except Exception as e:
+                    errors[label] += 1
+                    first_errors.setdefault(label, _error_message(e))
+                label = rng.choices(labels, weights)[0]
+    finally:
+        connection.close()
+    return samples, errors, first_errors
+
+
+def run_load(queries, concurrency, duration, mix, title="Concurrent Load"):
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_worker, worker_id, queries, mix, deadline)
+            for worker_id in range(concurrency)
+        ]
+        outcomes = [future.result() for future in futures]
+    elapsed = time.monotonic() - started
+
+    per_query = []
+    for label in mix:
+        samples = [s for outcome in outcomes for s in outcome[0][label]]
+        errors = sum(outcome[1][label] for outcome in outcomes)
+        first_error = next(
+            (outcome[2][label] for outcome in outcomes if label in outcome[2]), None
+        )
+        per_query.append(
+            {
+                "label": label,
+                "count": len(samples),
+                "errors": errors,
+                "first_error": first_error,
+                "qps": round(len(samples) / elapsed, 2),
+                **summarize(samples),
+            }
+        )
+
+    result = {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "qps": round(sum(q["count"] for q in per_query) / elapsed, 2),
+        "queries": per_query,
+    }
+
+    table = Table(
+        title=f"{title} ({concurrency} clients, {result['qps']} QPS aggregate)"
+    )
+    table.add_column("Query")
+    for column in ["Count", "Errors", "QPS", "p50 (ms)", "p95 (ms)", "p99 (ms)"]:
+        table.add_column(column, justify="right")
+    for q in per_query:
+        table.add_row(
+            q["label"],
+            *(
+                str(q[key])
+                for key in ["count", "errors", "qps", "p50_ms", "p95_ms", "p99_ms"]
+            ),
+        )
+    console.print(table)
+    for q in per_query:
+        if q["errors"]:
+            console.print(
+                f"[red]Warning:[/red] {q['label']} failed {q['errors']} times "
+                f"— {q['first_error']}"
+            )
+    return result
+
+
+def run_load_levels(queries, levels, duration, mix, title="Concurrent Load"):
+    results = [run_load(queries, level, duration, mix, title) for level in levels]
+
+    table = Table(title=f"{title}: Scalability")
+    table.add_column("Clients", justify="right")
+    table.add_column("QPS", justify="right")
+    for q in queries:
+        table.add_column(f"{q['label']} p95 (ms)", justify="right")
+    for r in results:
+        p95 = {q["label"]: q["p95_ms"] for q in r["queries"]}
+        table.add_row(
+            str(r["concurrency"]),
+            str(r["qps"]),
+            *(str(p95.get(q["label"], "-")) for q in queries),
+        )
+    console.print(table)
+    return results
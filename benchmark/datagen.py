@@ -0,0 +1,370 @@
+import ipaddress
+import secrets
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from multiprocessing import get_context
+from tempfile import NamedTemporaryFile
+
+from django.db import connection, connections
+from faker import Faker
+
+from benchmark.cache import bump_table_version
+from benchmark.models import OrderAttributes, OrderFact, TestData
+from benchmark.summary import apply_delta, maintains, reset_summary
+
+COLUMNS = [field.column for field in TestData._meta.concrete_fields]
+IP_POSITION = COLUMNS.index("ip_address")
+
+# Each layout maps the generated wide row onto one or more tables. Parents come
+# first so the 1:1 cold table never references a missing order.
+LAYOUTS = {
+    "wide": [TestData],
+    "split": [OrderFact, OrderAttributes],
+}
+
+
+def layout_targets(layout):
+    targets = []
+    for model in LAYOUTS[layout]:
+        columns = [field.column for field in model._meta.concrete_fields]
+        positions = [COLUMNS.index(column) for column in columns]
+        targets.append((model, columns, positions))
+    return targets
+
+
+def reset_layout(layout):
+    # TRUNCATE drops and recreates the tablespace instead of deleting (and
+    # undo-logging) every row. InnoDB refuses to truncate a table that a
+    # foreign key references, even an empty child, hence the relaxed checks.
+    with connection.cursor() as cursor:
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        try:
+            for model in reversed(LAYOUTS[layout]):
+                cursor.execute(f"TRUNCATE TABLE {model._meta.db_table}")
+        finally:
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+    for model in LAYOUTS[layout]:
+        if maintains(model):
+            reset_summary()
+        bump_table_version(model._meta.db_table)
+
+
+def next_order_id(layout):
+    table = LAYOUTS[layout][0]._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(order_id), 0) FROM {table}")
+        return cursor.fetchone()[0] + 1
+
+
+def build_row(fake, order_id):
+    return dict(
+        order_id=order_id,
+        user_id=fake.random_int(1, 10000),
+        product_id=fake.random_int(1, 100000),
+        product_name=fake.word(),
+        category_id=fake.random_int(1, 50),
+        price=round(fake.random_number(digits=3) + fake.random.random(), 2),
+        quantity=fake.random_int(1, 10),
+        discount=round(fake.random.uniform(0, 0.3), 2),
+        tax=round(fake.random.uniform(0, 0.2), 2),
+        status=fake.random_element(["pending", "shipped", "delivered", "returned"]),
+        order_date=fake.random_int(1600000000, 1700000000),
+        delivery_date=fake.random_int(1600000000, 1700000000),
+        city=fake.city(),
+        state=fake.state(),
+        country_id=fake.random_int(1, 200),
+        email=fake.email(),
+        phone=fake.phone_number(),
+        customer_name=fake.name(),
+        shipping_address=fake.address().replace("\n", ", "),
+        billing_address=fake.address().replace("\n", ", "),
+        rating=round(fake.random.uniform(1, 5), 1),
+        is_returned=fake.boolean(chance_of_getting_true=10),
+        platform=fake.random_element(["web", "mobile", "app"]),
+        device_type=fake.random_element(["desktop", "tablet", "phone"]),
+        notes=fake.text(max_nb_chars=50),
+        coupon_code=fake.bothify(text="???###"),
+        shipping_method=fake.random_element(["standard", "express", "overnight"]),
+        payment_method=fake.random_element(["credit_card", "paypal", "cash"]),
+        invoice_number=fake.bothify(text="INV#######"),
+        gift_wrap=fake.random_element(["yes", "no"]),
+        warehouse_id=fake.random_int(1, 50),
+        batch_number=fake.random_int(1, 100),
+        supplier_id=fake.random_int(1, 5000),
+        shipment_id=fake.random_int(1, 10000),
+        carrier_id=fake.random_int(1, 300),
+        tracking_number=fake.bothify(text="TRK######"),
+        browser=fake.random_element(["Chrome", "Firefox", "Safari", "Edge"]),
+        os=fake.random_element(["Windows", "Linux", "macOS", "Android", "iOS"]),
+        os_version=fake.random_int(1, 15),
+        ip_address=fake.ipv4(),
+        user_agent=fake.user_agent(),
+        latitude=fake.latitude(),
+        longitude=fake.longitude(),
+        timezone=fake.timezone(),
+        campaign_name=fake.word(),
+        referral_source=fake.word(),
+        session_id=fake.uuid4()[:8],
+        page_views=fake.random_int(1, 5000),
+        clicks=fake.random_int(1, 1000),
+        impressions=fake.random_int(1, 10000),
+        is_new_customer=fake.boolean(chance_of_getting_true=30),
+        conversion_rate=round(fake.random.uniform(0, 1), 3),
+        avg_order_value=round(fake.random.uniform(10, 1000), 2),
+        lifetime_value=round(fake.random.uniform(100, 10000), 2),
+        loyalty_points=fake.random_int(0, 1000),
+        membership_level=fake.random_element(["Bronze", "Silver", "Gold", "Platinum"]),
+        age=fake.random_int(18, 75),
+        occupation=fake.job(),
+        education_level=fake.random_element(
+            ["High School", "Bachelors", "Masters", "PhD"]
+        ),
+        income_range=fake.random_element(["<20K", "20K-50K", "50K-100K", ">100K"]),
+        marital_status=fake.random_element(["Single", "Married", "Divorced"]),
+        preferred_language=fake.random_element(
+            ["English", "Spanish", "French", "Mandarin"]
+        ),
+        custom_field_1=fake.word(),
+        custom_field_2=fake.word(),
+        custom_field_3=fake.word(),
+        custom_field_4=fake.word(),
+    )
+
+
+def shard_ranges(total_rows, shard_size, first_id=1):
+    # Shards depend only on the row count and shard size, never on the number
+    # of workers, so a given seed produces the same rows however it is run.
+    last_id = first_id + total_rows
+    for start in range(first_id, last_id, shard_size):
+        yield start, min(start + shard_size, last_id)
+
+
+def shard_seed(seed, start):
+    if seed is None:
+        return None
+    return seed * 10_000_000_000 + start
+
+
+def faker_rows(start, end, seed):
+    # Forked workers inherit the parent's random state, so an unseeded shard
+    # draws fresh entropy instead of repeating every other worker's rows.
+    fake = Faker()
+    if seed is None:
+        fake.seed_instance(secrets.randbits(64))
+    else:
+        fake.seed_instance(shard_seed(seed, start))
+    for order_id in range(start, end):
+        row = build_row(fake, order_id)
+        yield tuple(row[column] for column in COLUMNS)
+
+
+def numpy_rows(start, end, seed):
+    from benchmark.vectorized import generate_rows
+
+    return generate_rows(start, end, seed)
+
+
+ENGINES = {
+    "faker": faker_rows,
+    "numpy": numpy_rows,
+}
+
+
+def ip_is_packed(cursor, table="test_data"):
+    # The compact schema stores IPv4 addresses as INT UNSIGNED.
+    cursor.execute(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s "
+        "AND column_name = 'ip_address'",
+        [table],
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] in ("int", "bigint")
+
+
+def layout_packs_ip(layout):
+    # Only the wide table is ever compacted.
+    if layout != "wide":
+        return False
+    with connection.cursor() as cursor:
+        return ip_is_packed(cursor)
+
+
+def pack_ip(address):
+    return int(ipaddress.IPv4Address(address))
+
+
+def pack_ips(rows):
+    for row in rows:
+        packed = pack_ip(row[IP_POSITION])
+        yield row[:IP_POSITION] + (packed,) + row[IP_POSITION + 1 :]
+
+
+def load_orm(rows, batch_size, targets):
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        for model, columns, positions in targets:
+            model.objects.bulk_create(
+                [
+                    model(**{c: row[p] for c, p in zip(columns, positions)})
+                    for row in batch
+                ]
+            )
+
+
+def _tsv_value(value):
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "1"
+    if value is False:
+        return "0"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+    )
+
+
+def load_infile(rows, chunk_rows, targets):
+    # Rows are streamed straight into one bounded TSV chunk per target table,
+    # so memory stays flat no matter how many rows the shard holds.
+    with connection.cursor() as cursor:
+        while True:
+            with ExitStack() as stack:
+                chunks = [
+                    stack.enter_context(
+                        NamedTemporaryFile(
+                            "w", suffix=".tsv", encoding="utf-8", newline="\n"
+                        )
+                    )
+                    for _ in targets
+                ]
+                written = 0
+                first_id = last_id = None
+                for row in islice(rows, chunk_rows):
+                    for chunk, (_, _, positions) in zip(chunks, targets):
+                        chunk.write("\t".join(_tsv_value(row[p]) for p in positions))
+                        chunk.write("\n")
+                    written += 1
+                    first_id = row[0] if first_id is None else first_id
+                    last_id = row[0]
+                if not written:
+                    break
+                for chunk, (model, columns, _) in zip(chunks, targets):
+                    chunk.flush()
+                    column_list = ", ".join(f"`{column}`" for column in columns)
+                    cursor.execute(
+                        f"LOAD DATA LOCAL INFILE %s INTO TABLE {model._meta.db_table} "
+                        f"CHARACTER SET utf8mb4 ({column_list})",
+                        [chunk.name],
+                    )
+                    # LOAD DATA never reaches the ORM, so cached results for
+                    # the table are invalidated here.
+                    if maintains(model):
+                        apply_delta(
+                            model.objects.filter(
+                                order_id__gte=first_id, order_id__lte=last_id
+                            )
+                        )
+                    bump_table_version(model._meta.db_table)
+
+
+@contextmanager
+def relaxed_checks(enabled=True):
+    if not enabled:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+
+
+def generate_shard(
+    start,
+    end,
+    seed,
+    batch_size,
+    engine="faker",
+    loader="orm",
+    relax_checks=False,
+    layout="wide",
+    pack_ip=False,
+    distribution=None,
+):
+    rows = ENGINES[engine](start, end, seed)
+    if distribution is not None:
+        from benchmark.distributions import apply_distribution
+
+        rows = apply_distribution(rows, start, seed, distribution)
+    if pack_ip:
+        rows = pack_ips(rows)
+    targets = layout_targets(layout)
+    with relaxed_checks(relax_checks):
+        if loader == "infile":
+            load_infile(rows, batch_size, targets)
+        else:
+            load_orm(rows, batch_size, targets)
+
+    connections.close_all()
+    return end - start
+
+
+def copy_wide_to_split(chunk_size=50000):
+    # Fills the split layout from the existing wide table, so both layouts are
+    # benchmarked over exactly the same rows.
+    targets = layout_targets("split")
+    with connection.cursor() as cursor:
+        # The split tables keep dotted IPs even when test_data is compact.
+        packed = ip_is_packed(cursor, TestData._meta.db_table)
+        for model, _, _ in reversed(targets):
+            cursor.execute(f"DELETE FROM {model._meta.db_table}")
+        cursor.execute(
+            f"SELECT COALESCE(MAX(order_id), 0) FROM {TestData._meta.db_table}"
+        )
+        max_id = cursor.fetchone()[0]
+        for start in range(0, max_id, chunk_size):
+            for model, columns, _ in targets:
+                column_list = ", ".join(f"`{column}`" for column in columns)
+                select_list = ", ".join(
+                    "INET_NTOA(ip_address)"
+                    if column == "ip_address" and packed
+                    else f"`{column}`"
+                    for column in columns
+                )
+                cursor.execute(
+                    f"INSERT INTO {model._meta.db_table} ({column_list}) "
+                    f"SELECT {select_list} FROM {TestData._meta.db_table} "
+                    "WHERE order_id > %s AND order_id <= %s",
+                    [start, start + chunk_size],
+                )
+                bump_table_version(model._meta.db_table)
+            yield min(start + chunk_size, max_id), max_id
+
+
+def run_shards(shards, workers, **shard_options):
+    if workers <= 1:
+        for start, end in shards:
+            yield generate_shard(start, end, **shard_options)
+        return
+
+    # Forked workers must not share the parent's MySQL socket; closing it here
+    # makes every worker open its own connection on first use.
+    connections.close_all()
+    with get_context("fork").Pool(processes=workers) as pool:
+        yield from pool.imap_unordered(
+            _generate_shard_star,
+            [(start, end, shard_options) for start, end in shards],
+        )
+
+
+def _generate_shard_star(args):
+    start, end, shard_options = args
+    return generate_shard(start, end, **shard_options)
@@ -0,0 +1,111 @@
+from itertools import islice
+
+import numpy as np
+
+from benchmark.datagen import COLUMNS
+from benchmark.vectorized import BATCH_SIZE, INT_RANGES, text_pools
+
+# Columns that get Zipfian hot keys, and the pool each one draws from. Text
+# pools are generated once per seed, so every shard agrees on the hot values.
+HOT_KEYS = {
+    "city": "city",
+    "product_name": "word",
+    "user_id": None,
+}
+# Optional attributes that may be NULL (see migration 0004).
+NULLABLE_COLUMNS = ["coupon_code", "referral_source"]
+
+
+def make_distribution(skew=0.0, hot_keys=None, correlate=False, null_rate=0.0):
+    unknown = sorted(set(hot_keys or []) - set(HOT_KEYS))
+    if unknown:
+        raise ValueError(
+            f"Unknown hot-key columns {unknown}; choose from {sorted(HOT_KEYS)}"
+        )
+    if skew < 0:
+        raise ValueError("The skew exponent must be zero or positive")
+    if not 0 <= null_rate <= 1:
+        raise ValueError("The NULL rate must be between 0 and 1")
+    # None means the generators' plain uniform, independent columns.
+    if not skew and not correlate and not null_rate:
+        return None
+    return {
+        "skew": skew,
+        "hot_keys": list(hot_keys or HOT_KEYS),
+        "correlate": correlate,
+        "null_rate": null_rate,
+    }
+
+
+def zipf_probabilities(n, exponent):
+    # Bounded Zipf: the value of rank k is drawn with probability ∝ 1 / k^s.
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def hot_key_values(column, seed):
+    pool = HOT_KEYS[column]
+    if pool is None:
+        low, high = INT_RANGES[column]
+        return np.arange(low, high + 1)
+    # Pool order is random, so the hottest values are arbitrary ones rather
+    # than the alphabetically first.
+    return np.array(list(dict.fromkeys(text_pools(seed)[pool])), dtype=object)
+
+
+def correlate_columns(rng, columns):
+    # Expensive orders get better ratings and are delivered more often, and
+    # poorly rated ones are returned more: the Q1 filter on price, rating and
+    # status is then far from the product of its selectivities.
+    price = np.array(columns[COLUMNS.index("price")], dtype=float)
+    quantile = np.clip(price / 1000, 0, 1)
+    noise = rng.normal(0, 0.6, len(price))
+    rating = np.clip(np.round(1 + 4 * quantile + noise, 1), 1, 5)
+    returned = np.where(rating < 2.5, 0.3, 0.05)
+    delivered = (1 - returned) * (0.4 + 0.4 * quantile)
+    pending = (1 - returned - delivered) / 2
+    draw = rng.random(len(price))
+    status = np.select(
+        [
+            draw < returned,
+            draw < returned + delivered,
+            draw < returned + delivered + pending,
+        ],
+        ["returned", "delivered", "pending"],
+        "shipped",
+    )
+    columns[COLUMNS.index("rating")] = rating.tolist()
+    columns[COLUMNS.index("status")] = status.tolist()
+
+
+def apply_distribution(rows, start, seed, distribution, batch_size=BATCH_SIZE):
+    # Rewrites generated rows in column-at-a-time batches, after either engine.
+    # The stream is seeded per shard like the engines, so output stays
+    # deterministic for a seed.
+    rng = np.random.default_rng(None if seed is None else [seed, start, 1])
+    hot = {}
+    if distribution["skew"]:
+        for column in distribution["hot_keys"]:
+            values = hot_key_values(column, seed)
+            probabilities = zipf_probabilities(len(values), distribution["skew"])
+            hot[column] = (values, probabilities)
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        columns = [list(column) for column in zip(*batch)]
+        for column, (values, probabilities) in hot.items():
+            picks = rng.choice(len(values), size=len(batch), p=probabilities)
+            columns[COLUMNS.index(column)] = values[picks].tolist()
+        if distribution["correlate"]:
+            correlate_columns(rng, columns)
+        if distribution["null_rate"]:
+            for column in NULLABLE_COLUMNS:
+                position = COLUMNS.index(column)
+                nulls = rng.random(len(batch)) < distribution["null_rate"]
+                columns[position] = [
+                    None if null else value
+                    for null, value in zip(nulls.tolist(), columns[position])
+                ]
+        yield from zip(*columns)
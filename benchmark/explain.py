@@ -0,0 +1,208 @@
+import json
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Join access types from best to worst, as documented for EXPLAIN output.
+ACCESS_RANK = [
+    "system",
+    "const",
+    "eq_ref",
+    "ref",
+    "fulltext",
+    "ref_or_null",
+    "index_merge",
+    "unique_subquery",
+    "index_subquery",
+    "range",
+    "index",
+    "ALL",
+]
+
+# Relative growth in cost or rows examined that counts as a regression.
+REGRESSION_TOLERANCE = 0.10
+
+
+def _statement(sql):
+    return sql.strip().rstrip(";")
+
+
+def explain_json(cursor, sql):
+    cursor.execute(f"EXPLAIN FORMAT=JSON {_statement(sql)}")
+    return json.loads(cursor.fetchone()[0])
+
+
+def explain_analyze(cursor, sql):
+    cursor.execute(f"EXPLAIN ANALYZE {_statement(sql)}")
+    return "\n".join(row[0] for row in cursor.fetchall())
+
+
+def optimizer_trace(cursor, sql):
+    cursor.execute('SET SESSION optimizer_trace = "enabled=on"')
+    cursor.execute("SET SESSION optimizer_trace_max_mem_size = 16777216")
+    try:
+        cursor.execute(sql)
+        cursor.fetchall()
+        cursor.execute("SELECT trace FROM information_schema.optimizer_trace")
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+    finally:
+        cursor.execute('SET SESSION optimizer_trace = "enabled=off"')
+
+
+def _walk(node, summary):
+    if isinstance(node, list):
+        for item in node:
+            _walk(item, summary)
+        return
+    if not isinstance(node, dict):
+        return
+
+    if node.get("using_filesort"):
+        summary["filesort"] = True
+    if node.get("using_temporary_table"):
+        summary["temporary"] = True
+
+    table = node.get("table")
+    if isinstance(table, dict) and "table_name" in table:
+        summary["tables"].append(
+            {
+                "table": table["table_name"],
+                "access_type": table.get("access_type"),
+                "key": table.get("key"),
+                "possible_keys": table.get("possible_keys", []),
+                "rows_examined": table.get("rows_examined_per_scan", 0),
+                "filtered": float(table.get("filtered", 100)),
+                "partitions": table.get("partitions"),
+            }
+        )
+
+    for value in node.values():
+        _walk(value, summary)
+
+
+def summarize_plan(plan):
+    summary = {"cost": None, "filesort": False, "temporary": False, "tables": []}
+    cost_info = plan.get("query_block", {}).get("cost_info", {})
+    if "query_cost" in cost_info:
+        summary["cost"] = float(cost_info["query_cost"])
+    _walk(plan, summary)
+    summary["rows_examined"] = sum(t["rows_examined"] for t in summary["tables"])
+    summary["indexes"] = sorted({t["key"] for t in summary["tables"] if t["key"]})
+    return summary
+
+
+def capture_plan(cursor, sql, analyze=False, trace=False):
+    plan = explain_json(cursor, sql)
+    captured = {"summary": summarize_plan(plan), "json": plan}
+    if analyze:
+        captured["analyze"] = explain_analyze(cursor, sql)
+    if trace:
+        captured["optimizer_trace"] = optimizer_trace(cursor, sql)
+    return captured
+
+
+def _rank(access_type):
+    if access_type in ACCESS_RANK:
+        return ACCESS_RANK.index(access_type)
+    return len(ACCESS_RANK)
+
+
+def _grew(before, after):
+    if before is None or after is None:
+        return False
+    return after > before * (1 + REGRESSION_TOLERANCE)
+
+
+def plan_regressions(before, after):
+    reasons = []
+    if _grew(before["cost"], after["cost"]):
+        reasons.append(f"cost {before['cost']} -> {after['cost']}")
+    if _grew(before["rows_examined"], after["rows_examined"]):
+        reasons.append(
+            f"rows examined {before['rows_examined']} -> {after['rows_examined']}"
+        )
+    if after["filesort"] and not before["filesort"]:
+        reasons.append("filesort introduced")
+    if after["temporary"] and not before["temporary"]:
+        reasons.append("temporary table introduced")
+
+    before_tables = {t["table"]: t for t in before["tables"]}
+    for t in after["tables"]:
+        b = before_tables.get(t["table"])
+        if b is None:
+            continue
+        if _rank(t["access_type"]) > _rank(b["access_type"]):
+            reasons.append(
+                f"{t['table']}: access {b['access_type']} -> {t['access_type']}"
+            )
+        if b["key"] and not t["key"]:
+            reasons.append(f"{t['table']}: index {b['key']} no longer used")
+    return reasons
+
+
+def _describe(summary):
+    tables = ", ".join(
+        f"{t['table']}:{t['access_type']}/{t['key'] or '-'}" for t in summary["tables"]
+    )
+    return tables, summary["rows_examined"], summary["cost"]
+
+
+def diff_plans(before_results, after_results, names=("Before", "After")):
+    table = Table(title=f"Query Plans: {names[0]} vs {names[1]}")
+    table.add_column("Query")
+    table.add_column(f"Access/Key ({names[0].lower()})")
+    table.add_column(f"Access/Key ({names[1].lower()})")
+    table.add_column("Rows examined", justify="right")
+    table.add_column("Filesort")
+    table.add_column("Temp table")
+    table.add_column("Cost", justify="right")
+    table.add_column("Regression")
+
+    after_by_label = {r["label"]: r for r in after_results}
+    regressions = {}
+    for b in before_results:
+        a = after_by_label.get(b["label"])
+        if a is None or "plan" not in b or "plan" not in a:
+            continue
+        before, after = b["plan"]["summary"], a["plan"]["summary"]
+        b_tables, b_rows, b_cost = _describe(before)
+        a_tables, a_rows, a_cost = _describe(after)
+        reasons = plan_regressions(before, after)
+        if reasons:
+            regressions[b["label"]] = reasons
+        table.add_row(
+            b["label"],
+            b_tables,
+            a_tables,
+            f"{b_rows} -> {a_rows}",
+            f"{before['filesort']} -> {after['filesort']}",
+            f"{before['temporary']} -> {after['temporary']}",
+            f"{b_cost} -> {a_cost}",
+            "[red]" + "; ".join(reasons) + "[/red]" if reasons else "[green]no[/green]",
+        )
+
+    console.print(table)
+    return regressions
+
+
+def report_index_usage(results, index_names):
+    used = set()
+    for r in results:
+        if "plan" in r:
+            used.update(r["plan"]["summary"]["indexes"])
+
+    table = Table(title="Index Usage")
+    table.add_column("Index")
+    table.add_column("Used by")
+    for name in index_names:
+        users = [
+            r["label"]
+            for r in results
+            if "plan" in r and name in r["plan"]["summary"]["indexes"]
+        ]
+        table.add_row(name, ", ".join(users) if users else "[red]unused[/red]")
+    console.print(table)
+    return sorted(set(index_names) - used)
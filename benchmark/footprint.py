@@ -0,0 +1,93 @@
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def buffer_pool_counters(cursor):
+    cursor.execute(
+        "SHOW GLOBAL STATUS WHERE variable_name IN "
+        "('Innodb_buffer_pool_read_requests', 'Innodb_buffer_pool_reads')"
+    )
+    return {name: int(value) for name, value in cursor.fetchall()}
+
+
+def table_footprint(tables):
+    with connection.cursor() as cursor:
+        # information_schema caches table statistics for a day by default.
+        cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        cursor.execute("SELECT @@innodb_page_size")
+        page_size = cursor.fetchone()[0]
+        placeholders = ", ".join(["%s"] * len(tables))
+        cursor.execute(
+            f"""
+            SELECT table_name, table_rows, avg_row_length, data_length,
+                   index_length, data_free
+            FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name IN ({placeholders})
+            """,
+            list(tables),
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "table": name,
+            "rows": table_rows,
+            "avg_row_bytes": avg_row_length,
+            "data_bytes": data_length,
+            "index_bytes": index_length,
+            "free_bytes": data_free,
+            "pages": (data_length + index_length) // page_size,
+        }
+        for (
+            name,
+            table_rows,
+            avg_row_length,
+            data_length,
+            index_length,
+            data_free,
+        ) in rows
+    ]
+
+
+def cached_pages(tables):
+    # Scanning INNODB_BUFFER_PAGE walks the whole buffer pool and is expensive
+    # on large servers, so it's only done on request.
+    with connection.cursor() as cursor:
+        placeholders = ", ".join(["%s"] * len(tables))
+        cursor.execute(
+            f"""
+            SELECT SUBSTRING_INDEX(TRIM(BOTH '`' FROM table_name), '`.`', -1) AS t,
+                   COUNT(*)
+            FROM information_schema.innodb_buffer_page
+            WHERE table_name IS NOT NULL
+            GROUP BY t
+            HAVING t IN ({placeholders})
+            """,
+            list(tables),
+        )
+        return dict(cursor.fetchall())
+
+
+def print_footprint(footprint, cached=None, title="Table Footprint"):
+    table = Table(title=title)
+    table.add_column("Table")
+    for column in ["Rows", "Avg row (B)", "Data (MB)", "Index (MB)", "Pages"]:
+        table.add_column(column, justify="right")
+    if cached is not None:
+        table.add_column("Cached pages", justify="right")
+    for f in footprint:
+        row = [
+            f["table"],
+            str(f["rows"]),
+            str(f["avg_row_bytes"]),
+            f"{f['data_bytes'] / 1024 / 1024:.1f}",
+            f"{f['index_bytes'] / 1024 / 1024:.1f}",
+            str(f["pages"]),
+        ]
+        if cached is not None:
+            row.append(str(cached.get(f["table"], 0)))
+        table.add_row(*row)
+    console.print(table)
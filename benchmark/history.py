@@ -0,0 +1,322 @@
+import json
+import os
+import subprocess
+import uuid
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+
+from benchmark.datagen import ip_is_packed
+from benchmark.utils import has_column, secondary_indexes
+from benchmark.workloads import workload_tables
+
+console = Console()
+
+METRICS = ["min_ms", "p50_ms", "p95_ms", "p99_ms", "mean_ms"]
+PALETTE = [
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+]
+
+
+def history_path():
+    return getattr(settings, "BENCHMARK_HISTORY", "benchmark_history.jsonl")
+
+
+def chart_dir():
+    return getattr(settings, "BENCHMARK_CHART_DIR", "benchmark_charts")
+
+
+def git_commit():
+    # Uncommitted changes to tracked files are flagged, since the commit alone
+    # doesn't describe the code that ran.
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def server_context(table="test_data"):
+    # The row count is InnoDB's estimate: an exact COUNT(*) would scan the
+    # whole clustered index before every recorded run.
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT VERSION()")
+        version = cursor.fetchone()[0]
+        cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        cursor.execute(
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            [table],
+        )
+        row = cursor.fetchone()
+        schema = {
+            "cache_column": has_column(cursor, table, "price_rating_cache"),
+            "compact": ip_is_packed(cursor, table),
+        }
+    schema["indexes"] = sorted(name for name, _ in secondary_indexes(table))
+    return {
+        "mysql_version": version,
+        "table": table,
+        "rows": row[0] if row else None,
+        "schema": schema,
+    }
+
+
+def record_run(stage, workload, index_set, results, path=None, **extra):
+    # Query plans can be large and are already in the --json output, so the
+    # history keeps timings only.
+    record = {
+        "id": uuid.uuid4().hex[:8],
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "stage": stage,
+        "workload": workload,
+        "index_set": index_set,
+        # Workloads such as split or summary don't read test_data.
+        **server_context(workload_tables(workload)[0]),
+        **extra,
+        "results": [
+            {key: value for key, value in r.items() if key != "plan"}
+            for r in results
+        ],
+    }
+    with open(path or history_path(), "a") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+
+def load_history(path=None):
+    path = path or history_path()
+    if not os.path.exists(path):
+        return []
+    runs = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                runs.append(json.loads(line))
+            except ValueError as e:
+                console.print(
+                    f"[red]Warning:[/red] Skipping line {number} of {path} — {e}"
+                )
+    return runs
+
+
+def run_key(run):
+    cache = run["results"][0]["cache"] if run["results"] else None
+    return run["workload"], run["stage"], run["index_set"], cache
+
+
+def find_run(runs, ref=None, like=None):
+    # ref matches a run id or commit prefix; the newest match wins. With like,
+    # only runs comparable with it are considered, and without a ref only the
+    # ones recorded before it.
+    if like is not None:
+        candidates = runs[: runs.index(like)] if ref is None else runs
+        runs = [r for r in candidates if r is not like and run_key(r) == run_key(like)]
+    for run in reversed(runs):
+        if ref is None or run["id"].startswith(ref):
+            return run
+        if (run["commit"] or "").startswith(ref):
+            return run
+    return None
+
+
+def compare_runs(baseline, candidate, metric="p50_ms", threshold=0.1):
+    base_by_label = {r["label"]: r for r in baseline["results"]}
+    rows = []
+    for r in candidate["results"]:
+        b = base_by_label.get(r["label"])
+        if b is None:
+            continue
+        change = (r[metric] - b[metric]) / b[metric] if b[metric] else 0.0
+        rows.append(
+            {
+                "label": r["label"],
+                "baseline": b[metric],
+                "candidate": r[metric],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def describe(run):
+    rows = f"{run['rows']:,}" if run.get("rows") is not None else "?"
+    return f"{run['id']} ({run['commit'] or 'no commit'}, {rows} rows)"
+
+
+def _differs(key, old, new):
+    # Row counts are estimates that wander by a few percent between ANALYZEs.
+    if key == "rows" and old and new:
+        return abs(new - old) / old > 0.05
+    return old != new
+
+
+def print_comparison(baseline, candidate, rows, metric, threshold):
+    table = Table(
+        title=f"{describe(baseline)} vs {describe(candidate)} "
+        f"({metric}, threshold {threshold:.0%})"
+    )
+    table.add_column("Query")
+    table.add_column("Baseline (ms)", justify="right")
+    table.add_column("Candidate (ms)", justify="right")
+    table.add_column("Change", justify="right")
+    for r in rows:
+        change = f"{r['change']:+.1%}"
+        table.add_row(
+            r["label"],
+            str(r["baseline"]),
+            str(r["candidate"]),
+            f"[red]{change} regression[/red]" if r["regression"] else change,
+        )
+    console.print(table)
+    for key in ["mysql_version", "table", "rows", "schema"]:
+        if _differs(key, baseline.get(key), candidate.get(key)):
+            console.print(
+                f"[yellow]Note:[/yellow] {key} differs: "
+                f"{baseline.get(key)} -> {candidate.get(key)}"
+            )
+
+
+def print_history(runs):
+    table = Table(title="Benchmark history")
+    for column in ["Run", "Recorded", "Commit", "Stage", "Workload", "Index set"]:
+        table.add_column(column)
+    table.add_column("Rows (est.)", justify="right")
+    table.add_column("MySQL")
+    for run in runs:
+        table.add_row(
+            run["id"],
+            run["recorded_at"],
+            run["commit"] or "-",
+            run["stage"],
+            run["workload"],
+            run["index_set"],
+            f"{run['rows']:,}" if run.get("rows") is not None else "-",
+            run["mysql_version"],
+        )
+    console.print(table)
+
+
+def trend_svg(title, x_labels, series):
+    # A plain SVG line chart, so charts need no plotting dependency and render
+    # anywhere, including the GitHub README.
+    width, height = 860, 420
+    left, right, top, bottom = 70, 230, 40, 90
+    plot_w, plot_h = width - left - right, height - top - bottom
+    values = [v for points in series.values() for v in points if v is not None]
+    peak = max(values, default=0) * 1.1 or 1
+
+    def x(i):
+        if len(x_labels) == 1:
+            return left + plot_w / 2
+        return left + plot_w * i / (len(x_labels) - 1)
+
+    def y(value):
+        return top + plot_h * (1 - value / peak)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        f'<text x="{left}" y="24" font-size="15">{escape(title)}</text>',
+    ]
+    for step in range(6):
+        value = peak * step / 5
+        parts.append(
+            f'<line x1="{left}" x2="{left + plot_w}" y1="{y(value):.1f}" '
+            f'y2="{y(value):.1f}" stroke="#ddd"/>'
+            f'<text x="{left - 8}" y="{y(value) + 4:.1f}" '
+            f'text-anchor="end">{value:.1f}</text>'
+        )
+    for i, label in enumerate(x_labels):
+        parts.append(
+            f'<text transform="translate({x(i):.1f},{top + plot_h + 14}) '
+            f'rotate(35)">{escape(label)}</text>'
+        )
+    for n, (label, points) in enumerate(series.items()):
+        color = PALETTE[n % len(PALETTE)]
+        coords = [(x(i), y(v)) for i, v in enumerate(points) if v is not None]
+        parts.append(
+            '<polyline fill="none" stroke-width="2" '
+            f'stroke="{color}" points="'
+            + " ".join(f"{px:.1f},{py:.1f}" for px, py in coords)
+            + '"/>'
+        )
+        parts.extend(
+            f'<circle cx="{px:.1f}" cy="{py:.1f}" r="3" fill="{color}"/>'
+            for px, py in coords
+        )
+        legend_y = top + 16 * n
+        parts.append(
+            f'<rect x="{left + plot_w + 20}" y="{legend_y}" width="12" '
+            f'height="12" fill="{color}"/>'
+            f'<text x="{left + plot_w + 38}" y="{legend_y + 10}">'
+            f"{escape(label)}</text>"
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def write_trend_charts(runs, directory=None, metric="p50_ms"):
+    # One chart per workload, stage, index set and cache mode, with a line
+    # per query across the runs in the order they were recorded.
+    directory = directory or chart_dir()
+    groups = {}
+    for run in runs:
+        groups.setdefault(run_key(run), []).append(run)
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for (workload, stage, index_set, cache), group in groups.items():
+        labels = []
+        for run in group:
+            for r in run["results"]:
+                if r["label"] not in labels:
+                    labels.append(r["label"])
+        series = {
+            label: [
+                next((r[metric] for r in run["results"] if r["label"] == label), None)
+                for run in group
+            ]
+            for label in labels
+        }
+        x_labels = [
+            f"{run['recorded_at'][:10]} {run['commit'] or run['id']}" for run in group
+        ]
+        title = (
+            f"{workload} / {stage} / {index_set} ({cache} cache) — "
+            f"{metric.removesuffix('_ms')} (ms)"
+        )
+        path = os.path.join(directory, f"{workload}-{stage}-{index_set}-{cache}.svg")
+        with open(path, "w") as f:
+            f.write(trend_svg(title, x_labels, series))
+        paths.append(path)
+    return paths
@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.advisor import (
+    apply_indexes,
+    drop_advised,
+    evaluate_candidates,
+    print_candidates,
+    recommend,
+    table_columns,
+    weighted_latency,
+    workload_candidates,
+    workload_table,
+)
+from benchmark.workloads import WORKLOADS, create_index_sql
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = "Recommend indexes for a registered workload within a storage budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workload",
+            choices=sorted(WORKLOADS),
+            default="default",
+            help="Registered workload to advise on",
+        )
+        parser.add_argument(
+            "--budget-mb",
+            type=float,
+            default=512,
+            help="Maximum total size of the recommended indexes",
+        )
+        parser.add_argument(
+            "--write-weight",
+            type=float,
+            default=0.1,
+            help="Penalty per unit of write amplification, as a fraction of "
+            "the baseline workload latency",
+        )
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=3)
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Leave the recommended indexes in place",
+        )
+
+    def handle(self, *args, **options):
+        workload = options["workload"]
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+        }
+
+        try:
+            table = workload_table(workload)
+        except ValueError as e:
+            raise CommandError(e)
+        candidates = workload_candidates(workload, table_columns(table))
+        console.rule(
+            f"[bold blue]Evaluating {len(candidates)} candidate indexes on {table}"
+        )
+        baseline_ms, evaluated = evaluate_candidates(
+            workload, candidates, table, **bench_options
+        )
+        chosen = recommend(
+            baseline_ms,
+            evaluated,
+            options["budget_mb"] * 1024 * 1024,
+            options["write_weight"],
+        )
+        print_candidates(evaluated, chosen)
+
+        if not chosen:
+            console.print("[yellow]No candidate pays for itself.[/yellow]")
+            return
+
+        # Candidates were measured one at a time; confirm the chosen set
+        # together, since indexes can make each other redundant.
+        apply_indexes(chosen)
+        combined_ms, _ = weighted_latency(workload, **bench_options)
+        if not options["apply"]:
+            drop_advised(chosen)
+
+        total_mb = sum(c["size_bytes"] for c in chosen) / 1024 / 1024
+        console.print(
+            f"Weighted latency: {baseline_ms:.2f} ms without indexes, "
+            f"{combined_ms:.2f} ms with the recommended set ({total_mb:.1f} MB)"
+        )
+        console.rule("[bold green]Recommended indexes")
+        for index in chosen:
+            console.print(create_index_sql(index) + ";")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from benchmark.stats import (
+    DEFAULT_BUCKETS,
+    FILTER_COLUMNS,
+    drop_histograms,
+    histogram_summary,
+    print_histograms,
+    update_statistics,
+)
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run ANALYZE TABLE and build histograms on the non-indexed filter columns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--table", default="test_data")
+        parser.add_argument(
+            "--column",
+            action="append",
+            choices=FILTER_COLUMNS,
+            help="Histogram column (repeatable, default: every non-indexed "
+            "filter column)",
+        )
+        parser.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS)
+        parser.add_argument(
+            "--no-histograms",
+            action="store_true",
+            help="Only refresh the index statistics",
+        )
+        parser.add_argument(
+            "--drop", action="store_true", help="Drop the table's histograms and exit"
+        )
+
+    def handle(self, *args, **options):
+        table = options["table"]
+        if options["drop"]:
+            dropped = drop_histograms(table)
+            console.print(
+                f"[green]Dropped histograms on {', '.join(dropped) or 'nothing'}"
+                "[/green]"
+            )
+            return
+        update_statistics(
+            table,
+            histograms=not options["no_histograms"],
+            columns=options["column"],
+            buckets=options["buckets"],
+        )
+        print_histograms(histogram_summary(table), title=f"Histograms on {table}")
@@ -0,0 +1,66 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Max, Min
+from benchmark.cache import cache_benchmark
+from benchmark.models import TestData
+from benchmark.utils import drop_indexes, setup_indexes
+from benchmark.workloads import INDEX_SETS, WORKLOADS
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = "Measure the query result cache: hit vs miss latency and hit ratio"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workload", choices=sorted(WORKLOADS), default="default")
+        parser.add_argument(
+            "--index-set", choices=sorted(INDEX_SETS), default="baseline"
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=5, help="Cache misses per query"
+        )
+        parser.add_argument(
+            "--hit-iterations", type=int, default=100, help="Cache hits per query"
+        )
+        parser.add_argument(
+            "--reads",
+            type=int,
+            default=500,
+            help="Weighted reads in the mixed phase",
+        )
+        parser.add_argument(
+            "--write-every",
+            type=int,
+            default=0,
+            help="Issue an ORM update on test_data every N reads (0 = read-only)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        bounds = TestData.objects.aggregate(low=Min("order_id"), high=Max("order_id"))
+        if bounds["low"] is None:
+            raise CommandError("test_data is empty; run generate_data first")
+        rng = random.Random(options["seed"])
+
+        def write():
+            # Rewrites a row in place: the data doesn't change, but the update
+            # goes through the ORM and invalidates cached test_data results.
+            order_id = rng.randint(bounds["low"], bounds["high"])
+            TestData.objects.filter(order_id=order_id).update(rating=F("rating"))
+
+        drop_indexes()
+        setup_indexes(options["index_set"])
+        console.rule(f"[bold blue]Result cache × {options['workload']}")
+        cache_benchmark(
+            workload=options["workload"],
+            iterations=options["iterations"],
+            hit_iterations=options["hit_iterations"],
+            reads=options["reads"],
+            write_every=options["write_every"],
+            write=write,
+            seed=options["seed"],
+        )
+        drop_indexes()
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+from benchmark.compact import COMPACT_TABLE, compact_schema
+from benchmark.footprint import print_footprint, table_footprint
+from benchmark.utils import (
+    analyze_table,
+    compare_results,
+    drop_indexes,
+    run_benchmarks,
+    setup_indexes,
+)
+from benchmark.workloads import INDEX_SETS, WORKLOADS
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert test_data to compact column types and compare its footprint "
+        "and query latency before and after"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workload", default="default", choices=sorted(WORKLOADS))
+        parser.add_argument(
+            "--index-set", default="baseline", choices=sorted(INDEX_SETS)
+        )
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument("--cache", choices=["warm", "cold"], default="cold")
+        parser.add_argument(
+            "--online",
+            action="store_true",
+            help="Copy into the compact table in throttled chunks of --chunk-size",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument("--throttle", type=float, default=0.0)
+
+    def handle(self, *args, **options):
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+            "cache": options["cache"],
+        }
+        online_options = {}
+        if options["online"]:
+            online_options = {
+                "chunk_size": options["chunk_size"],
+                "throttle": options["throttle"],
+            }
+
+        # Indexes are built before measuring the footprint, so the index size
+        # shows what the narrower key columns save.
+        drop_indexes()
+        setup_indexes(options["index_set"])
+        analyze_table(COMPACT_TABLE)
+        before_footprint = table_footprint([COMPACT_TABLE])
+        console.rule("[bold blue]Current Schema")
+        before = run_benchmarks("Current Schema", options["workload"], **bench_options)
+
+        console.rule("[bold blue]Compacting Schema")
+        if not compact_schema(options["online"], **online_options):
+            console.print(
+                "[yellow]test_data was already compact, so both runs use the "
+                "same schema.[/yellow]"
+            )
+        after_footprint = table_footprint([COMPACT_TABLE])
+        console.rule("[bold blue]Compact Schema")
+        after = run_benchmarks("Compact Schema", options["workload"], **bench_options)
+        drop_indexes()
+
+        compare_results(before, after, names=("Current", "Compact"))
+        print_footprint(before_footprint, title="Footprint before")
+        print_footprint(after_footprint, title="Footprint after")
+        for label, key in [("Data", "data_bytes"), ("Index", "index_bytes")]:
+            old = sum(f[key] for f in before_footprint)
+            new = sum(f[key] for f in after_footprint)
+            change = (new - old) / old if old else 0.0
+            console.print(
+                f"[bold]{label}:[/bold] {old / 1024 / 1024:.1f} MB -> "
+                f"{new / 1024 / 1024:.1f} MB ({change:+.1%})"
+            )
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.history import (
+    METRICS,
+    compare_runs,
+    find_run,
+    load_history,
+    print_comparison,
+    print_history,
+    write_trend_charts,
+)
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = "Compare a recorded benchmark run against a baseline and flag regressions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--run", help="Run id or commit to check (default: the latest run)"
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Run id or commit to compare against (default: the previous "
+            "run of the same workload, stage, index set and cache mode)",
+        )
+        parser.add_argument("--metric", choices=METRICS, default="p50_ms")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Slowdown in percent that counts as a regression",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when any query regresses (for CI)",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="List the recorded runs and exit"
+        )
+        parser.add_argument(
+            "--charts", action="store_true", help="Regenerate the trend charts"
+        )
+        parser.add_argument("--history", help="History file (default: settings)")
+
+    def handle(self, *args, **options):
+        runs = load_history(options["history"])
+        if not runs:
+            raise CommandError("No benchmark history recorded yet")
+        if options["list"]:
+            print_history(runs)
+            return
+        if options["charts"]:
+            for path in write_trend_charts(runs, metric=options["metric"]):
+                console.print(f"[green]Chart written to {path}[/green]")
+
+        candidate = find_run(runs, options["run"])
+        if candidate is None:
+            raise CommandError(f"No run matches {options['run']!r}")
+        baseline = find_run(runs, options["baseline"], like=candidate)
+        if baseline is None:
+            raise CommandError(
+                f"No comparable baseline for run {candidate['id']} "
+                f"({candidate['workload']}, {candidate['stage']}, "
+                f"{candidate['index_set']})"
+            )
+
+        threshold = options["threshold"] / 100
+        rows = compare_runs(baseline, candidate, options["metric"], threshold)
+        print_comparison(baseline, candidate, rows, options["metric"], threshold)
+        regressions = [r["label"] for r in rows if r["regression"]]
+        if not regressions:
+            console.print("[green]No regressions.[/green]")
+            return
+        message = f"{len(regressions)} regression(s): {', '.join(regressions)}"
+        if options["fail_on_regression"]:
+            raise CommandError(message)
+        console.print(f"[red]{message}[/red]")
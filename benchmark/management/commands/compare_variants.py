@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from benchmark.utils import drop_indexes, setup_indexes
+from benchmark.variants import VARIANT_SETS, run_variants
+from benchmark.workloads import INDEX_SETS
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every registered rewrite of a query under the same conditions, "
+        "check they return the same rows and rank them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--variants",
+            default="complex_query_2",
+            choices=sorted(VARIANT_SETS),
+            help="Variant set to compare",
+        )
+        parser.add_argument(
+            "--index-set",
+            action="append",
+            choices=sorted(INDEX_SETS),
+            help="Index set to compare the variants under (repeatable, "
+            "default baseline)",
+        )
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **options):
+        results = {}
+        for index_set in options["index_set"] or ["baseline"]:
+            console.rule(f"[bold blue]{options['variants']} × {index_set}")
+            drop_indexes()
+            setup_indexes(index_set)
+            results[index_set] = run_variants(
+                options["variants"],
+                warmup=options["warmup"],
+                iterations=options["iterations"],
+            )
+        drop_indexes()
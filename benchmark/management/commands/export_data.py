@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from benchmark.datagen import COLUMNS
+from benchmark.models import TestData
+from benchmark.streaming import (
+    EXPORT_FORMATS,
+    FETCH_MODES,
+    export_writer,
+    print_fetch_profiles,
+    profile_rows,
+    stream_rows,
+)
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = "Stream test_data to CSV or chunked part files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument(
+            "--output",
+            help="Output file (csv) or directory (parts); defaults to "
+            "test_data.csv or test_data_parts/",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=FETCH_MODES,
+            default="sscursor",
+            help="How rows are fetched from MySQL",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument("--rows-per-file", type=int, default=1_000_000)
+        parser.add_argument("--limit", type=int, help="Export only the first N rows")
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Export once per fetch mode into a temporary directory and "
+            "compare time-to-first-row, rows/sec and peak RSS",
+        )
+
+    def handle(self, *args, **options):
+        column_list = ", ".join(f"`{column}`" for column in COLUMNS)
+        sql = f"SELECT {column_list} FROM test_data ORDER BY order_id"
+        queryset = TestData.objects.order_by("order_id").values_list(*COLUMNS)
+        if options["limit"]:
+            sql += f" LIMIT {options['limit']}"
+            queryset = queryset[: options["limit"]]
+
+        fmt = options["format"]
+        default_output = "test_data.csv" if fmt == "csv" else "test_data_parts"
+        if not options["compare"]:
+            output = options["output"] or default_output
+            profile = self.export(options["mode"], sql, queryset, output, options)
+            print_fetch_profiles(
+                {options["mode"]: profile}, title=f"Export to {output}"
+            )
+            return
+
+        profiles = {}
+        with tempfile.TemporaryDirectory() as scratch:
+            # The streaming modes go first: ru_maxrss-based fallbacks can only
+            # grow, so the buffered run would mask them otherwise.
+            for mode in ["sscursor", "iterator", "buffered"]:
+                console.print(f"[bold]Exporting with {mode}...[/bold]")
+                output = os.path.join(scratch, f"{mode}-{default_output}")
+                profiles[mode] = self.export(mode, sql, queryset, output, options)
+        print_fetch_profiles(profiles, title=f"Export fetch modes ({fmt})")
+
+    def export(self, mode, sql, queryset, output, options):
+        rows = stream_rows(mode, sql, queryset, options["chunk_size"])
+        with export_writer(
+            options["format"], output, COLUMNS, options["rows_per_file"]
+        ) as write:
+            return profile_rows(rows, consume=write)
@@ -1,10 +1,24 @@
-from django.core.management.base import BaseCommand
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.concurrency import (
+    check_pool_capacity,
+    parse_levels,
+    parse_mix,
+    run_load_levels,
+)
+from benchmark.explain import diff_plans, report_index_usage
+from benchmark.history import load_history, record_run, write_trend_charts
+from benchmark.metrics import COLLECTORS
 from benchmark.utils import (
     drop_indexes,
     setup_indexes,
     optimize_schema,
     run_benchmarks,
+    run_matrix,
+    compare_results,
 )
+from benchmark.workloads import INDEX_SETS, WORKLOADS, get_index_set, get_workload
 from rich.console import Console
 
 console = Console()
@@ -13,14 +27,206 @@ console = Console()
 class Command(BaseCommand):
     help = "Run full benchmark with optimization"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workload",
+            choices=sorted(WORKLOADS),
+            default="default",
+            help="Registered workload whose queries are benchmarked",
+        )
+        parser.add_argument(
+            "--index-set",
+            choices=sorted(INDEX_SETS),
+            default="baseline",
+            help="Registered index set created for the after-optimization run",
+        )
+        parser.add_argument(
+            "--matrix",
+            action="store_true",
+            help="Benchmark every workload against each of its candidate index sets",
+        )
+        parser.add_argument(
+            "--online",
+            action="store_true",
+            help="Apply the schema changes as an online migration "
+            "(see the optimize_schema command)",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=1, help="Unmeasured runs per query"
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=5, help="Measured runs per query"
+        )
+        parser.add_argument(
+            "--cache",
+            choices=["warm", "cold"],
+            default="warm",
+            help="Measure against a warm buffer pool or evict it before each run",
+        )
+        parser.add_argument(
+            "--fetch",
+            choices=["buffered", "sscursor"],
+            default="buffered",
+            help="Buffer each result client-side or stream it with a server-side "
+            "cursor",
+        )
+        parser.add_argument(
+            "--collector",
+            action="append",
+            choices=sorted(COLLECTORS),
+            help="Metrics collector to run around each query (repeatable, "
+            "default: all built-in collectors)",
+        )
+        parser.add_argument(
+            "--no-counters",
+            action="store_true",
+            help="Measure latency only, without server counter snapshots",
+        )
+        parser.add_argument(
+            "--concurrency",
+            help="Comma-separated client counts for a concurrent load run, "
+            "e.g. 1,4,16",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10,
+            help="Seconds to drive the load at each concurrency level",
+        )
+        parser.add_argument(
+            "--mix",
+            help='Query weights, e.g. "Complex Query 1=3,Complex Query 2=1" '
+            "(default: the workload's weights)",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Capture EXPLAIN FORMAT=JSON per query and diff plans before/after",
+        )
+        parser.add_argument(
+            "--explain-analyze",
+            action="store_true",
+            help="Also store EXPLAIN ANALYZE output (implies --explain)",
+        )
+        parser.add_argument(
+            "--optimizer-trace",
+            action="store_true",
+            help="Also store the optimizer trace (implies --explain)",
+        )
+        parser.add_argument(
+            "--json", metavar="PATH", help="Write before/after results as JSON"
+        )
+        parser.add_argument(
+            "--no-history",
+            action="store_true",
+            help="Don't record the run in the benchmark history",
+        )
+
+    def handle(self, *args, **options):
+        self.no_history = options["no_history"]
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+            "cache": options["cache"],
+            "fetch": options["fetch"],
+            "collectors": [] if options["no_counters"] else options["collector"],
+            "explain": options["explain"],
+            "analyze": options["explain_analyze"],
+            "trace": options["optimizer_trace"],
+        }
+
+        if options["matrix"]:
+            console.rule("[bold blue]Optimizing Schema")
+            optimize_schema(online=options["online"])
+            matrix = run_matrix(
+                sorted(WORKLOADS),
+                on_result=lambda *cell: self.record("matrix", *cell),
+                **bench_options,
+            )
+            self.write_json(options["json"], {"matrix": matrix})
+            self.write_charts()
+            return
+
+        workload = options["workload"]
+        index_set = options["index_set"]
+        queries = get_workload(workload)["queries"]
+        capture_plans = any(
+            options[key] for key in ["explain", "explain_analyze", "optimizer_trace"]
+        )
+        levels = []
+        try:
+            if options["concurrency"]:
+                levels = parse_levels(options["concurrency"])
+                check_pool_capacity(levels)
+            mix = parse_mix(options["mix"], queries)
+        except ValueError as e:
+            raise CommandError(e)
+        load = {}
+
         console.rule("[bold blue]Benchmarking Before Optimization")
         drop_indexes()
-        run_benchmarks()
+        before = run_benchmarks("Before Optimization", workload, **bench_options)
+        self.record("before", workload, "none", before)
+        if levels:
+            load["before"] = run_load_levels(
+                queries, levels, options["duration"], mix, "Before Optimization"
+            )
 
         console.rule("[bold blue]Optimizing Schema & Indexes")
-        optimize_schema()
-        setup_indexes()
+        optimize_schema(online=options["online"])
+        setup_indexes(index_set)
 
         console.rule("[bold blue]Benchmarking After Optimization")
-        run_benchmarks()
+        after = run_benchmarks("After Optimization", workload, **bench_options)
+        self.record("after", workload, index_set, after)
+        if levels:
+            load["after"] = run_load_levels(
+                queries, levels, options["duration"], mix, "After Optimization"
+            )
+        compare_results(before, after)
+        regressions = {}
+        if capture_plans:
+            regressions = diff_plans(before, after)
+            report_index_usage(
+                after, [index["name"] for index in get_index_set(index_set)]
+            )
+
+        self.write_json(
+            options["json"],
+            {
+                "workload": workload,
+                "index_set": index_set,
+                "before": before,
+                "after": after,
+                "load": load,
+                "plan_regressions": regressions,
+            },
+        )
+        self.write_charts()
+
+    def record(self, stage, workload, index_set, results):
+        # Each run is recorded as soon as it finishes, so the stored schema
+        # state and indexes are the ones it ran against.
+        if self.no_history:
+            return
+        try:
+            run = record_run(stage, workload, index_set, results)
+        except Exception as e:
+            console.print(f"[red]Warning:[/red] Couldn't record the run — {e}")
+            return
+        console.print(f"[green]Recorded run {run['id']}[/green]")
+
+    def write_charts(self):
+        if self.no_history:
+            return
+        try:
+            write_trend_charts(load_history())
+        except Exception as e:
+            console.print(f"[red]Warning:[/red] Couldn't write trend charts — {e}")
+
+    def write_json(self, path, payload):
+        if not path:
+            return
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=2)
+        console.print(f"[green]Results written to {path}[/green]")
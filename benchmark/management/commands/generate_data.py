@@ -1,108 +1,166 @@
-from django.core.management.base import BaseCommand
-from benchmark.models import TestData
-from faker import Faker
-from tqdm import tqdm
+import time
 
-fake = Faker()
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.datagen import (
+    ENGINES,
+    LAYOUTS,
+    layout_packs_ip,
+    next_order_id,
+    reset_layout,
+    run_shards,
+    shard_ranges,
+)
+from benchmark.distributions import HOT_KEYS, make_distribution
+from benchmark.utils import defer_indexes, restore_indexes
+from tqdm import tqdm
 
 
 class Command(BaseCommand):
     help = "Generates fake test data"
 
-    def handle(self, *args, **kwargs):
-        TestData.objects.all().delete()
-        total_rows = 100000
-        batch_size = 1000
-        buffer = []
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=100000, help="Number of rows to generate"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes, each with its own DB connection",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed for deterministic output (same seed, same rows)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows per bulk_create batch or LOAD DATA chunk "
+            "(default: 1000 for orm, 50000 for infile)",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=10000,
+            help="Rows per primary-key shard handed to a worker",
+        )
+        parser.add_argument(
+            "--engine",
+            choices=sorted(ENGINES),
+            default="faker",
+            help="Row generator: per-row Faker calls or column-at-a-time NumPy",
+        )
+        parser.add_argument(
+            "--layout",
+            choices=sorted(LAYOUTS),
+            default="wide",
+            help="Load the single wide test_data table or the hot/cold split tables",
+        )
+        parser.add_argument(
+            "--loader",
+            choices=["orm", "infile"],
+            default="orm",
+            help="Load rows with ORM bulk_create or stream them through "
+            "LOAD DATA LOCAL INFILE",
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop secondary indexes before loading and rebuild them after",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=0.0,
+            help="Zipf exponent for the hot-key columns, e.g. 1.1 (0 keeps them "
+            "uniform); use --seed so all workers agree on the hot values",
+        )
+        parser.add_argument(
+            "--hot-keys",
+            default=",".join(HOT_KEYS),
+            help="Comma-separated columns that get Zipfian hot keys",
+        )
+        parser.add_argument(
+            "--correlate",
+            action="store_true",
+            help="Make rating follow price, and status follow price and rating",
+        )
+        parser.add_argument(
+            "--null-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of NULLs in the optional coupon_code and "
+            "referral_source columns",
+        )
+        parser.add_argument(
+            "--append",
+            action="store_true",
+            help="Keep the existing rows and continue from the current max "
+            "order_id instead of truncating first",
+        )
+        parser.add_argument(
+            "--relax-checks",
+            action="store_true",
+            help="Disable unique and foreign-key checks during the load",
+        )
 
-        for i in tqdm(range(1, total_rows + 1)):
-            row = TestData(
-                order_id=i,
-                user_id=fake.random_int(1, 10000),
-                product_id=fake.random_int(1, 100000),
-                product_name=fake.word(),
-                category_id=fake.random_int(1, 50),
-                price=round(fake.random_number(digits=3) + fake.random.random(), 2),
-                quantity=fake.random_int(1, 10),
-                discount=round(fake.random.uniform(0, 0.3), 2),
-                tax=round(fake.random.uniform(0, 0.2), 2),
-                status=fake.random_element(
-                    ["pending", "shipped", "delivered", "returned"]
-                ),
-                order_date=fake.random_int(1600000000, 1700000000),
-                delivery_date=fake.random_int(1600000000, 1700000000),
-                city=fake.city(),
-                state=fake.state(),
-                country_id=fake.random_int(1, 200),
-                email=fake.email(),
-                phone=fake.phone_number(),
-                customer_name=fake.name(),
-                shipping_address=fake.address().replace("\n", ", "),
-                billing_address=fake.address().replace("\n", ", "),
-                rating=round(fake.random.uniform(1, 5), 1),
-                is_returned=fake.boolean(chance_of_getting_true=10),
-                platform=fake.random_element(["web", "mobile", "app"]),
-                device_type=fake.random_element(["desktop", "tablet", "phone"]),
-                notes=fake.text(max_nb_chars=50),
-                coupon_code=fake.bothify(text="???###"),
-                shipping_method=fake.random_element(
-                    ["standard", "express", "overnight"]
-                ),
-                payment_method=fake.random_element(["credit_card", "paypal", "cash"]),
-                invoice_number=fake.bothify(text="INV#######"),
-                gift_wrap=fake.random_element(["yes", "no"]),
-                warehouse_id=fake.random_int(1, 50),
-                batch_number=fake.random_int(1, 100),
-                supplier_id=fake.random_int(1, 5000),
-                shipment_id=fake.random_int(1, 10000),
-                carrier_id=fake.random_int(1, 300),
-                tracking_number=fake.bothify(text="TRK######"),
-                browser=fake.random_element(["Chrome", "Firefox", "Safari", "Edge"]),
-                os=fake.random_element(["Windows", "Linux", "macOS", "Android", "iOS"]),
-                os_version=fake.random_int(1, 15),
-                ip_address=fake.ipv4(),
-                user_agent=fake.user_agent(),
-                latitude=fake.latitude(),
-                longitude=fake.longitude(),
-                timezone=fake.timezone(),
-                campaign_name=fake.word(),
-                referral_source=fake.word(),
-                session_id=fake.uuid4()[:8],
-                page_views=fake.random_int(1, 5000),
-                clicks=fake.random_int(1, 1000),
-                impressions=fake.random_int(1, 10000),
-                is_new_customer=fake.boolean(chance_of_getting_true=30),
-                conversion_rate=round(fake.random.uniform(0, 1), 3),
-                avg_order_value=round(fake.random.uniform(10, 1000), 2),
-                lifetime_value=round(fake.random.uniform(100, 10000), 2),
-                loyalty_points=fake.random_int(0, 1000),
-                membership_level=fake.random_element(
-                    ["Bronze", "Silver", "Gold", "Platinum"]
-                ),
-                age=fake.random_int(18, 75),
-                occupation=fake.job(),
-                education_level=fake.random_element(
-                    ["High School", "Bachelors", "Masters", "PhD"]
-                ),
-                income_range=fake.random_element(
-                    ["<20K", "20K-50K", "50K-100K", ">100K"]
-                ),
-                marital_status=fake.random_element(["Single", "Married", "Divorced"]),
-                preferred_language=fake.random_element(
-                    ["English", "Spanish", "French", "Mandarin"]
-                ),
-                custom_field_1=fake.word(),
-                custom_field_2=fake.word(),
-                custom_field_3=fake.word(),
-                custom_field_4=fake.word(),
+    def handle(self, *args, **options):
+        try:
+            distribution = make_distribution(
+                options["skew"],
+                options["hot_keys"].split(","),
+                options["correlate"],
+                options["null_rate"],
             )
-            buffer.append(row)
+        except ValueError as e:
+            raise CommandError(e)
+        models = LAYOUTS[options["layout"]]
+        if options["append"]:
+            first_id = next_order_id(options["layout"])
+        else:
+            reset_layout(options["layout"])
+            first_id = 1
+        total_rows = options["rows"]
+        # Shard seeds depend on each shard's first order_id, so appending to a
+        # table whose row count is a multiple of --shard-size reproduces the
+        # rows one larger seeded run would have generated.
+        shards = list(shard_ranges(total_rows, options["shard_size"], first_id))
+        batch_size = options["batch_size"] or (
+            50000 if options["loader"] == "infile" else 1000
+        )
 
-            if i % batch_size == 0:
-                TestData.objects.bulk_create(buffer)
-                buffer = []
+        pack_ip = layout_packs_ip(options["layout"])
 
-        if buffer:
-            TestData.objects.bulk_create(buffer)
+        deferred = []
+        if options["defer_indexes"]:
+            for model in models:
+                deferred.extend(defer_indexes(model._meta.db_table))
+        started = time.perf_counter()
+        try:
+            with tqdm(total=total_rows) as progress:
+                for done in run_shards(
+                    shards,
+                    options["workers"],
+                    seed=options["seed"],
+                    batch_size=batch_size,
+                    engine=options["engine"],
+                    loader=options["loader"],
+                    layout=options["layout"],
+                    relax_checks=options["relax_checks"],
+                    pack_ip=pack_ip,
+                    distribution=distribution,
+                ):
+                    progress.update(done)
+        finally:
+            restore_indexes(deferred)
+        elapsed = time.perf_counter() - started
 
+        self.stdout.write(
+            f"{total_rows} rows in {elapsed:.1f}s "
+            f"({total_rows / elapsed:,.0f} rows/sec, engine={options['engine']}, "
+            f"loader={options['loader']})"
+        )
         self.stdout.write(self.style.SUCCESS("Data generation completed."))
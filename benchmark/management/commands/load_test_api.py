@@ -0,0 +1,190 @@
+import asyncio
+import random
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.utils.text import slugify
+from benchmark.concurrency import parse_mix
+from benchmark.utils import summarize
+from benchmark.workloads import WORKLOADS, get_workload
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# DEBUG allows "localhost" with an empty ALLOWED_HOSTS; the test clients'
+# default "testserver" is only allowed under the test runner.
+HOST = {"Host": "localhost"}
+
+
+def endpoint_paths(workload, mix, sync):
+    prefix = "/api/sync" if sync else "/api"
+    return {label: f"{prefix}/{workload}/{slugify(label)}/" for label in mix}
+
+
+def _pick(rng, paths, mix):
+    labels = list(mix)
+    return paths[rng.choices(labels, [mix[label] for label in labels])[0]]
+
+
+def _thread_load(fetch, paths, mix, concurrency, deadline):
+    def worker(worker_id):
+        rng = random.Random(worker_id)
+        samples, errors = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter_ns()
+            try:
+                ok = fetch(_pick(rng, paths, mix))
+            except Exception:
+                ok = False
+            if ok:
+                samples.append((time.perf_counter_ns() - started) / 1_000_000)
+            else:
+                errors += 1
+        return samples, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(worker, range(concurrency)))
+
+
+async def _async_load(paths, mix, concurrency, deadline):
+    client = AsyncClient(headers=HOST)
+
+    async def worker(worker_id):
+        rng = random.Random(worker_id)
+        samples, errors = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter_ns()
+            try:
+                response = await client.get(_pick(rng, paths, mix))
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            if ok:
+                samples.append((time.perf_counter_ns() - started) / 1_000_000)
+            else:
+                errors += 1
+        return samples, errors
+
+    return await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+
+def _http_fetch(base_url):
+    def fetch(path):
+        with urllib.request.urlopen(base_url.rstrip("/") + path, timeout=60) as r:
+            r.read()
+            return r.status == 200
+
+    return fetch
+
+
+def _wsgi_fetch():
+    # Django's test Client keeps per-request state, so each thread gets its own.
+    local = threading.local()
+
+    def fetch(path):
+        if not hasattr(local, "client"):
+            local.client = Client(headers=HOST)
+        return local.client.get(path).status_code == 200
+
+    return fetch
+
+
+def run_stack(stack, workload, mix, concurrency, duration, url=None):
+    # ASGI is driven through the async views, WSGI through their sync twins.
+    paths = endpoint_paths(workload, mix, sync=stack == "wsgi")
+    started = time.monotonic()
+    deadline = started + duration
+    if url:
+        outcomes = _thread_load(_http_fetch(url), paths, mix, concurrency, deadline)
+    elif stack == "asgi":
+        outcomes = asyncio.run(_async_load(paths, mix, concurrency, deadline))
+    else:
+        outcomes = _thread_load(_wsgi_fetch(), paths, mix, concurrency, deadline)
+    elapsed = time.monotonic() - started
+
+    samples = [s for worker_samples, _ in outcomes for s in worker_samples]
+    return {
+        "stack": stack,
+        "target": url or "in-process",
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(errors for _, errors in outcomes),
+        "rps": round(len(samples) / elapsed, 1),
+        **summarize(samples),
+    }
+
+
+class Command(BaseCommand):
+    help = "Load-test the query API end to end over ASGI and WSGI"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workload", choices=sorted(WORKLOADS), default="default")
+        parser.add_argument(
+            "--mix", help="Query weights, e.g. 'Complex Query 1=3,Complex Query 2=1'"
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="1,8,32",
+            help="Comma-separated numbers of concurrent clients",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Seconds per measurement"
+        )
+        parser.add_argument(
+            "--asgi-url",
+            help="Base URL of a running ASGI server (e.g. uvicorn "
+            "mysql_optimisation.asgi:application); in-process if omitted",
+        )
+        parser.add_argument(
+            "--wsgi-url",
+            help="Base URL of a running WSGI server (e.g. runserver); "
+            "in-process if omitted",
+        )
+
+    def handle(self, *args, **options):
+        workload = options["workload"]
+        try:
+            mix = parse_mix(options["mix"], get_workload(workload)["queries"])
+        except ValueError as e:
+            raise CommandError(e)
+
+        results = []
+        for concurrency in [int(c) for c in options["concurrency"].split(",")]:
+            for stack in ["asgi", "wsgi"]:
+                console.print(f"[bold]{stack} × {concurrency} clients...[/bold]")
+                results.append(
+                    run_stack(
+                        stack,
+                        workload,
+                        mix,
+                        concurrency,
+                        options["duration"],
+                        options[f"{stack}_url"],
+                    )
+                )
+
+        table = Table(title=f"Query API load test ({workload})")
+        table.add_column("Stack")
+        table.add_column("Target")
+        table.add_column("Clients", justify="right")
+        table.add_column("Req/sec", justify="right")
+        for column in ["p50", "p95", "p99"]:
+            table.add_column(f"{column} (ms)", justify="right")
+        table.add_column("Errors", justify="right")
+        for r in results:
+            table.add_row(
+                r["stack"],
+                r["target"],
+                str(r["concurrency"]),
+                f"{r['rps']:,.1f}",
+                str(r["p50_ms"]),
+                str(r["p95_ms"]),
+                str(r["p99_ms"]),
+                str(r["errors"]),
+            )
+        console.print(table)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from benchmark.utils import optimize_schema
+
+
+class Command(BaseCommand):
+    help = "Apply the schema optimizations, optionally as an online migration"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--online",
+            action="store_true",
+            help="Prefer ALGORITHM=INSTANT/INPLACE, LOCK=NONE and fall back to a "
+            "resumable shadow-table copy",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="order_id range copied per chunk during a shadow copy",
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between chunks",
+        )
+        parser.add_argument(
+            "--lock-wait-timeout",
+            type=int,
+            default=5,
+            help="Seconds the final rename may wait for the metadata lock",
+        )
+
+    def handle(self, *args, **options):
+        if not options["online"]:
+            optimize_schema()
+            return
+        optimize_schema(
+            online=True,
+            chunk_size=options["chunk_size"],
+            throttle=options["throttle"],
+            lock_wait_timeout=options["lock_wait_timeout"],
+        )
@@ -0,0 +1,158 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.footprint import print_footprint, table_footprint
+from benchmark.partitioning import (
+    PARTITIONED_TABLE,
+    copy_is_stale,
+    create_partitioned_table,
+    partition_in_place,
+    partition_names,
+    purge_benchmark,
+    remove_partitioning,
+    report_pruning,
+)
+from benchmark.utils import (
+    compare_results,
+    drop_indexes,
+    run_benchmarks,
+    setup_indexes,
+)
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare time-window queries on test_data with a copy "
+        "RANGE-partitioned by order_date, or partition test_data itself"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help="Benchmark test_data, RANGE-partition it and benchmark it again; "
+            "it stays partitioned afterwards",
+        )
+        parser.add_argument(
+            "--unpartition",
+            action="store_true",
+            help="Remove the in-place partitioning of test_data and exit",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help=f"(Re)create {PARTITIONED_TABLE} from test_data",
+        )
+        parser.add_argument(
+            "--bucket-days",
+            type=int,
+            default=30,
+            help="Width of each order_date partition in days",
+        )
+        parser.add_argument(
+            "--index-set",
+            choices=["none", "order_date"],
+            default="order_date",
+            help="Index the order_date column of both tables, or neither",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Also time DROP PARTITION against a bulk DELETE of the oldest "
+            "bucket",
+        )
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument("--cache", choices=["warm", "cold"], default="warm")
+
+    def handle(self, *args, **options):
+        if options["unpartition"]:
+            if partition_names("test_data"):
+                remove_partitioning()
+            else:
+                console.print("[yellow]test_data is not partitioned.[/yellow]")
+            return
+
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+            "cache": options["cache"],
+            "explain": True,
+        }
+        if options["in_place"]:
+            self.in_place(options, bench_options)
+            return
+
+        if partition_names("test_data"):
+            raise CommandError(
+                "test_data is partitioned in place; run with --unpartition first "
+                "or use --in-place"
+            )
+        rebuild = options["rebuild"] or not partition_names()
+        if not rebuild and copy_is_stale():
+            console.print(
+                f"[yellow]The columns of test_data changed since {PARTITIONED_TABLE} "
+                "was built; rebuilding it.[/yellow]"
+            )
+            rebuild = True
+        if rebuild:
+            try:
+                create_partitioned_table(options["bucket_days"] * 86400)
+            except ValueError as e:
+                raise CommandError(e)
+        total_partitions = len(partition_names())
+
+        drop_indexes()
+        if options["index_set"] == "order_date":
+            setup_indexes("order_date")
+            setup_indexes("partitioned_order_date")
+
+        console.rule("[bold blue]Unpartitioned test_data")
+        flat = run_benchmarks("Unpartitioned", "time_window", **bench_options)
+        console.rule(f"[bold blue]Partitioned {PARTITIONED_TABLE}")
+        partitioned = run_benchmarks(
+            "Partitioned", "time_window_partitioned", **bench_options
+        )
+
+        compare_results(flat, partitioned, names=("Unpartitioned", "Partitioned"))
+        report_pruning(partitioned, total_partitions)
+        print_footprint(table_footprint(["test_data", PARTITIONED_TABLE]))
+
+        if options["purge"]:
+            console.rule("[bold blue]Purging old data")
+            purge_benchmark()
+
+    def in_place(self, options, bench_options):
+        # Both runs use the time_window workload on test_data, so the only
+        # difference between them is the partitioning.
+        if partition_names("test_data"):
+            remove_partitioning()
+        drop_indexes()
+        if options["index_set"] == "order_date":
+            setup_indexes("order_date")
+
+        console.rule("[bold blue]Unpartitioned test_data")
+        flat = run_benchmarks("Unpartitioned", "time_window", **bench_options)
+        before = table_footprint(["test_data"])
+        try:
+            partition_in_place(options["bucket_days"] * 86400)
+        except ValueError as e:
+            raise CommandError(e)
+        console.rule("[bold blue]Partitioned test_data")
+        partitioned = run_benchmarks("Partitioned", "time_window", **bench_options)
+
+        compare_results(flat, partitioned, names=("Unpartitioned", "Partitioned"))
+        report_pruning(partitioned, len(partition_names("test_data")))
+        print_footprint(before, title="Footprint before partitioning")
+        print_footprint(
+            table_footprint(["test_data"]), title="Footprint after partitioning"
+        )
+
+        if options["purge"]:
+            console.rule("[bold blue]Purging old data")
+            purge_benchmark(table="test_data")
+        console.print(
+            "[green]test_data is now partitioned by order_date; "
+            "--unpartition restores it.[/green]"
+        )
@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from benchmark.pooled_mysql.base import DatabaseWrapper
+from benchmark.pooled_mysql.pool import DEFAULTS, close_pools
+from benchmark.utils import summarize
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def _requests(settings_dict, alias, sql, deadline):
+    # Each iteration is one "request" as Django serves it with CONN_MAX_AGE=0:
+    # connect on first query, run it, close when the request finishes.
+    db = DatabaseWrapper(settings_dict, alias)
+    connect_ms, request_ms = [], []
+    while time.monotonic() < deadline:
+        started = time.perf_counter_ns()
+        db.ensure_connection()
+        connected = time.perf_counter_ns()
+        with db.cursor() as cursor:
+            cursor.execute(sql)
+            cursor.fetchall()
+        db.close()
+        finished = time.perf_counter_ns()
+        connect_ms.append((connected - started) / 1_000_000)
+        request_ms.append((finished - started) / 1_000_000)
+    return connect_ms, request_ms
+
+
+def run_connection_load(settings_dict, alias, concurrency, duration, sql):
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(
+            executor.map(
+                lambda _: _requests(settings_dict, alias, sql, deadline),
+                range(concurrency),
+            )
+        )
+    elapsed = time.monotonic() - started
+    connect_ms = [s for samples, _ in outcomes for s in samples]
+    request_ms = [s for _, samples in outcomes for s in samples]
+    return {
+        "requests": len(request_ms),
+        "rps": round(len(request_ms) / elapsed, 1),
+        "connect": summarize(connect_ms),
+        "request": summarize(request_ms),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare per-request connect latency and throughput with and without pooling"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            default="1,8,32",
+            help="Comma-separated numbers of concurrent request threads",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=5, help="Seconds per measurement"
+        )
+        parser.add_argument(
+            "--pool-size", type=int, default=DEFAULTS["max_size"], help="Pool max_size"
+        )
+        parser.add_argument(
+            "--sql",
+            default="SELECT 1",
+            help="Query each request runs; the default isolates connection cost",
+        )
+
+    def handle(self, *args, **options):
+        base = connection.settings_dict
+        pool_options = base["OPTIONS"].get("pool")
+        pool_options = pool_options if isinstance(pool_options, dict) else {}
+        modes = {
+            "direct": {**base, "OPTIONS": {**base["OPTIONS"], "pool": False}},
+            "pooled": {
+                **base,
+                "OPTIONS": {
+                    **base["OPTIONS"],
+                    "pool": {**pool_options, "max_size": options["pool_size"]},
+                },
+            },
+        }
+
+        table = Table(title=f"Connection pooling ({options['sql']})")
+        table.add_column("Mode")
+        table.add_column("Threads", justify="right")
+        table.add_column("Requests/sec", justify="right")
+        for column in ["Connect p50", "Connect p95", "Request p50", "Request p95"]:
+            table.add_column(f"{column} (ms)", justify="right")
+
+        for concurrency in [int(c) for c in options["concurrency"].split(",")]:
+            for mode, settings_dict in modes.items():
+                console.print(f"[bold]{mode} × {concurrency} threads...[/bold]")
+                result = run_connection_load(
+                    settings_dict,
+                    f"pool_benchmark_{mode}",
+                    concurrency,
+                    options["duration"],
+                    options["sql"],
+                )
+                table.add_row(
+                    mode,
+                    str(concurrency),
+                    f"{result['rps']:,.0f}",
+                    str(result["connect"]["p50_ms"]),
+                    str(result["connect"]["p95_ms"]),
+                    str(result["request"]["p50_ms"]),
+                    str(result["request"]["p95_ms"]),
+                )
+        close_pools()
+        console.print(table)
@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.datagen import ENGINES
+from benchmark.history import METRICS
+from benchmark.scale import DEFAULT_SIZES, print_sweep, run_sweep, write_sweep_charts
+from benchmark.workloads import INDEX_SETS, WORKLOADS, get_workload
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Grow test_data through a series of row counts and benchmark the "
+        "workload under each index set at every size"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default=",".join(str(size) for size in DEFAULT_SIZES),
+            help="Comma-separated row counts to measure at",
+        )
+        parser.add_argument(
+            "--workload",
+            choices=sorted(WORKLOADS),
+            default="default",
+            help="Workload to run; it should query test_data",
+        )
+        parser.add_argument(
+            "--index-set",
+            action="append",
+            choices=sorted(INDEX_SETS),
+            help="Index set to measure (repeatable, default: the workload's "
+            "candidate index sets)",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Truncate test_data first instead of growing the current table",
+        )
+        parser.add_argument("--engine", choices=sorted(ENGINES), default="numpy")
+        parser.add_argument("--loader", choices=["orm", "infile"], default="orm")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--shard-size", type=int, default=10000)
+        parser.add_argument("--relax-checks", action="store_true")
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument("--cache", choices=["warm", "cold"], default="warm")
+        parser.add_argument("--metric", choices=METRICS, default="p50_ms")
+        parser.add_argument(
+            "--chart-dir", help="Where to write the charts (default: settings)"
+        )
+        parser.add_argument(
+            "--no-history",
+            action="store_true",
+            help="Don't record the runs in the benchmark history",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError(f"Invalid --sizes {options['sizes']!r}")
+        workload = options["workload"]
+        index_sets = options["index_set"] or get_workload(workload)["index_sets"]
+        load_options = {
+            "seed": options["seed"],
+            "batch_size": options["batch_size"]
+            or (50000 if options["loader"] == "infile" else 1000),
+            "shard_size": options["shard_size"],
+            "workers": options["workers"],
+            "engine": options["engine"],
+            "loader": options["loader"],
+            "relax_checks": options["relax_checks"],
+        }
+
+        sweep = run_sweep(
+            sizes,
+            index_sets,
+            workload,
+            reset=options["reset"],
+            record=not options["no_history"],
+            load_options=load_options,
+            warmup=options["warmup"],
+            iterations=options["iterations"],
+            cache=options["cache"],
+        )
+        print_sweep(sweep, options["metric"])
+        for path in write_sweep_charts(
+            sweep, workload, options["chart_dir"], options["metric"]
+        ):
+            console.print(f"[green]Chart written to {path}[/green]")
@@ -0,0 +1,127 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.datagen import ENGINES, reset_layout
+from benchmark.distributions import HOT_KEYS, make_distribution
+from benchmark.explain import diff_plans
+from benchmark.scale import grow_to
+from benchmark.stats import (
+    DEFAULT_BUCKETS,
+    drop_histograms,
+    histogram_summary,
+    print_estimates,
+    print_histograms,
+    update_statistics,
+)
+from benchmark.utils import (
+    compare_results,
+    drop_indexes,
+    run_benchmarks,
+    setup_indexes,
+)
+from benchmark.workloads import INDEX_SETS, WORKLOADS
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare plans and latency on uniform and skewed data, with and "
+        "without optimizer histograms"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000000)
+        parser.add_argument("--workload", choices=sorted(WORKLOADS), default="default")
+        parser.add_argument(
+            "--index-set", choices=sorted(INDEX_SETS), default="baseline"
+        )
+        parser.add_argument("--skew", type=float, default=1.1)
+        parser.add_argument("--hot-keys", default=",".join(HOT_KEYS))
+        parser.add_argument(
+            "--no-correlate",
+            action="store_true",
+            help="Keep price, rating and status independent in the skewed data",
+        )
+        parser.add_argument("--null-rate", type=float, default=0.1)
+        parser.add_argument(
+            "--skewed-only",
+            action="store_true",
+            help="Skip the uniform dataset and only measure the skewed one",
+        )
+        parser.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS)
+        parser.add_argument("--engine", choices=sorted(ENGINES), default="numpy")
+        parser.add_argument("--loader", choices=["orm", "infile"], default="orm")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            skewed = make_distribution(
+                options["skew"],
+                options["hot_keys"].split(","),
+                not options["no_correlate"],
+                options["null_rate"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        datasets = [("Skewed", skewed)]
+        if not options["skewed_only"]:
+            datasets.insert(0, ("Uniform", None))
+
+        load_options = {
+            "seed": options["seed"],
+            "batch_size": 50000 if options["loader"] == "infile" else 1000,
+            "workers": options["workers"],
+            "engine": options["engine"],
+            "loader": options["loader"],
+        }
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+            "explain": True,
+        }
+
+        runs = {}
+        for name, distribution in datasets:
+            console.rule(f"[bold blue]Loading {options['rows']:,} {name.lower()} rows")
+            drop_indexes()
+            reset_layout("wide")
+            grow_to(options["rows"], distribution=distribution, **load_options)
+            setup_indexes(options["index_set"])
+
+            console.rule(f"[bold blue]{name} data without histograms")
+            drop_histograms()
+            update_statistics(histograms=False)
+            plain = run_benchmarks(
+                f"{name}, no histograms", options["workload"], **bench_options
+            )
+
+            console.rule(f"[bold blue]{name} data with histograms")
+            update_statistics(buckets=options["buckets"])
+            print_histograms(histogram_summary())
+            histograms = run_benchmarks(
+                f"{name}, histograms", options["workload"], **bench_options
+            )
+
+            names = (f"{name} plain", f"{name} histograms")
+            compare_results(plain, histograms, names=names)
+            diff_plans(plain, histograms, names=names)
+            print_estimates(plain, histograms, names=("plain", "histograms"))
+            runs[name] = {"plain": plain, "histograms": histograms}
+        drop_indexes()
+
+        if "Uniform" in runs:
+            console.rule("[bold blue]Uniform vs skewed")
+            for mode in ["plain", "histograms"]:
+                compare_results(
+                    runs["Uniform"][mode],
+                    runs["Skewed"][mode],
+                    names=(f"Uniform {mode}", f"Skewed {mode}"),
+                )
+                diff_plans(
+                    runs["Uniform"][mode],
+                    runs["Skewed"][mode],
+                    names=(f"Uniform {mode}", f"Skewed {mode}"),
+                )
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from benchmark.datagen import copy_wide_to_split
+from benchmark.footprint import cached_pages, print_footprint, table_footprint
+from benchmark.utils import (
+    compare_results,
+    drop_indexes,
+    run_benchmarks,
+    setup_indexes,
+)
+from rich.console import Console
+from tqdm import tqdm
+
+console = Console()
+
+TABLES = ["test_data", "test_data_hot", "test_data_cold"]
+
+
+class Command(BaseCommand):
+    help = "Compare the wide test_data table with the hot/cold split layout"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--populate",
+            action="store_true",
+            help="Refill the split tables from test_data before benchmarking",
+        )
+        parser.add_argument("--wide-index-set", default="baseline")
+        parser.add_argument("--split-index-set", default="split_baseline")
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument("--cache", choices=["warm", "cold"], default="cold")
+        parser.add_argument(
+            "--buffer-pages",
+            action="store_true",
+            help="Count each table's pages in the buffer pool after the run "
+            "(scans INNODB_BUFFER_PAGE, expensive on large servers)",
+        )
+
+    def handle(self, *args, **options):
+        if options["populate"]:
+            console.rule("[bold blue]Populating split layout from test_data")
+            progress = None
+            for done, total in copy_wide_to_split():
+                if progress is None:
+                    progress = tqdm(total=total, unit="order_id")
+                progress.update(done - progress.n)
+            if progress is not None:
+                progress.close()
+
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+            "cache": options["cache"],
+        }
+
+        drop_indexes()
+        setup_indexes(options["wide_index_set"])
+        setup_indexes(options["split_index_set"])
+
+        console.rule("[bold blue]Wide table")
+        wide = run_benchmarks("Wide test_data", "default", **bench_options)
+        console.rule("[bold blue]Hot/cold split")
+        split = run_benchmarks("Split test_data_hot", "split", **bench_options)
+
+        compare_results(wide, split, names=("Wide", "Split"))
+        cached = cached_pages(TABLES) if options["buffer_pages"] else None
+        print_footprint(table_footprint(TABLES), cached)
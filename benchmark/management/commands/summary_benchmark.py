@@ -0,0 +1,127 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from benchmark.datagen import build_row, ip_is_packed, pack_ip, shard_seed
+from benchmark.models import TestData
+from benchmark.summary import (
+    SUMMARY_TABLE,
+    maintenance,
+    print_write_cost,
+    rebuild_summary,
+    summary_enabled,
+    verify_summary,
+)
+from benchmark.utils import (
+    compare_results,
+    drop_indexes,
+    run_benchmarks,
+    setup_indexes,
+)
+from benchmark.workloads import INDEX_SETS
+from faker import Faker
+from rich.console import Console
+
+console = Console()
+
+
+def print_check(check, when):
+    if check["ok"]:
+        console.print(
+            f"[green]Summary matches the live query {when} "
+            f"({check['groups']} groups).[/green]"
+        )
+    else:
+        console.print(
+            f"[red]Warning:[/red] Summary differs from the live query {when}: "
+            f"{check['mismatched']} of {check['groups']} groups mismatched"
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        f"Answer Complex Query 1 from the {SUMMARY_TABLE} summary table and "
+        "compare it with the live GROUP BY"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Rebuild the summary from scratch (done anyway if it's missing)",
+        )
+        parser.add_argument(
+            "--index-set", choices=sorted(INDEX_SETS), default="baseline"
+        )
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument(
+            "--write-rows",
+            type=int,
+            default=1000,
+            help="Rows bulk-inserted with and without summary maintenance to "
+            "measure the write-path cost (0 to skip)",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not TestData.objects.exists():
+            raise CommandError("test_data is empty; run generate_data first")
+
+        if options["rebuild"] or not summary_enabled():
+            console.rule(f"[bold blue]Rebuilding {SUMMARY_TABLE}")
+            started = time.perf_counter()
+            rebuild_summary(TestData.objects.all())
+            console.print(f"Rebuilt in {time.perf_counter() - started:.2f}s")
+        print_check(verify_summary(TestData.objects.all()), "before benchmarking")
+
+        bench_options = {
+            "warmup": options["warmup"],
+            "iterations": options["iterations"],
+        }
+        drop_indexes()
+        setup_indexes(options["index_set"])
+        console.rule("[bold blue]Live GROUP BY")
+        live = run_benchmarks("Live query", "default", **bench_options)
+        console.rule("[bold blue]Summary table")
+        summary = run_benchmarks("Summary table", "summary", **bench_options)
+        compare_results(live, summary, names=("Live", "Summary"))
+
+        if options["write_rows"]:
+            console.rule("[bold blue]Write-path cost")
+            cost = self.write_cost(options["write_rows"], options["seed"])
+            print_write_cost(cost)
+            print_check(verify_summary(TestData.objects.all()), "after the writes")
+        drop_indexes()
+
+    def write_cost(self, rows, seed):
+        first_id = TestData.objects.aggregate(high=Max("order_id"))["high"] + 1
+        fake = Faker()
+        fake.seed_instance(shard_seed(seed, first_id))
+        batch = [build_row(fake, first_id + i) for i in range(rows)]
+        with connection.cursor() as cursor:
+            if ip_is_packed(cursor):
+                for row in batch:
+                    row["ip_address"] = pack_ip(row["ip_address"])
+        added = TestData.objects.filter(order_id__gte=first_id)
+
+        timings = {}
+        for key, enabled in [("off_ms", False), ("on_ms", True)]:
+            # Rows are deleted under the same setting they were inserted with,
+            # so the summary stays consistent.
+            with maintenance(enabled):
+                started = time.perf_counter()
+                TestData.objects.bulk_create(
+                    [TestData(**row) for row in batch], batch_size=1000
+                )
+                timings[key] = round((time.perf_counter() - started) * 1000, 2)
+                added.delete()
+
+        return {
+            "rows": rows,
+            **timings,
+            "overhead": (
+                timings["on_ms"] / timings["off_ms"] - 1 if timings["off_ms"] else 0
+            ),
+        }
@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand
+from benchmark.utils import drop_indexes, optimize_schema, setup_indexes
+from benchmark.workloads import INDEX_SETS
+from benchmark.writes import compare_writes, run_writes
+from rich.console import Console
+
+console = Console()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure insert, update and delete cost before and after the schema "
+        "optimization and each index set"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--index-set",
+            action="append",
+            choices=sorted(INDEX_SETS),
+            help="Index set to measure after optimize_schema (repeatable, "
+            "default baseline)",
+        )
+        parser.add_argument("--single-rows", type=int, default=500)
+        parser.add_argument("--batches", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--updates", type=int, default=500, help="Single-row updates per column"
+        )
+        parser.add_argument("--delete-batch", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", help="Write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        write_options = {
+            key: options[key]
+            for key in [
+                "single_rows",
+                "batches",
+                "batch_size",
+                "updates",
+                "delete_batch",
+                "seed",
+            ]
+        }
+        runs = {}
+
+        console.rule("[bold blue]Writes Before Optimization")
+        drop_indexes()
+        runs["Before"] = run_writes("Before Optimization", **write_options)
+
+        console.rule("[bold blue]Optimizing Schema")
+        optimize_schema()
+        for index_set in options["index_set"] or ["baseline"]:
+            console.rule(f"[bold blue]Writes with {index_set}")
+            drop_indexes()
+            setup_indexes(index_set)
+            runs[index_set] = run_writes(f"Optimized + {index_set}", **write_options)
+        drop_indexes()
+
+        compare_writes(runs)
+        if options["json"]:
+            with open(options["json"], "w") as f:
+                json.dump(runs, f, indent=2)
+            console.print(f"[green]Results written to {options['json']}[/green]")
@@ -0,0 +1,184 @@
+from rich.console import Console
+from rich.table import Table
+
+from benchmark.footprint import buffer_pool_counters
+
+console = Console()
+
+COLLECTORS = {}
+# Outermost first: snapshots are taken in this order before a query and in
+# reverse after it, so the last collector's window holds only the query.
+DEFAULT_COLLECTORS = ["buffer_pool", "session_status", "statement"]
+
+SESSION_COUNTERS = [
+    "Handler_read_first",
+    "Handler_read_key",
+    "Handler_read_last",
+    "Handler_read_next",
+    "Handler_read_prev",
+    "Handler_read_rnd",
+    "Handler_read_rnd_next",
+    "Created_tmp_tables",
+    "Created_tmp_disk_tables",
+    "Sort_merge_passes",
+    "Select_scan",
+    "Select_full_join",
+]
+
+
+def counter_delta(before, after):
+    return {name: after[name] - before.get(name, 0) for name in after}
+
+
+def register_collector(name, snapshot, delta=counter_delta, calibrate=True):
+    # snapshot(cursor) returns a dict of counters; delta(before, after) turns
+    # two snapshots into the metrics for the query between them. Collectors
+    # with calibrate=True have the cost of the other collectors' own
+    # statements measured once and subtracted.
+    COLLECTORS[name] = {
+        "name": name,
+        "snapshot": snapshot,
+        "delta": delta,
+        "calibrate": calibrate,
+    }
+
+
+def get_collector(name):
+    try:
+        return COLLECTORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown metrics collector {name!r}; choose from {sorted(COLLECTORS)}"
+        )
+
+
+def session_status(cursor):
+    placeholders = ", ".join(["%s"] * len(SESSION_COUNTERS))
+    cursor.execute(
+        f"SHOW SESSION STATUS WHERE variable_name IN ({placeholders})",
+        SESSION_COUNTERS,
+    )
+    return {name: int(value) for name, value in cursor.fetchall()}
+
+
+def has_statement_memory(cursor):
+    # MAX_TOTAL_MEMORY was added to the statement history in MySQL 8.0.31.
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = 'performance_schema' "
+        "AND table_name = 'events_statements_history' "
+        "AND column_name = 'MAX_TOTAL_MEMORY'"
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def last_statement_stats(cursor, with_memory=True):
+    # The newest entry in this thread's statement history is the statement
+    # that ran just before this lookup.
+    memory = "max_total_memory" if with_memory else "NULL"
+    cursor.execute(
+        f"""
+        SELECT rows_sent, rows_examined, created_tmp_disk_tables,
+               sort_merge_passes, {memory}
+        FROM performance_schema.events_statements_history
+        WHERE thread_id = PS_CURRENT_THREAD_ID()
+        ORDER BY event_id DESC
+        LIMIT 1
+        """
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return {}
+    rows_sent, rows_examined, tmp_disk_tables, merge_passes, memory_bytes = row
+    return {
+        "rows_sent": rows_sent,
+        "rows_examined": rows_examined,
+        "tmp_disk_tables": tmp_disk_tables,
+        "sort_merge_passes": merge_passes,
+        "memory_bytes": memory_bytes,
+    }
+
+
+def statement_stats(cursor):
+    return {
+        key: value
+        for key, value in last_statement_stats(cursor, with_memory=False).items()
+        if key in ("rows_sent", "rows_examined")
+    }
+
+
+register_collector("buffer_pool", buffer_pool_counters)
+register_collector("session_status", session_status)
+# The history row already describes just the last statement, so only the
+# snapshot taken right after the query counts.
+register_collector(
+    "statement", statement_stats, delta=lambda before, after: after, calibrate=False
+)
+
+
+def measure(cursor, collectors, run):
+    befores = [c["snapshot"](cursor) for c in collectors]
+    value = run()
+    afters = [None] * len(collectors)
+    for i in reversed(range(len(collectors))):
+        afters[i] = collectors[i]["snapshot"](cursor)
+    deltas = [
+        c["delta"](before, after)
+        for c, before, after in zip(collectors, befores, afters)
+    ]
+    return value, deltas
+
+
+def prepare_collectors(cursor, names=None):
+    # Collectors whose source is unavailable (e.g. performance_schema turned
+    # off) are dropped with a warning instead of failing the benchmark.
+    collectors = []
+    for name in DEFAULT_COLLECTORS if names is None else names:
+        collector = get_collector(name)
+        try:
+            collector["snapshot"](cursor)
+        except Exception as e:
+            console.print(f"[red]Warning:[/red] Skipping collector {name} — {e}")
+            continue
+        collectors.append(collector)
+    _, overhead = measure(cursor, collectors, lambda: None)
+    return collectors, overhead
+
+
+def corrected(collectors, deltas, overhead):
+    metrics = {}
+    for collector, delta, cost in zip(collectors, deltas, overhead):
+        for key, value in delta.items():
+            if value is None:
+                continue
+            if collector["calibrate"]:
+                value = max(value - cost.get(key, 0), 0)
+            metrics[key] = value
+    return metrics
+
+
+def print_counters(results, title="Server counters per run"):
+    # Counters are rows and queries are columns, so any number of collectors
+    # fits; counters that stayed at zero for every query are left out.
+    keys = []
+    for r in results:
+        for key in r.get("counters", {}):
+            if key not in keys:
+                keys.append(key)
+    keys = [k for k in keys if any(r.get("counters", {}).get(k) for r in results)]
+    if not keys:
+        return
+
+    table = Table(title=title)
+    table.add_column("Counter")
+    for r in results:
+        table.add_column(r["label"], justify="right")
+    for key in keys:
+        table.add_row(
+            key,
+            *(
+                f"{r['counters'][key]:,.1f}" if key in r.get("counters", {}) else "-"
+                for r in results
+            ),
+        )
+    console.print(table)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('benchmark', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelTable(
+            name='testdata',
+            table='test_data',
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('benchmark', '0002_alter_testdata_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderFact',
+            fields=[
+                ('order_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('user_id', models.IntegerField()),
+                ('product_id', models.IntegerField()),
+                ('product_name', models.CharField(max_length=255)),
+                ('category_id', models.IntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quantity', models.IntegerField()),
+                ('discount', models.FloatField()),
+                ('tax', models.FloatField()),
+                ('status', models.CharField(max_length=20)),
+                ('order_date', models.BigIntegerField()),
+                ('delivery_date', models.BigIntegerField()),
+                ('city', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=100)),
+                ('country_id', models.IntegerField()),
+                ('rating', models.FloatField()),
+                ('is_returned', models.BooleanField()),
+                ('platform', models.CharField(max_length=50)),
+                ('device_type', models.CharField(max_length=50)),
+                ('is_new_customer', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'test_data_hot',
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderAttributes',
+            fields=[
+                ('order', models.OneToOneField(db_column='order_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attributes', serialize=False, to='benchmark.orderfact')),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=50)),
+                ('customer_name', models.CharField(max_length=255)),
+                ('shipping_address', models.TextField()),
+                ('billing_address', models.TextField()),
+                ('notes', models.TextField()),
+                ('coupon_code', models.CharField(max_length=50)),
+                ('shipping_method', models.CharField(max_length=50)),
+                ('payment_method', models.CharField(max_length=50)),
+                ('invoice_number', models.CharField(max_length=50)),
+                ('gift_wrap', models.CharField(max_length=10)),
+                ('warehouse_id', models.IntegerField()),
+                ('batch_number', models.IntegerField()),
+                ('supplier_id', models.IntegerField()),
+                ('shipment_id', models.IntegerField()),
+                ('carrier_id', models.IntegerField()),
+                ('tracking_number', models.CharField(max_length=50)),
+                ('browser', models.CharField(max_length=50)),
+                ('os', models.CharField(max_length=50)),
+                ('os_version', models.IntegerField()),
+                ('ip_address', models.CharField(max_length=50)),
+                ('user_agent', models.TextField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('timezone', models.CharField(max_length=100)),
+                ('campaign_name', models.CharField(max_length=255)),
+                ('referral_source', models.CharField(max_length=255)),
+                ('session_id', models.CharField(max_length=50)),
+                ('page_views', models.IntegerField()),
+                ('clicks', models.IntegerField()),
+                ('impressions', models.IntegerField()),
+                ('conversion_rate', models.FloatField()),
+                ('avg_order_value', models.FloatField()),
+                ('lifetime_value', models.FloatField()),
+                ('loyalty_points', models.IntegerField()),
+                ('membership_level', models.CharField(max_length=50)),
+                ('age', models.IntegerField()),
+                ('occupation', models.CharField(max_length=100)),
+                ('education_level', models.CharField(max_length=50)),
+                ('income_range', models.CharField(max_length=50)),
+                ('marital_status', models.CharField(max_length=50)),
+                ('preferred_language', models.CharField(max_length=100)),
+                ('custom_field_1', models.CharField(max_length=100)),
+                ('custom_field_2', models.CharField(max_length=100)),
+                ('custom_field_3', models.CharField(max_length=100)),
+                ('custom_field_4', models.CharField(max_length=100)),
+            ],
+            options={
+                'db_table': 'test_data_cold',
+            },
+        ),
+    ]
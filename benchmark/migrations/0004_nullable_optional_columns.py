@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('benchmark', '0003_split_hot_cold'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderattributes',
+            name='coupon_code',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='orderattributes',
+            name='referral_source',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='testdata',
+            name='coupon_code',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='testdata',
+            name='referral_source',
+            field=models.CharField(max_length=255, null=True),
+        ),
+    ]
@@ -1,7 +1,73 @@
 from django.db import models
 
+from benchmark.cache import bump_table_version
+from benchmark.summary import apply_delta, maintains, reset_summary
 
-class TestData(models.Model):
+
+# Bulk operations bypass the model signals, so they bump the table's result
+# cache version and maintain the summary table themselves.
+class VersionedQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if maintains(self.model):
+            apply_delta(self.model.objects.filter(pk__in=[o.pk for o in created]))
+        bump_table_version(self.model._meta.db_table)
+        return created
+
+    def bulk_update(self, objs, *args, **kwargs):
+        affected = self.model.objects.filter(pk__in=[o.pk for o in objs])
+        summarized = maintains(self.model)
+        if summarized:
+            apply_delta(affected, sign=-1)
+        updated = super().bulk_update(objs, *args, **kwargs)
+        if summarized:
+            apply_delta(affected)
+        bump_table_version(self.model._meta.db_table)
+        return updated
+
+    def update(self, **kwargs):
+        summarized = maintains(self.model)
+        if summarized:
+            # The update may move rows out of the filter, so the affected
+            # rows are pinned by primary key before it runs.
+            affected = self.model.objects.filter(
+                pk__in=list(self.values_list("pk", flat=True))
+            )
+            apply_delta(affected, sign=-1)
+        updated = super().update(**kwargs)
+        if summarized:
+            apply_delta(affected)
+        bump_table_version(self.model._meta.db_table)
+        return updated
+
+    def delete(self):
+        if maintains(self.model):
+            if self.query.has_filters():
+                apply_delta(self, sign=-1)
+            else:
+                reset_summary()
+        deleted = super().delete()
+        bump_table_version(self.model._meta.db_table)
+        return deleted
+
+
+class VersionedModel(models.Model):
+    objects = VersionedQuerySet.as_manager()
+
+    # A post_delete receiver would disable Django's fast-delete path (every
+    # row gets fetched first), so deletes bump the version here instead.
+    def delete(self, *args, **kwargs):
+        if maintains(type(self)):
+            apply_delta(type(self).objects.filter(pk=self.pk), sign=-1)
+        deleted = super().delete(*args, **kwargs)
+        bump_table_version(self._meta.db_table)
+        return deleted
+
+    class Meta:
+        abstract = True
+
+
+class TestData(VersionedModel):
     order_id = models.IntegerField(primary_key=True)
     user_id = models.IntegerField()
     product_id = models.IntegerField()
@@ -27,7 +93,7 @@ class TestData(models.Model):
     platform = models.CharField(max_length=50)
     device_type = models.CharField(max_length=50)
     notes = models.TextField()
-    coupon_code = models.CharField(max_length=50)
+    coupon_code = models.CharField(max_length=50, null=True)
     shipping_method = models.CharField(max_length=50)
     payment_method = models.CharField(max_length=50)
     invoice_number = models.CharField(max_length=50)
@@ -41,13 +107,15 @@ class TestData(models.Model):
     browser = models.CharField(max_length=50)
     os = models.CharField(max_length=50)
     os_version = models.IntegerField()
+    # compact_schema turns the column into an INT UNSIGNED that this field
+    # doesn't describe: ORM writes must store datagen.pack_ip() numbers then.
     ip_address = models.CharField(max_length=50)
     user_agent = models.TextField()
     latitude = models.FloatField()
     longitude = models.FloatField()
     timezone = models.CharField(max_length=100)
     campaign_name = models.CharField(max_length=255)
-    referral_source = models.CharField(max_length=255)
+    referral_source = models.CharField(max_length=255, null=True)
     session_id = models.CharField(max_length=50)
     page_views = models.IntegerField()
     clicks = models.IntegerField()
@@ -68,3 +136,94 @@ class TestData(models.Model):
     custom_field_2 = models.CharField(max_length=100)
     custom_field_3 = models.CharField(max_length=100)
     custom_field_4 = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = "test_data"
+
+
+# Vertical partitioning of TestData: the columns the workload filters, groups
+# and aggregates on live in a narrow "hot" table, the rest in a 1:1 "cold"
+# table keyed by order_id.
+class OrderFact(VersionedModel):
+    order_id = models.IntegerField(primary_key=True)
+    user_id = models.IntegerField()
+    product_id = models.IntegerField()
+    product_name = models.CharField(max_length=255)
+    category_id = models.IntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.IntegerField()
+    discount = models.FloatField()
+    tax = models.FloatField()
+    status = models.CharField(max_length=20)
+    order_date = models.BigIntegerField()
+    delivery_date = models.BigIntegerField()
+    city = models.CharField(max_length=100)
+    state = models.CharField(max_length=100)
+    country_id = models.IntegerField()
+    rating = models.FloatField()
+    is_returned = models.BooleanField()
+    platform = models.CharField(max_length=50)
+    device_type = models.CharField(max_length=50)
+    is_new_customer = models.BooleanField()
+
+    class Meta:
+        db_table = "test_data_hot"
+
+
+class OrderAttributes(VersionedModel):
+    order = models.OneToOneField(
+        OrderFact,
+        primary_key=True,
+        db_column="order_id",
+        on_delete=models.CASCADE,
+        related_name="attributes",
+    )
+    email = models.EmailField()
+    phone = models.CharField(max_length=50)
+    customer_name = models.CharField(max_length=255)
+    shipping_address = models.TextField()
+    billing_address = models.TextField()
+    notes = models.TextField()
+    coupon_code = models.CharField(max_length=50, null=True)
+    shipping_method = models.CharField(max_length=50)
+    payment_method = models.CharField(max_length=50)
+    invoice_number = models.CharField(max_length=50)
+    gift_wrap = models.CharField(max_length=10)
+    warehouse_id = models.IntegerField()
+    batch_number = models.IntegerField()
+    supplier_id = models.IntegerField()
+    shipment_id = models.IntegerField()
+    carrier_id = models.IntegerField()
+    tracking_number = models.CharField(max_length=50)
+    browser = models.CharField(max_length=50)
+    os = models.CharField(max_length=50)
+    os_version = models.IntegerField()
+    ip_address = models.CharField(max_length=50)
+    user_agent = models.TextField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    timezone = models.CharField(max_length=100)
+    campaign_name = models.CharField(max_length=255)
+    referral_source = models.CharField(max_length=255, null=True)
+    session_id = models.CharField(max_length=50)
+    page_views = models.IntegerField()
+    clicks = models.IntegerField()
+    impressions = models.IntegerField()
+    conversion_rate = models.FloatField()
+    avg_order_value = models.FloatField()
+    lifetime_value = models.FloatField()
+    loyalty_points = models.IntegerField()
+    membership_level = models.CharField(max_length=50)
+    age = models.IntegerField()
+    occupation = models.CharField(max_length=100)
+    education_level = models.CharField(max_length=50)
+    income_range = models.CharField(max_length=50)
+    marital_status = models.CharField(max_length=50)
+    preferred_language = models.CharField(max_length=100)
+    custom_field_1 = models.CharField(max_length=100)
+    custom_field_2 = models.CharField(max_length=100)
+    custom_field_3 = models.CharField(max_length=100)
+    custom_field_4 = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = "test_data_cold"
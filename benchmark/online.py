@@ -0,0 +1,288 @@
+import time
+
+from django.db import connection
+from rich.console import Console
+from tqdm import tqdm
+
+console = Console()
+
+STATE_TABLE = "_online_schema_change"
+
+# ER_ALTER_OPERATION_NOT_SUPPORTED and ER_ALTER_OPERATION_NOT_SUPPORTED_REASON.
+UNSUPPORTED_ALTER = (1845, 1846)
+# ER_LOCK_WAIT_TIMEOUT, raised when the cutover can't get the metadata lock.
+LOCK_WAIT_TIMEOUT = 1205
+
+
+def try_native_alter(cursor, table, clause):
+    for algorithm, lock in [("INSTANT", ""), ("INPLACE", ", LOCK=NONE")]:
+        try:
+            cursor.execute(
+                f"ALTER TABLE {table} {clause}, ALGORITHM={algorithm}{lock}"
+            )
+            return algorithm
+        except Exception as e:
+            if not e.args or e.args[0] not in UNSUPPORTED_ALTER:
+                raise
+            console.print(f"[yellow]ALGORITHM={algorithm} not possible:[/yellow] {e}")
+    return None
+
+
+def _global_status(cursor, name):
+    cursor.execute("SHOW GLOBAL STATUS LIKE %s", [name])
+    row = cursor.fetchone()
+    return int(row[1]) if row else 0
+
+
+def _copy_columns(cursor, table, shadow):
+    # Generated columns are computed by the server and can't be written.
+    cursor.execute(
+        """
+        SELECT column_name, table_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name IN (%s, %s)
+          AND extra NOT LIKE '%%GENERATED%%'
+        ORDER BY ordinal_position
+        """,
+        [table, shadow],
+    )
+    rows = cursor.fetchall()
+    in_shadow = {column for column, owner in rows if owner == shadow}
+    return [
+        column for column, owner in rows if owner == table and column in in_shadow
+    ]
+
+
+def _table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        [table],
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def _load_state(cursor, table):
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            table_name VARCHAR(64) PRIMARY KEY,
+            clause TEXT NOT NULL,
+            last_id BIGINT NOT NULL,
+            max_id BIGINT NOT NULL,
+            copied BIGINT NOT NULL,
+            updated_at TIMESTAMP
+                DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+        """
+    )
+    cursor.execute(
+        f"SELECT clause, last_id, max_id, copied FROM {STATE_TABLE} "
+        "WHERE table_name = %s",
+        [table],
+    )
+    return cursor.fetchone()
+
+
+def _select_list(columns, transforms, prefix=""):
+    # A transform is an SQL template such as "INET_ATON({})" that rewrites a
+    # column's value on its way into the shadow table.
+    return ", ".join(transforms.get(c, "{}").format(f"{prefix}`{c}`") for c in columns)
+
+
+def pending_change(table):
+    # The clause of an interrupted shadow copy of the table, if any.
+    with connection.cursor() as cursor:
+        state = _load_state(cursor, table)
+    return state[0] if state else None
+
+
+def _create_triggers(cursor, table, shadow, pk, columns, transforms):
+    cursor.execute(
+        "SELECT trigger_name FROM information_schema.triggers "
+        "WHERE trigger_schema = DATABASE() AND event_object_table = %s",
+        [table],
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    new_values = _select_list(columns, transforms, "NEW.")
+    triggers = {
+        f"{shadow}_ins": (
+            "AFTER INSERT",
+            f"REPLACE INTO {shadow} ({column_list}) VALUES ({new_values})",
+        ),
+        f"{shadow}_upd": (
+            "AFTER UPDATE",
+            f"BEGIN DELETE FROM {shadow} WHERE `{pk}` = OLD.`{pk}`; "
+            f"REPLACE INTO {shadow} ({column_list}) VALUES ({new_values}); END",
+        ),
+        f"{shadow}_del": (
+            "AFTER DELETE",
+            f"DELETE FROM {shadow} WHERE `{pk}` = OLD.`{pk}`",
+        ),
+    }
+    for name, (timing, body) in triggers.items():
+        if name not in existing:
+            cursor.execute(
+                f"CREATE TRIGGER {name} {timing} ON {table} FOR EACH ROW {body}"
+            )
+
+
+def _finish_cutover(cursor, table):
+    # The old table takes its triggers with it when dropped.
+    cursor.execute(f"DROP TABLE IF EXISTS _{table}_old")
+    cursor.execute(f"DELETE FROM {STATE_TABLE} WHERE table_name = %s", [table])
+
+
+def _cutover(cursor, table, shadow, retries, lock_wait_timeout):
+    old = f"_{table}_old"
+    cursor.execute(f"SET SESSION lock_wait_timeout = {lock_wait_timeout}")
+    waited = 0.0
+    try:
+        for attempt in range(1, retries + 1):
+            started = time.perf_counter()
+            try:
+                cursor.execute(f"RENAME TABLE {table} TO {old}, {shadow} TO {table}")
+                waited += time.perf_counter() - started
+                break
+            except Exception as e:
+                waited += time.perf_counter() - started
+                if not e.args or e.args[0] != LOCK_WAIT_TIMEOUT or attempt == retries:
+                    raise
+                console.print(
+                    f"[yellow]Cutover lock wait timed out (attempt {attempt}), "
+                    "retrying...[/yellow]"
+                )
+    finally:
+        # Pooled connections keep their session, so the short timeout must not
+        # outlive the cutover.
+        cursor.execute("SET SESSION lock_wait_timeout = DEFAULT")
+    _finish_cutover(cursor, table)
+    return waited
+
+
+def shadow_copy(
+    table,
+    clause,
+    pk="order_id",
+    chunk_size=10000,
+    throttle=0.0,
+    retries=10,
+    lock_wait_timeout=5,
+    transforms=None,
+):
+    shadow = f"_{table}_new"
+    transforms = transforms or {}
+    with connection.cursor() as cursor:
+        state = _load_state(cursor, table)
+        if state and state[0] != clause:
+            raise RuntimeError(
+                f"An unfinished online change of {table} ({state[0]!r}) is "
+                "pending; finish or drop it before starting another"
+            )
+
+        if state and not _table_exists(cursor, shadow):
+            # The state row is only written once the shadow table exists, and
+            # RENAME TABLE is atomic: a missing shadow means the last run
+            # crashed after the cutover, before the cleanup.
+            console.print(f"[bold]Completing the interrupted cutover of {table}[/bold]")
+            _finish_cutover(cursor, table)
+            return {"method": "shadow-copy", "rows_copied": state[3]}
+
+        if state:
+            _, last_id, max_id, copied = state
+            console.print(
+                f"[bold]Resuming shadow copy of {table} after {pk}={last_id}[/bold]"
+            )
+            columns = _copy_columns(cursor, table, shadow)
+            _create_triggers(cursor, table, shadow, pk, columns, transforms)
+        else:
+            # Triggers left by a run that died before saving its state would
+            # point at the shadow table we're about to drop.
+            for suffix in ["ins", "upd", "del"]:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {shadow}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+            cursor.execute(f"CREATE TABLE {shadow} LIKE {table}")
+            cursor.execute(f"ALTER TABLE {shadow} {clause}")
+            columns = _copy_columns(cursor, table, shadow)
+            # The triggers go in before the copy bounds are read, so a row
+            # written past max_id in between still reaches the shadow table.
+            # Chunks use INSERT IGNORE and keep any row a trigger already
+            # wrote, which is the newer version.
+            _create_triggers(cursor, table, shadow, pk, columns, transforms)
+            cursor.execute(
+                f"SELECT COALESCE(MIN({pk}) - 1, 0), COALESCE(MAX({pk}), 0) "
+                f"FROM {table}"
+            )
+            last_id, max_id = cursor.fetchone()
+            copied = 0
+            cursor.execute(
+                f"INSERT INTO {STATE_TABLE} "
+                "(table_name, clause, last_id, max_id, copied) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [table, clause, last_id, max_id, copied],
+            )
+
+        column_list = ", ".join(f"`{c}`" for c in columns)
+        select_list = _select_list(columns, transforms)
+        lock_time_before = _global_status(cursor, "Innodb_row_lock_time")
+        started = time.perf_counter()
+        copied_this_run = 0
+
+        progress = tqdm(total=max_id, initial=last_id, unit=pk, desc=table)
+        while last_id < max_id:
+            upper = min(last_id + chunk_size, max_id)
+            cursor.execute(
+                f"INSERT IGNORE INTO {shadow} ({column_list}) "
+                f"SELECT {select_list} FROM {table} "
+                f"WHERE {pk} > %s AND {pk} <= %s LOCK IN SHARE MODE",
+                [last_id, upper],
+            )
+            copied_this_run += cursor.rowcount
+            copied += cursor.rowcount
+            progress.update(upper - last_id)
+            last_id = upper
+            cursor.execute(
+                f"UPDATE {STATE_TABLE} SET last_id = %s, copied = %s "
+                "WHERE table_name = %s",
+                [last_id, copied, table],
+            )
+
+            elapsed = time.perf_counter() - started
+            progress.set_postfix(rows_per_sec=f"{copied_this_run / elapsed:,.0f}")
+            if throttle:
+                time.sleep(throttle)
+        progress.close()
+
+        copy_seconds = time.perf_counter() - started
+        cutover_wait = _cutover(cursor, table, shadow, retries, lock_wait_timeout)
+        lock_wait_ms = (
+            _global_status(cursor, "Innodb_row_lock_time") - lock_time_before
+        )
+
+    return {
+        "method": "shadow-copy",
+        "rows_copied": copied,
+        "copy_seconds": round(copy_seconds, 2),
+        "rows_per_sec": round(copied_this_run / max(copy_seconds, 1e-9), 1),
+        "row_lock_wait_ms": lock_wait_ms,
+        "cutover_wait_ms": round(cutover_wait * 1000, 2),
+    }
+
+
+def online_alter(table, clause, **copy_options):
+    with connection.cursor() as cursor:
+        pending = _load_state(cursor, table)
+        if not pending:
+            started = time.perf_counter()
+            algorithm = try_native_alter(cursor, table, clause)
+            if algorithm:
+                report = {
+                    "method": f"ALGORITHM={algorithm}",
+                    "seconds": round(time.perf_counter() - started, 2),
+                }
+                console.print(f"[green]{clause}: {report}[/green]")
+                return report
+
+    report = shadow_copy(table, clause, **copy_options)
+    console.print(f"[green]{clause}: {report}[/green]")
+    return report
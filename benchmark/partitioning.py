@@ -0,0 +1,215 @@
+import time
+
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+PARTITIONED_TABLE = "test_data_partitioned"
+
+
+def partition_bounds(min_ts, max_ts, bucket_seconds):
+    # Buckets are aligned to multiples of the bucket size so that the same
+    # data always produces the same partition names. The last bound lies
+    # above max_ts, so existing rows never land in pmax.
+    first = (min_ts // bucket_seconds + 1) * bucket_seconds
+    return list(range(first, max_ts + bucket_seconds + 1, bucket_seconds))
+
+
+def partition_clause(bounds):
+    parts = [f"PARTITION p{bound} VALUES LESS THAN ({bound})" for bound in bounds]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return "PARTITION BY RANGE (order_date) (\n    " + ",\n    ".join(parts) + "\n)"
+
+
+def _date_range(cursor, table):
+    cursor.execute(
+        f"SELECT MIN(order_date), MAX(order_date), COALESCE(MAX(order_id), 0) "
+        f"FROM {table}"
+    )
+    min_ts, max_ts, max_id = cursor.fetchone()
+    if min_ts is None:
+        raise ValueError(f"{table} is empty; generate data first")
+    return min_ts, max_ts, max_id
+
+
+def _base_columns(cursor, table):
+    # Generated columns are computed by the server and can't be written.
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s "
+        "AND extra NOT LIKE '%%GENERATED%%' ORDER BY ordinal_position",
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _column_definitions(cursor, table):
+    cursor.execute(
+        "SELECT column_name, column_type, generation_expression "
+        "FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s "
+        "ORDER BY ordinal_position",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _secondary_indexes(cursor, table):
+    cursor.execute(
+        "SELECT DISTINCT index_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s "
+        "AND index_name <> 'PRIMARY'",
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def copy_is_stale(source="test_data", table=PARTITIONED_TABLE):
+    # The copy must have the same columns as its source, or the comparison
+    # measures a schema difference instead of partitioning.
+    with connection.cursor() as cursor:
+        columns = _column_definitions(cursor, source)
+        return columns != _column_definitions(cursor, table)
+
+
+def create_partitioned_table(
+    bucket_seconds, source="test_data", table=PARTITIONED_TABLE, chunk_size=50000
+):
+    with connection.cursor() as cursor:
+        min_ts, max_ts, max_id = _date_range(cursor, source)
+        bounds = partition_bounds(min_ts, max_ts, bucket_seconds)
+
+        console.print(
+            f"[bold]Creating {table} with {len(bounds) + 1} partitions...[/bold]"
+        )
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TABLE {table} LIKE {source}")
+        # LIKE also copies whatever secondary indexes the source has right now.
+        # The copy keeps only its primary key, so both tables get exactly the
+        # registered index set under test.
+        changes = [f"DROP INDEX `{name}`" for name in _secondary_indexes(cursor, table)]
+        # Every unique key of a partitioned table must contain the partitioning
+        # column, so order_date joins the primary key.
+        changes += ["DROP PRIMARY KEY", "ADD PRIMARY KEY (order_id, order_date)"]
+        cursor.execute(f"ALTER TABLE {table} {', '.join(changes)}")
+        cursor.execute(f"ALTER TABLE {table} {partition_clause(bounds)}")
+
+        column_list = ", ".join(f"`{c}`" for c in _base_columns(cursor, source))
+        for start in range(0, max_id, chunk_size):
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT {column_list} FROM {source} "
+                "WHERE order_id > %s AND order_id <= %s",
+                [start, start + chunk_size],
+            )
+    return bounds
+
+
+def partition_in_place(bucket_seconds, table="test_data"):
+    # The opt-in schema mode: the table itself is rebuilt RANGE-partitioned,
+    # keeping its columns and secondary indexes.
+    with connection.cursor() as cursor:
+        min_ts, max_ts, _ = _date_range(cursor, table)
+        bounds = partition_bounds(min_ts, max_ts, bucket_seconds)
+        console.print(
+            f"[bold]Partitioning {table} into {len(bounds) + 1} partitions...[/bold]"
+        )
+        cursor.execute(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, "
+            f"ADD PRIMARY KEY (order_id, order_date) {partition_clause(bounds)}"
+        )
+    return bounds
+
+
+def remove_partitioning(table="test_data"):
+    with connection.cursor() as cursor:
+        console.print(f"[bold]Removing the partitioning of {table}...[/bold]")
+        cursor.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+        cursor.execute(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (order_id)"
+        )
+
+
+def partition_names(table=PARTITIONED_TABLE):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT partition_name FROM information_schema.partitions
+            WHERE table_schema = DATABASE() AND table_name = %s
+              AND partition_name IS NOT NULL
+            ORDER BY partition_ordinal_position
+            """,
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def report_pruning(results, total_partitions):
+    table = Table(title="Partition Pruning")
+    table.add_column("Query")
+    table.add_column("Partitions scanned", justify="right")
+    table.add_column("Pruned", justify="right")
+    table.add_column("Partitions")
+    pruning = {}
+    for r in results:
+        scanned = set()
+        for t in r["plan"]["summary"]["tables"]:
+            scanned.update(t["partitions"] or [])
+        pruning[r["label"]] = sorted(scanned)
+        pruned = 1 - len(scanned) / total_partitions if total_partitions else 0
+        listed = ", ".join(sorted(scanned)[:6]) + ("..." if len(scanned) > 6 else "")
+        table.add_row(
+            r["label"], f"{len(scanned)}/{total_partitions}", f"{pruned:.0%}", listed
+        )
+    console.print(table)
+    return pruning
+
+
+def purge_benchmark(source="test_data", table=PARTITIONED_TABLE):
+    # Both purges run on scratch copies so the benchmark tables stay intact.
+    flat, partitioned = "_purge_flat", "_purge_partitioned"
+    names = partition_names(table)
+    oldest = names[0]
+    bound = int(oldest[1:])
+
+    with connection.cursor() as cursor:
+        for scratch, origin in [(flat, source), (partitioned, table)]:
+            cursor.execute(f"DROP TABLE IF EXISTS {scratch}")
+            cursor.execute(f"CREATE TABLE {scratch} LIKE {origin}")
+            if scratch == flat and partition_names(origin):
+                # With test_data partitioned in place, the DELETE side of the
+                # comparison still needs a plain table.
+                cursor.execute(f"ALTER TABLE {flat} REMOVE PARTITIONING")
+            column_list = ", ".join(f"`{c}`" for c in _base_columns(cursor, origin))
+            cursor.execute(
+                f"INSERT INTO {scratch} ({column_list}) "
+                f"SELECT {column_list} FROM {origin}"
+            )
+
+        started = time.perf_counter()
+        cursor.execute(f"DELETE FROM {flat} WHERE order_date < %s", [bound])
+        deleted = cursor.rowcount
+        delete_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        cursor.execute(f"ALTER TABLE {partitioned} DROP PARTITION {oldest}")
+        drop_ms = (time.perf_counter() - started) * 1000
+
+        cursor.execute(f"DROP TABLE {flat}")
+        cursor.execute(f"DROP TABLE {partitioned}")
+
+    result = {
+        "rows_purged": deleted,
+        "older_than": bound,
+        "delete_ms": round(delete_ms, 2),
+        "drop_partition_ms": round(drop_ms, 2),
+    }
+    table = Table(title=f"Purge of orders before {bound} ({deleted} rows)")
+    table.add_column("Method")
+    table.add_column("Time (ms)", justify="right")
+    table.add_row("DELETE ... WHERE order_date < bound", str(result["delete_ms"]))
+    table.add_row(f"DROP PARTITION {oldest}", str(result["drop_partition_ms"]))
+    console.print(table)
+    return result
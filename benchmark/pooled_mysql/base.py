@@ -0,0 +1,76 @@
+from django.db.backends.mysql.base import Database
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from benchmark.pooled_mysql.pool import PoolTimeout, get_pool
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    # The stock MySQL backend with an optional per-process connection pool,
+    # enabled with OPTIONS["pool"] = True or a dict of ConnectionPool options.
+    # close() resets the session and hands the connection back to the pool
+    # instead of closing it.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_options = self.settings_dict["OPTIONS"].get("pool")
+        self._pool_entry = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_pool(self, conn_params):
+        options = self.pool_options if isinstance(self.pool_options, dict) else {}
+        return get_pool(
+            self.alias,
+            lambda: MySQLDatabaseWrapper.get_new_connection(self, conn_params),
+            **options,
+        )
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return super().get_new_connection(conn_params)
+        pool = self.get_pool(conn_params)
+        try:
+            conn, created, reused = pool.acquire()
+        except PoolTimeout as e:
+            raise Database.OperationalError(str(e))
+        self._pool_entry = (pool, created, reused)
+        return conn
+
+    def init_connection_state(self):
+        # Reused connections were reset on release, so they need the same
+        # session setup as a new one, including the init_command the client
+        # library only runs when it connects.
+        if self._pool_entry and self._pool_entry[2]:
+            init_command = self.settings_dict["OPTIONS"].get("init_command")
+            if init_command:
+                with self.connection.cursor() as cursor:
+                    cursor.execute(init_command)
+        super().init_connection_state()
+
+    def reset_session(self):
+        # COM_CHANGE_USER rolls back any open transaction and clears SET SESSION
+        # variables, user variables, temporary tables and the optimizer trace,
+        # so nothing leaks to the connection's next borrower. mysqlclient has
+        # no binding for the lighter COM_RESET_CONNECTION.
+        params = self.get_connection_params()
+        args = [params.get("user", ""), params.get("password", "")]
+        if params.get("database"):
+            # Without a db argument the session loses its default database.
+            args.append(params["database"])
+        self.connection.change_user(*args)
+
+    def _close(self):
+        if self._pool_entry is None:
+            return super()._close()
+        pool, created, _ = self._pool_entry
+        self._pool_entry = None
+        healthy = self.is_usable() if self.errors_occurred else True
+        if healthy:
+            try:
+                self.reset_session()
+            except Database.Error:
+                healthy = False
+        pool.release(self.connection, created, healthy)
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULTS = {
+    "max_size": 20,
+    # Seconds a caller waits for a free connection before giving up.
+    "timeout": 10.0,
+    # Connections are retired after this many seconds, however healthy.
+    "max_lifetime": 1800.0,
+    # Idle connections older than this are pinged before being handed out.
+    "check_after": 30.0,
+    # Idle connections are dropped this far ahead of the server's
+    # wait_timeout, which would otherwise close them under us.
+    "wait_timeout_margin": 0.9,
+}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, **options):
+        self.connect = connect
+        self.options = {**DEFAULTS, **options}
+        self.idle = deque()
+        self.size = 0
+        self.wait_timeout = None
+        self.pid = os.getpid()
+        self.orphans = []
+        self.cond = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "waits": 0}
+
+    def _check_fork(self):
+        # A forked child shares the parent's sockets. Closing them would send
+        # COM_QUIT on the parent's sessions, so they're kept but never used.
+        if self.pid != os.getpid():
+            self.orphans.extend(entry[0] for entry in self.idle)
+            self.idle.clear()
+            self.size = 0
+            self.pid = os.getpid()
+
+    def _expired(self, entry, now):
+        conn, created, last_used = entry
+        if now - created > self.options["max_lifetime"]:
+            return True
+        idle_limit = (self.wait_timeout or 0) * self.options["wait_timeout_margin"]
+        if idle_limit and now - last_used > idle_limit:
+            return True
+        if now - last_used > self.options["check_after"]:
+            try:
+                conn.ping()
+            except Exception:
+                return True
+        return False
+
+    def _discard(self, conn):
+        self.size -= 1
+        self.stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _create(self):
+        conn = self.connect()
+        if self.wait_timeout is None:
+            cursor = conn.cursor()
+            cursor.execute("SELECT @@SESSION.wait_timeout")
+            self.wait_timeout = float(cursor.fetchone()[0])
+            cursor.close()
+        self.stats["created"] += 1
+        return conn
+
+    def acquire(self):
+        # Returns (connection, created_at, reused).
+        deadline = time.monotonic() + self.options["timeout"]
+        with self.cond:
+            self._check_fork()
+            while True:
+                while self.idle:
+                    entry = self.idle.pop()
+                    if self._expired(entry, time.monotonic()):
+                        self._discard(entry[0])
+                        continue
+                    self.stats["reused"] += 1
+                    return entry[0], entry[1], True
+                if self.size < self.options["max_size"]:
+                    self.size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No connection available within {self.options['timeout']}s "
+                        f"(max_size={self.options['max_size']})"
+                    )
+                self.stats["waits"] += 1
+                self.cond.wait(remaining)
+
+        # Connecting happens outside the lock so slow handshakes don't block
+        # callers that could be served from the idle list.
+        try:
+            conn = self._create()
+        except Exception:
+            with self.cond:
+                self.size -= 1
+                self.cond.notify()
+            raise
+        return conn, time.monotonic(), False
+
+    def release(self, conn, created, healthy=True):
+        with self.cond:
+            if self.pid != os.getpid():
+                self.orphans.append(conn)
+                return
+            expired = time.monotonic() - created > self.options["max_lifetime"]
+            if not healthy or expired:
+                self._discard(conn)
+            else:
+                self.idle.append((conn, created, time.monotonic()))
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self._check_fork()
+            while self.idle:
+                self._discard(self.idle.pop()[0])
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, connect, **options):
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(connect, **options)
+        return _pools[alias]
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
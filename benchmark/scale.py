@@ -0,0 +1,156 @@
+import os
+
+from django.utils.text import slugify
+from rich.console import Console
+from rich.table import Table
+from tqdm import tqdm
+
+from benchmark.datagen import (
+    layout_packs_ip,
+    next_order_id,
+    reset_layout,
+    run_shards,
+    shard_ranges,
+)
+from benchmark.history import chart_dir, record_run, trend_svg
+from benchmark.utils import (
+    analyze_table,
+    drop_indexes,
+    run_benchmarks,
+    setup_indexes,
+)
+
+console = Console()
+
+DEFAULT_SIZES = [100_000, 1_000_000, 10_000_000]
+
+
+def grow_to(target, layout="wide", shard_size=10000, workers=1, **shard_options):
+    # Rows are appended after the current max order_id, which stands in for
+    # the row count since generate_data numbers rows from 1 without gaps.
+    first_id = next_order_id(layout)
+    missing = target - (first_id - 1)
+    if missing <= 0:
+        return 0
+    shards = list(shard_ranges(missing, shard_size, first_id))
+    pack_ip = layout_packs_ip(layout)
+    with tqdm(total=missing) as progress:
+        for done in run_shards(
+            shards, workers, layout=layout, pack_ip=pack_ip, **shard_options
+        ):
+            progress.update(done)
+    return missing
+
+
+def run_sweep(
+    sizes,
+    index_sets,
+    workload="default",
+    reset=False,
+    record=True,
+    load_options=None,
+    **bench_options,
+):
+    # sweep[index_set][rows] holds the run_benchmarks() results at that size.
+    if reset:
+        reset_layout("wide")
+    sweep = {index_set: {} for index_set in index_sets}
+    for size in sorted(sizes):
+        console.rule(f"[bold blue]Growing test_data to {size:,} rows")
+        # Secondary indexes are rebuilt for every index set anyway, and
+        # loading without them is much faster.
+        drop_indexes()
+        added = grow_to(size, **(load_options or {}))
+        if added == 0 and next_order_id("wide") - 1 > size:
+            console.print(
+                f"[yellow]test_data already holds more than {size:,} rows; "
+                "measuring at the current size.[/yellow]"
+            )
+        analyze_table()
+        for index_set in index_sets:
+            console.rule(f"[bold blue]{size:,} rows × {index_set}")
+            drop_indexes()
+            setup_indexes(index_set)
+            results = run_benchmarks(
+                f"{size:,} rows × {index_set}", workload, **bench_options
+            )
+            sweep[index_set][size] = results
+            if record:
+                try:
+                    record_run("scale", workload, index_set, results)
+                except Exception as e:
+                    console.print(
+                        f"[red]Warning:[/red] Couldn't record the run — {e}"
+                    )
+    drop_indexes()
+    return sweep
+
+
+def _metric(results, label, metric):
+    return next((r[metric] for r in results if r["label"] == label), None)
+
+
+def _labels(sweep):
+    labels = []
+    for by_size in sweep.values():
+        for results in by_size.values():
+            for r in results:
+                if r["label"] not in labels:
+                    labels.append(r["label"])
+    return labels
+
+
+def print_sweep(sweep, metric="p50_ms"):
+    sizes = sorted({size for by_size in sweep.values() for size in by_size})
+    table = Table(title=f"{metric.removesuffix('_ms')} (ms) by row count")
+    table.add_column("Query")
+    table.add_column("Index set")
+    for size in sizes:
+        table.add_column(f"{size:,}", justify="right")
+    # How much slower the query got from the smallest to the largest size.
+    table.add_column("Growth", justify="right")
+    for label in _labels(sweep):
+        for index_set, by_size in sweep.items():
+            values = [
+                _metric(by_size[size], label, metric) if size in by_size else None
+                for size in sizes
+            ]
+            measured = [v for v in values if v is not None]
+            growth = "-"
+            if len(measured) > 1 and measured[0]:
+                growth = f"{measured[-1] / measured[0]:.1f}x"
+            table.add_row(
+                label,
+                index_set,
+                *("-" if v is None else str(v) for v in values),
+                growth,
+            )
+    console.print(table)
+
+
+def write_sweep_charts(sweep, workload, directory=None, metric="p50_ms"):
+    # One chart per query with a line per index set; the x axis steps through
+    # the row counts, which are usually powers of ten apart.
+    directory = directory or chart_dir()
+    os.makedirs(directory, exist_ok=True)
+    sizes = sorted({size for by_size in sweep.values() for size in by_size})
+    paths = []
+    for label in _labels(sweep):
+        series = {
+            index_set: [
+                _metric(by_size[size], label, metric) if size in by_size else None
+                for size in sizes
+            ]
+            for index_set, by_size in sweep.items()
+        }
+        path = os.path.join(directory, f"scale-{workload}-{slugify(label)}.svg")
+        with open(path, "w") as f:
+            f.write(
+                trend_svg(
+                    f"{label}: {metric.removesuffix('_ms')} (ms) by row count",
+                    [f"{size:,} rows" for size in sizes],
+                    series,
+                )
+            )
+        paths.append(path)
+    return paths
@@ -0,0 +1,179 @@
+import json
+
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Columns the workloads filter, group or join on. Only those without an index
+# get histograms: for indexed columns the optimizer prefers index dives.
+FILTER_COLUMNS = [
+    "price",
+    "rating",
+    "status",
+    "is_new_customer",
+    "city",
+    "product_name",
+    "user_id",
+    "order_date",
+    "platform",
+    "device_type",
+]
+DEFAULT_BUCKETS = 100
+
+
+def _check(cursor, statement):
+    # ANALYZE TABLE reports failures as result rows rather than errors.
+    cursor.execute(statement)
+    for _, _, msg_type, msg_text in cursor.fetchall():
+        if msg_type.lower() == "error":
+            console.print(f"[red]Warning:[/red] {msg_text}")
+
+
+def indexed_columns(cursor, table):
+    # A column only counts as indexed when an index can seek on it, i.e. when
+    # it is the leading key part.
+    cursor.execute(
+        "SELECT DISTINCT column_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s "
+        "AND seq_in_index = 1 AND column_name IS NOT NULL",
+        [table],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def histogram_columns(table="test_data", columns=None):
+    with connection.cursor() as cursor:
+        indexed = indexed_columns(cursor, table)
+    return [c for c in columns or FILTER_COLUMNS if c not in indexed]
+
+
+def existing_histograms(cursor, table):
+    cursor.execute(
+        "SELECT column_name FROM information_schema.column_statistics "
+        "WHERE schema_name = DATABASE() AND table_name = %s",
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def drop_histograms(table="test_data"):
+    with connection.cursor() as cursor:
+        columns = existing_histograms(cursor, table)
+        if columns:
+            _check(
+                cursor,
+                f"ANALYZE TABLE {table} DROP HISTOGRAM ON "
+                + ", ".join(f"`{c}`" for c in columns),
+            )
+    return columns
+
+
+def update_statistics(
+    table="test_data", histograms=True, columns=None, buckets=DEFAULT_BUCKETS
+):
+    # Refreshes the persistent index statistics and, with histograms, rebuilds
+    # the value distribution of the non-indexed filter columns. Histograms
+    # left on columns that have since been indexed are dropped.
+    with connection.cursor() as cursor:
+        console.print(f"[bold]Analyzing {table}...[/bold]")
+        _check(cursor, f"ANALYZE TABLE {table}")
+    if not histograms:
+        return []
+
+    drop_histograms(table)
+    targets = histogram_columns(table, columns)
+    if targets:
+        console.print(
+            f"[bold]Building histograms on {', '.join(targets)} "
+            f"({buckets} buckets)...[/bold]"
+        )
+        with connection.cursor() as cursor:
+            _check(
+                cursor,
+                f"ANALYZE TABLE {table} UPDATE HISTOGRAM ON "
+                + ", ".join(f"`{c}`" for c in targets)
+                + f" WITH {buckets} BUCKETS",
+            )
+    return targets
+
+
+def histogram_summary(table="test_data"):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT column_name, histogram FROM information_schema.column_statistics "
+            "WHERE schema_name = DATABASE() AND table_name = %s ORDER BY column_name",
+            [table],
+        )
+        rows = cursor.fetchall()
+    summary = []
+    for column, histogram in rows:
+        if isinstance(histogram, (str, bytes)):
+            histogram = json.loads(histogram)
+        summary.append(
+            {
+                "column": column,
+                "type": histogram.get("histogram-type"),
+                "buckets": len(histogram.get("buckets", [])),
+                "sampling_rate": histogram.get("sampling-rate"),
+                "null_fraction": histogram.get("null-values"),
+                "updated": histogram.get("last-updated"),
+            }
+        )
+    return summary
+
+
+def print_histograms(summary, title="Column histograms"):
+    table = Table(title=title)
+    table.add_column("Column")
+    table.add_column("Type")
+    for column in ["Buckets", "Sampling rate", "NULL fraction"]:
+        table.add_column(column, justify="right")
+    table.add_column("Updated")
+    for h in summary:
+        table.add_row(
+            h["column"],
+            h["type"],
+            str(h["buckets"]),
+            f"{h['sampling_rate']:.2f}" if h["sampling_rate"] is not None else "-",
+            f"{h['null_fraction']:.3f}" if h["null_fraction"] is not None else "-",
+            h["updated"] or "-",
+        )
+    console.print(table)
+
+
+def _estimate(result):
+    # Rows the optimizer expects the first table to produce after its WHERE
+    # conditions: rows examined per scan times the "filtered" percentage.
+    tables = result.get("plan", {}).get("summary", {}).get("tables", [])
+    if not tables:
+        return None, None
+    first = tables[0]
+    return first["filtered"], round(first["rows_examined"] * first["filtered"] / 100)
+
+
+def print_estimates(before, after, names=("Before", "After")):
+    table = Table(title="Optimizer estimates for the first table")
+    table.add_column("Query")
+    for name in names:
+        table.add_column(f"Filtered % ({name})", justify="right")
+        table.add_column(f"Est. rows ({name})", justify="right")
+    table.add_column(f"Rows examined ({names[1]})", justify="right")
+    after_by_label = {r["label"]: r for r in after}
+    for b in before:
+        a = after_by_label.get(b["label"])
+        if a is None:
+            continue
+        cells = []
+        for r in (b, a):
+            filtered, rows = _estimate(r)
+            if filtered is None:
+                cells += ["-", "-"]
+            else:
+                cells += [f"{filtered:.2f}", f"{rows:,}"]
+        examined = a.get("counters", {}).get("rows_examined")
+        table.add_row(
+            b["label"], *cells, "-" if examined is None else f"{examined:,.0f}"
+        )
+    console.print(table)
@@ -0,0 +1,158 @@
+import csv
+import gzip
+import os
+import resource
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+FETCH_MODES = ["buffered", "sscursor", "iterator"]
+EXPORT_FORMATS = ["csv", "parts"]
+
+
+def current_rss_bytes():
+    # ru_maxrss only ever grows, so the live RSS is read from /proc where it
+    # exists; elsewhere the lifetime peak is the best available figure.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def buffered_rows(sql, params=None):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        yield from cursor.fetchall()
+
+
+def sscursor_rows(sql, params=None, chunk_size=10000):
+    # mysqlclient's SSCursor uses mysql_use_result(), so rows stay on the
+    # server until fetched. The connection can't run anything else until the
+    # result is drained or the cursor closed.
+    from MySQLdb.cursors import SSCursor
+
+    connection.ensure_connection()
+    cursor = connection.connection.cursor(SSCursor)
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def iterator_rows(queryset, chunk_size=10000):
+    # Django's MySQL backend has no server-side cursors: .iterator() saves
+    # building model instances up front, but the driver still buffers the
+    # whole result, which is what this mode shows.
+    yield from queryset.iterator(chunk_size=chunk_size)
+
+
+def stream_rows(mode, sql, queryset=None, chunk_size=10000):
+    if mode == "buffered":
+        return buffered_rows(sql)
+    if mode == "sscursor":
+        return sscursor_rows(sql, chunk_size=chunk_size)
+    if mode == "iterator":
+        return iterator_rows(queryset, chunk_size)
+    raise ValueError(f"Unknown fetch mode {mode!r}; choose from {FETCH_MODES}")
+
+
+def profile_rows(rows, consume=None, sample_every=10000):
+    rss_before = peak_rss = current_rss_bytes()
+    started = time.perf_counter()
+    first_row_ms = None
+    count = 0
+    for row in rows:
+        if first_row_ms is None:
+            first_row_ms = (time.perf_counter() - started) * 1000
+        if consume is not None:
+            consume(row)
+        count += 1
+        if count % sample_every == 0:
+            peak_rss = max(peak_rss, current_rss_bytes())
+    elapsed = time.perf_counter() - started
+    peak_rss = max(peak_rss, current_rss_bytes())
+    return {
+        "rows": count,
+        "first_row_ms": round(first_row_ms or 0.0, 3),
+        "total_ms": round(elapsed * 1000, 3),
+        "rows_per_sec": round(count / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss / 1024 / 1024, 1),
+        "rss_growth_mb": round((peak_rss - rss_before) / 1024 / 1024, 1),
+    }
+
+
+def time_streamed(sql, chunk_size=10000):
+    start = time.perf_counter_ns()
+    for _ in sscursor_rows(sql, chunk_size=chunk_size):
+        pass
+    return (time.perf_counter_ns() - start) / 1_000_000
+
+
+@contextmanager
+def export_writer(fmt, output, header, rows_per_file=1_000_000):
+    # "parts" mimics Parquet-style datasets without a new dependency: a
+    # directory of gzipped CSV files of at most rows_per_file rows each.
+    if fmt == "csv":
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            yield writer.writerow
+        return
+
+    os.makedirs(output, exist_ok=True)
+    state = {"file": None, "writer": None, "rows": 0, "part": 0}
+
+    def write(row):
+        if state["file"] is None or state["rows"] == rows_per_file:
+            if state["file"] is not None:
+                state["file"].close()
+            path = os.path.join(output, f"part-{state['part']:05d}.csv.gz")
+            state["file"] = gzip.open(path, "wt", newline="", encoding="utf-8")
+            state["writer"] = csv.writer(state["file"])
+            state["writer"].writerow(header)
+            state["rows"] = 0
+            state["part"] += 1
+        state["writer"].writerow(row)
+        state["rows"] += 1
+
+    try:
+        yield write
+    finally:
+        if state["file"] is not None:
+            state["file"].close()
+
+
+def print_fetch_profiles(profiles, title="Fetch modes"):
+    table = Table(title=title)
+    table.add_column("Mode")
+    for column in [
+        "Rows",
+        "First row (ms)",
+        "Total (ms)",
+        "Rows/sec",
+        "Peak RSS (MB)",
+        "RSS growth (MB)",
+    ]:
+        table.add_column(column, justify="right")
+    for mode, p in profiles.items():
+        table.add_row(
+            mode,
+            str(p["rows"]),
+            str(p["first_row_ms"]),
+            str(p["total_ms"]),
+            f"{p['rows_per_sec']:,.0f}",
+            str(p["peak_rss_mb"]),
+            str(p["rss_growth_mb"]),
+        )
+    console.print(table)
@@ -0,0 +1,174 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Count, Sum
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+SUMMARY_SOURCE = "test_data"
+SUMMARY_TABLE = "test_data_q1_summary"
+GROUP_COLUMNS = ["product_name", "city", "state", "platform", "device_type"]
+# Complex Query 1's WHERE clause. Only rows matching it are summarized, so the
+# summary answers exactly that query.
+SUMMARY_FILTER = {
+    "price__gt": 500,
+    "rating__gt": 3,
+    "is_new_customer": True,
+    "status": "delivered",
+}
+
+_state = {"enabled": None}
+
+
+def create_summary_table(cursor):
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+            product_name VARCHAR(255) NOT NULL,
+            city VARCHAR(100) NOT NULL,
+            state VARCHAR(100) NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            device_type VARCHAR(50) NOT NULL,
+            price_sum DECIMAL(20, 2) NOT NULL,
+            row_count BIGINT NOT NULL,
+            PRIMARY KEY (product_name, city, state, platform, device_type)
+        )
+        """
+    )
+
+
+def summary_enabled():
+    if _state["enabled"] is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [SUMMARY_TABLE],
+            )
+            _state["enabled"] = cursor.fetchone()[0] > 0
+    return _state["enabled"]
+
+
+@contextmanager
+def maintenance(enabled):
+    previous = _state["enabled"]
+    _state["enabled"] = enabled
+    try:
+        yield
+    finally:
+        _state["enabled"] = previous
+
+
+def maintains(model):
+    return model._meta.db_table == SUMMARY_SOURCE and summary_enabled()
+
+
+def _grouped(queryset):
+    return (
+        queryset.filter(**SUMMARY_FILTER)
+        .order_by()
+        .values(*GROUP_COLUMNS)
+        .annotate(price_sum=Sum("price"), row_count=Count("pk"))
+    )
+
+
+def apply_delta(queryset, sign=1):
+    # The rows' contribution is aggregated on the server and merged into the
+    # summary in one statement; sign=-1 takes it back out before an update or
+    # delete.
+    sql, params = _grouped(queryset).query.sql_with_params()
+    group_list = ", ".join(GROUP_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {SUMMARY_TABLE} ({group_list}, price_sum, row_count)
+            SELECT {group_list}, %s * price_sum, %s * row_count
+            FROM ({sql}) AS delta
+            ON DUPLICATE KEY UPDATE
+                price_sum = {SUMMARY_TABLE}.price_sum + %s * delta.price_sum,
+                row_count = {SUMMARY_TABLE}.row_count + %s * delta.row_count
+            """,
+            [sign, sign, *params, sign, sign],
+        )
+        if sign < 0:
+            # Only the groups this delta touched can have emptied, and they're
+            # found by primary key rather than by scanning the whole summary.
+            cursor.execute(
+                f"""
+                DELETE summary FROM {SUMMARY_TABLE} AS summary
+                JOIN ({sql}) AS delta USING ({group_list})
+                WHERE summary.row_count <= 0
+                """,
+                params,
+            )
+
+
+def before_save(sender, instance, **kwargs):
+    # A save may overwrite an existing row, whose old values are taken out of
+    # the summary first; for new rows this matches nothing.
+    if maintains(sender):
+        apply_delta(sender.objects.filter(pk=instance.pk), sign=-1)
+
+
+def after_save(sender, instance, **kwargs):
+    if maintains(sender):
+        apply_delta(sender.objects.filter(pk=instance.pk))
+
+
+def reset_summary():
+    with connection.cursor() as cursor:
+        cursor.execute(f"TRUNCATE TABLE {SUMMARY_TABLE}")
+
+
+def rebuild_summary(queryset):
+    with connection.cursor() as cursor:
+        create_summary_table(cursor)
+    _state["enabled"] = True
+    reset_summary()
+    apply_delta(queryset)
+
+
+def verify_summary(queryset):
+    # Compares every group, not just the top 20, since ties on avg_price make
+    # the LIMITed query's row set nondeterministic.
+    live = {
+        tuple(row[c] for c in GROUP_COLUMNS): row["price_sum"] / row["row_count"]
+        for row in _grouped(queryset)
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(GROUP_COLUMNS)}, price_sum / row_count "
+            f"FROM {SUMMARY_TABLE}"
+        )
+        summarized = {tuple(row[:-1]): row[-1] for row in cursor.fetchall()}
+
+    mismatched = [
+        key
+        for key in live.keys() | summarized.keys()
+        if key not in live
+        or key not in summarized
+        or abs(live[key] - summarized[key]) > 0.0001
+    ]
+    return {
+        "groups": len(live),
+        "summary_groups": len(summarized),
+        "mismatched": len(mismatched),
+        "ok": not mismatched,
+    }
+
+
+def print_write_cost(cost):
+    table = Table(title=f"Write-path cost ({cost['rows']} rows per run)")
+    table.add_column("Maintenance")
+    table.add_column("Insert (ms)", justify="right")
+    table.add_column("Rows/sec", justify="right")
+    for label, key in [("Off", "off_ms"), ("On", "on_ms")]:
+        table.add_row(
+            label,
+            str(cost[key]),
+            f"{cost['rows'] / (cost[key] / 1000):,.0f}" if cost[key] else "-",
+        )
+    console.print(table)
+    console.print(f"[bold]Summary overhead:[/bold] {cost['overhead']:.1%}")
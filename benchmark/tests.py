@@ -1,3 +1,431 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import OperationalError, connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+from faker.generator import random as faker_random
+
+from benchmark.advisor import analyze_query, candidate_indexes
+from benchmark.cache import normalize_sql, tables_in
+from benchmark.compact import compact_clauses, enum_type, int_type
+from benchmark.concurrency import _worker, check_pool_capacity, parse_levels, parse_mix
+from benchmark.datagen import (
+    _tsv_value,
+    build_row,
+    faker_rows,
+    shard_ranges,
+    shard_seed,
+)
+from benchmark.distributions import (
+    apply_distribution,
+    make_distribution,
+    zipf_probabilities,
+)
+from benchmark.explain import plan_regressions
+from benchmark.history import compare_runs
+from benchmark.models import TestData
+from benchmark.partitioning import partition_bounds
+from benchmark.summary import apply_delta, maintenance
+from benchmark.utils import (
+    PRICE_RATING_CACHE,
+    optimize_schema,
+    percentile,
+    run_matrix,
+    summarize,
+)
+from benchmark.vectorized import INT_RANGES
+from benchmark.workloads import get_workload
+
+
+class ShardTests(SimpleTestCase):
+    def test_ranges_cover_every_id_once(self):
+        shards = list(shard_ranges(25, 10))
+        self.assertEqual(shards, [(1, 11), (11, 21), (21, 26)])
+
+    def test_appended_ranges_continue_a_larger_run(self):
+        self.assertEqual(
+            list(shard_ranges(20, 10, first_id=31)), list(shard_ranges(50, 10))[3:]
+        )
+
+    def test_seeds_differ_per_shard(self):
+        self.assertNotEqual(shard_seed(42, 1), shard_seed(42, 11))
+        self.assertIsNone(shard_seed(None, 1))
+
+    def test_rows_do_not_depend_on_worker_order(self):
+        shards = list(shard_ranges(6, 3))
+        in_order = [row for start, end in shards for row in faker_rows(start, end, 7)]
+        reversed_order = {
+            (start, end): list(faker_rows(start, end, 7))
+            for start, end in reversed(shards)
+        }
+        self.assertEqual(
+            in_order, [row for shard in shards for row in reversed_order[shard]]
+        )
+        self.assertEqual([row[0] for row in in_order], [1, 2, 3, 4, 5, 6])
+
+    def test_same_seed_same_rows(self):
+        self.assertEqual(list(faker_rows(1, 4, 3)), list(faker_rows(1, 4, 3)))
+        self.assertNotEqual(list(faker_rows(1, 4, 3)), list(faker_rows(1, 4, 4)))
+
+    def test_unseeded_shards_differ_across_forked_workers(self):
+        # Every forked worker starts from the same inherited random state.
+        state = faker_random.getstate()
+        first = [row[1:] for row in faker_rows(1, 4, None)]
+        faker_random.setstate(state)
+        second = [row[1:] for row in faker_rows(1, 4, None)]
+        self.assertNotEqual(first, second)
+
+
+class TsvValueTests(SimpleTestCase):
+    def test_null_and_booleans(self):
+        self.assertEqual(_tsv_value(None), "\\N")
+        self.assertEqual(_tsv_value(True), "1")
+        self.assertEqual(_tsv_value(False), "0")
+
+    def test_escapes_separators(self):
+        self.assertEqual(_tsv_value("a\tb\nc"), "a\\tb\\nc")
+        self.assertEqual(_tsv_value("C:\\temp"), "C:\\\\temp")
+
+    def test_plain_values(self):
+        self.assertEqual(_tsv_value(12.5), "12.5")
+        self.assertEqual(_tsv_value("N"), "N")
+
+
+class SummaryStatisticsTests(SimpleTestCase):
+    def test_percentile_interpolates(self):
+        samples = [1.0, 2.0, 3.0, 4.0]
+        self.assertEqual(percentile(samples, 0), 1.0)
+        self.assertEqual(percentile(samples, 50), 2.5)
+        self.assertEqual(percentile(samples, 100), 4.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize_sorts_its_input(self):
+        summary = summarize([3.0, 1.0, 2.0])
+        self.assertEqual(summary["min_ms"], 1.0)
+        self.assertEqual(summary["p50_ms"], 2.0)
+        self.assertEqual(summary["mean_ms"], 2.0)
+        self.assertEqual(summary["stddev_ms"], 0.816)
+
+    def test_summarize_empty(self):
+        self.assertEqual(summarize([])["p99_ms"], 0.0)
+
+
+class ParseMixTests(SimpleTestCase):
+    queries = [{"label": "Q1", "weight": 2}, {"label": "Q2", "weight": 1}]
+
+    def test_defaults_to_registry_weights(self):
+        self.assertEqual(parse_mix(None, self.queries), {"Q1": 2.0, "Q2": 1.0})
+
+    def test_spec_selects_and_weights_queries(self):
+        self.assertEqual(parse_mix("Q2=3", self.queries), {"Q2": 3.0})
+
+    def test_rejects_bad_specs(self):
+        for spec in ["Q3=1", "Q1=0", "Q1=-1", "Q1=x"]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_mix(spec, self.queries)
+
+    def test_levels(self):
+        self.assertEqual(parse_levels("1, 4,16"), [1, 4, 16])
+        for spec in ["4,x", "0", "2,-1", ""]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_levels(spec)
+
+    @mock.patch("benchmark.concurrency.connection")
+    def test_worker_records_a_failed_connection(self, connection):
+        connection.cursor.side_effect = OSError("refused")
+        samples, errors, first_errors = _worker(0, self.queries, {"Q1": 1}, 0)
+        self.assertEqual(samples, {"Q1": []})
+        self.assertEqual(errors, {"Q1": 1})
+        self.assertEqual(first_errors, {"Q1": "OSError: refused"})
+        connection.close.assert_called_once()
+
+
+class PlanRegressionTests(SimpleTestCase):
+    def plan(self, access_type="ref", key="idx", rows=100, cost=10.0, **flags):
+        return {
+            "cost": cost,
+            "rows_examined": rows,
+            "filesort": flags.get("filesort", False),
+            "temporary": flags.get("temporary", False),
+            "tables": [
+                {
+                    "table": "test_data",
+                    "access_type": access_type,
+                    "key": key,
+                    "rows_examined": rows,
+                }
+            ],
+        }
+
+    def test_same_plan_is_not_a_regression(self):
+        self.assertEqual(plan_regressions(self.plan(), self.plan()), [])
+
+    def test_small_growth_is_tolerated(self):
+        self.assertEqual(plan_regressions(self.plan(), self.plan(cost=10.5)), [])
+
+    def test_detects_worse_plans(self):
+        worse = self.plan(
+            access_type="ALL", key=None, rows=1000, cost=200.0, filesort=True
+        )
+        reasons = plan_regressions(self.plan(), worse)
+        self.assertEqual(
+            reasons,
+            [
+                "cost 10.0 -> 200.0",
+                "rows examined 100 -> 1000",
+                "filesort introduced",
+                "test_data: access ref -> ALL",
+                "test_data: index idx no longer used",
+            ],
+        )
+
+
+class AdvisorTests(SimpleTestCase):
+    columns = {
+        "price",
+        "rating",
+        "status",
+        "is_new_customer",
+        "city",
+        "product_name",
+        "state",
+        "platform",
+        "device_type",
+        "order_date",
+    }
+
+    def test_complex_query_1_predicates(self):
+        sql = get_workload("default")["queries"][0]["sql"]
+        [block] = analyze_query(sql, self.columns)
+        self.assertEqual(block["eq"], ["is_new_customer", "status"])
+        self.assertEqual(block["range"], ["price", "rating"])
+        self.assertEqual(
+            block["group_by"],
+            ["product_name", "city", "state", "platform", "device_type"],
+        )
+        self.assertEqual(block["aggregates"], ["price"])
+
+    def test_correlated_subquery_is_a_separate_block(self):
+        sql = get_workload("default")["queries"][1]["sql"]
+        outer, inner = analyze_query(sql, self.columns)
+        self.assertEqual(outer["range"], ["rating"])
+        self.assertEqual(inner["eq"], ["city"])
+        self.assertEqual(inner["aggregates"], ["price"])
+
+    def test_in_between_and_order_by(self):
+        [block] = analyze_query(
+            "SELECT city FROM test_data WHERE status IN ('a', 'b') "
+            "AND order_date BETWEEN 1 AND 2 ORDER BY city",
+            self.columns,
+        )
+        self.assertEqual(block["eq"], ["status"])
+        self.assertEqual(block["range"], ["order_date"])
+        self.assertEqual(block["order_by"], ["city"])
+
+    def test_candidates_put_equality_before_range(self):
+        blocks = [
+            {
+                "eq": ["status"],
+                "range": ["order_date"],
+                "group_by": [],
+                "order_by": [],
+                "select": ["city"],
+                "aggregates": [],
+            }
+        ]
+        candidates = candidate_indexes(blocks)
+        self.assertEqual(candidates[0], ("status", "order_date"))
+        self.assertIn(("status", "order_date", "city"), candidates)
+
+
+@mock.patch("benchmark.utils.drop_indexes")
+class RunMatrixTests(SimpleTestCase):
+    def test_skips_a_workload_whose_layout_is_missing(self, drop_indexes):
+        with mock.patch(
+            "benchmark.utils.setup_indexes",
+            side_effect=OperationalError("no such table"),
+        ):
+            self.assertEqual(run_matrix(["default"]), {"default": {}})
+
+    def test_programming_errors_propagate(self, drop_indexes):
+        with mock.patch("benchmark.utils.setup_indexes", side_effect=KeyError("x")):
+            with self.assertRaises(KeyError):
+                run_matrix(["default"])
+
+
+@mock.patch("benchmark.utils.online_alter")
+class OnlineResumeTests(SimpleTestCase):
+    def test_resumes_the_pending_step_first(self, online_alter):
+        with mock.patch(
+            "benchmark.utils.pending_change", return_value=PRICE_RATING_CACHE
+        ):
+            optimize_schema(online=True, chunk_size=10)
+        online_alter.assert_called_once_with(
+            "test_data", PRICE_RATING_CACHE, chunk_size=10
+        )
+
+    def test_refuses_another_commands_pending_change(self, online_alter):
+        with mock.patch("benchmark.utils.pending_change", return_value="MODIFY x"):
+            with self.assertRaises(RuntimeError):
+                optimize_schema(online=True)
+        online_alter.assert_not_called()
+
+
+class PartitionBoundsTests(SimpleTestCase):
+    def test_bounds_are_aligned_and_cover_the_range(self):
+        self.assertEqual(partition_bounds(100, 250, 100), [200, 300])
+        self.assertEqual(partition_bounds(199, 200, 100), [200, 300])
+
+    def test_every_value_falls_below_the_last_bound(self):
+        bounds = partition_bounds(1600000000, 1700000000, 30 * 86400)
+        self.assertGreater(bounds[0], 1600000000)
+        self.assertGreater(bounds[-1], 1700000000)
+        self.assertTrue(all(b % (30 * 86400) == 0 for b in bounds))
+
+
+class ResultCacheSqlTests(SimpleTestCase):
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("select  price -- note\n from   test_data ;"),
+            "SELECT price FROM test_data",
+        )
+        self.assertEqual(
+            normalize_sql("SELECT price FROM test_data;"),
+            normalize_sql("select price\nfrom test_data"),
+        )
+
+    def test_tables_in(self):
+        cases = {
+            "SELECT * FROM a, b WHERE a.id = b.id": ["a", "b"],
+            "SELECT * FROM `A` x LEFT JOIN b y ON x.id = y.id JOIN c ON 1": [
+                "a",
+                "b",
+                "c",
+            ],
+            "SELECT * FROM (SELECT id FROM c) d, e": ["c", "e"],
+            "SELECT 1 FROM a WHERE id IN (SELECT id FROM b)": ["a", "b"],
+        }
+        for sql, tables in cases.items():
+            with self.subTest(sql=sql):
+                self.assertEqual(tables_in(sql), tables)
+
+    def test_workload_tables(self):
+        sql = get_workload("split")["queries"][1]["sql"]
+        self.assertEqual(tables_in(sql), ["test_data_hot"])
+
+
+class ResultCacheWriteTests(TransactionTestCase):
+    def test_bump_inside_atomic_rolls_back(self):
+        # DDL would commit the open transaction on MySQL; the bump waits for
+        # the commit, so a rolled-back save leaves no trace.
+        row = build_row(Faker(), 1)
+        with maintenance(False), CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                TestData.objects.create(**row)
+                raise RuntimeError
+        self.assertFalse(TestData.objects.exists())
+        self.assertFalse(
+            [q["sql"] for q in queries if "_result_cache_versions" in q["sql"]]
+        )
+
+
+class SummaryDeltaTests(SimpleTestCase):
+    @mock.patch("benchmark.summary.connection")
+    def test_negative_delta_deletes_only_touched_groups(self, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        apply_delta(TestData.objects.filter(pk=7), sign=-1)
+        delete_sql, delete_params = cursor.execute.call_args_list[-1].args
+        self.assertIn("JOIN (SELECT", delete_sql)
+        self.assertIn(7, delete_params)
+
+
+class PoolCapacityTests(SimpleTestCase):
+    def check(self, levels, pool):
+        wrapper = mock.Mock(settings_dict={"OPTIONS": {"pool": pool}})
+        with mock.patch("benchmark.concurrency.connections", {"default": wrapper}):
+            check_pool_capacity(levels)
+
+    def test_levels_within_the_pool(self):
+        self.check([1, 20], {"max_size": 20})
+        self.check([64], False)
+
+    def test_levels_beyond_the_pool(self):
+        with self.assertRaises(ValueError):
+            self.check([1, 32], {"max_size": 20})
+        with self.assertRaises(ValueError):
+            self.check([32], True)
+
+
+class CompactSchemaTests(SimpleTestCase):
+    def test_enum_members_in_collation_order(self):
+        self.assertEqual(enum_type(["b", "A", "c"]), "ENUM('A', 'b', 'c')")
+
+    def test_int_type_picks_the_narrowest(self):
+        self.assertEqual(int_type(1, 127), "TINYINT")
+        self.assertEqual(int_type(-129, 1), "SMALLINT")
+        self.assertEqual(int_type(1600000000, 1700000000), "INT")
+        self.assertEqual(int_type(0, 2**31), "BIGINT")
+
+    def test_clauses(self):
+        clauses = compact_clauses(has_cache=True).split(", MODIFY")
+        self.assertIn(" COLUMN ip_address INT UNSIGNED NOT NULL", clauses)
+        self.assertIn(" COLUMN `age` TINYINT NOT NULL", clauses)
+        self.assertTrue(clauses[-1].startswith(" COLUMN price_rating_cache DECIMAL"))
+
+    def test_clauses_follow_the_actual_ranges(self):
+        ranges = {**INT_RANGES, "order_date": (1600000000, 5000000000)}
+        self.assertIn(
+            "MODIFY COLUMN `order_date` BIGINT NOT NULL",
+            compact_clauses(ranges=ranges),
+        )
+
+    def test_adds_the_cache_column_when_missing(self):
+        self.assertIn("ADD COLUMN", compact_clauses(has_cache=False))
+
+
+class CompareRunsTests(SimpleTestCase):
+    def history_run(self, **p50):
+        return {
+            "results": [{"label": label, "p50_ms": ms} for label, ms in p50.items()]
+        }
+
+    def test_flags_slowdowns_beyond_the_threshold(self):
+        rows = compare_runs(
+            self.history_run(a=10.0, b=10.0, c=0.0),
+            self.history_run(a=10.5, b=12.0, c=1.0, d=5.0),
+            threshold=0.1,
+        )
+        self.assertEqual([r["label"] for r in rows], ["a", "b", "c"])
+        self.assertEqual([r["regression"] for r in rows], [False, True, False])
+        self.assertAlmostEqual(rows[1]["change"], 0.2)
+
+
+class DistributionTests(SimpleTestCase):
+    def test_zipf_probabilities(self):
+        probabilities = zipf_probabilities(4, 1.0)
+        self.assertAlmostEqual(probabilities.sum(), 1.0)
+        self.assertAlmostEqual(probabilities[0] / probabilities[1], 2.0)
+        self.assertTrue(all(probabilities[:-1] > probabilities[1:]))
+
+    def test_zero_exponent_is_uniform(self):
+        self.assertTrue(all(zipf_probabilities(5, 0.0) == 0.2))
+
+    def test_make_distribution(self):
+        self.assertIsNone(make_distribution())
+        self.assertEqual(make_distribution(1.1, ["city"])["hot_keys"], ["city"])
+        for args in [(-1.0,), (1.0, ["order_date"]), (0.0, None, False, 2.0)]:
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                make_distribution(*args)
+
+    def test_apply_distribution_is_deterministic(self):
+        distribution = make_distribution(1.2, ["city"], True, 0.5)
+        first = list(
+            apply_distribution(faker_rows(1, 21, 5), 1, 5, distribution, batch_size=8)
+        )
+        second = list(
+            apply_distribution(faker_rows(1, 21, 5), 1, 5, distribution, batch_size=8)
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 20)
+        self.assertEqual([row[0] for row in first], list(range(1, 21)))
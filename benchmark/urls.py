@@ -0,0 +1,13 @@
+from django.urls import path
+
+from benchmark import views
+
+urlpatterns = [
+    path("", views.workloads, name="workloads"),
+    path("<slug:workload>/<slug:query>/", views.workload_query, name="query"),
+    path(
+        "sync/<slug:workload>/<slug:query>/",
+        views.workload_query_sync,
+        name="query-sync",
+    ),
+]
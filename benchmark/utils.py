@@ -1,88 +1,429 @@
-from django.db import connection
+from django.db import DatabaseError, connection
+from benchmark.explain import capture_plan
+from benchmark.metrics import corrected, measure, prepare_collectors, print_counters
+from benchmark.online import online_alter, pending_change
+from benchmark.streaming import time_streamed
+from benchmark.workloads import (
+    INDEX_SETS,
+    create_index_sql,
+    get_index_set,
+    get_workload,
+)
 from rich.console import Console
 from rich.table import Table
+import statistics
 import time
 
 console = Console()
 
 
-def drop_indexes():
+def _index_names(cursor, table):
+    cursor.execute(
+        "SELECT DISTINCT index_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        [table],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def drop_indexes(index_set=None):
+    # Without a name every registered index set is torn down, which leaves the
+    # table with only the indexes nobody benchmarks.
+    names = [index_set] if index_set else list(INDEX_SETS)
+    indexes = {}
+    for name in names:
+        for index in get_index_set(name):
+            indexes[(index["table"], index["name"])] = index
+
     with connection.cursor() as cursor:
         console.print("[bold yellow]Dropping existing indexes...[/bold yellow]")
-        for idx in ["idx_q1_composite", "idx_q2_city_price", "idx_rating"]:
+        for table, idx in indexes:
+            if idx not in _index_names(cursor, table):
+                continue
             try:
-                cursor.execute(f"DROP INDEX {idx} ON test_data")
+                cursor.execute(f"DROP INDEX {idx} ON {table}")
             except Exception as e:
                 console.print(f"[red]Warning:[/red] Couldn't drop index {idx} — {e}")
 
 
-def setup_indexes():
+def setup_indexes(index_set="baseline"):
     with connection.cursor() as cursor:
-        console.print("[bold]Creating indexes...[/bold]")
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_q1_composite ON test_data
-            (price, rating, is_new_customer, status, product_name, city, state, platform, device_type);
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_q2_city_price ON test_data (city, price);
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_rating ON test_data (rating);
-        """)
+        console.print(f"[bold]Creating indexes ({index_set})...[/bold]")
+        for index in get_index_set(index_set):
+            if index["name"] in _index_names(cursor, index["table"]):
+                continue
+            cursor.execute(create_index_sql(index))
         console.print("[green]Indexes created.[/green]")
 
 
-def optimize_schema():
+def secondary_indexes(table="test_data"):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT index_name, non_unique, index_type, column_name, expression,
+                   sub_part, collation
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s
+              AND index_name <> 'PRIMARY'
+            ORDER BY index_name, seq_in_index
+            """,
+            [table],
+        )
+        rows = cursor.fetchall()
+
+    indexes = {}
+    for name, non_unique, index_type, column, expression, sub_part, collation in rows:
+        if column is None:
+            part = f"({expression})"
+        else:
+            part = f"`{column}`" + (f"({sub_part})" if sub_part else "")
+        if collation == "D":
+            part += " DESC"
+        spec = indexes.setdefault(
+            name, {"non_unique": non_unique, "index_type": index_type, "parts": []}
+        )
+        spec["parts"].append(part)
+
+    statements = []
+    for name, spec in indexes.items():
+        kind = ""
+        if spec["index_type"] in ("FULLTEXT", "SPATIAL"):
+            kind = spec["index_type"] + " "
+        elif not spec["non_unique"]:
+            kind = "UNIQUE "
+        statements.append(
+            (
+                name,
+                f"CREATE {kind}INDEX `{name}` ON {table} ({', '.join(spec['parts'])})",
+            )
+        )
+    return statements
+
+
+def defer_indexes(table="test_data"):
+    deferred = secondary_indexes(table)
+    with connection.cursor() as cursor:
+        for name, _ in deferred:
+            console.print(f"[yellow]Deferring index {name}[/yellow]")
+            cursor.execute(f"DROP INDEX `{name}` ON {table}")
+    return deferred
+
+
+def restore_indexes(deferred):
+    with connection.cursor() as cursor:
+        for name, statement in deferred:
+            console.print(f"[bold]Rebuilding index {name}...[/bold]")
+            cursor.execute(statement)
+
+
+# price is DECIMAL(10, 2) and rating has one decimal place, so the product is
+# exact at three places; a FLOAT would round it.
+PRICE_RATING_CACHE_TYPE = "DECIMAL(12, 3)"
+PRICE_RATING_CACHE = (
+    f"ADD COLUMN price_rating_cache {PRICE_RATING_CACHE_TYPE} "
+    "GENERATED ALWAYS AS (price * rating) STORED"
+)
+
+
+def has_column(cursor, table, column):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        [table, column],
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def analyze_table(table="test_data"):
+    # information_schema sizes and the optimizer's row estimates come from
+    # the persistent statistics, which lag behind bulk loads and rebuilds
+    # until the table is analyzed.
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+
+
+def optimize_schema(online=False, **online_options):
+    if online:
+        console.print(
+            "[bold]Altering table online for InnoDB and cache columns...[/bold]"
+        )
+        steps = ["ENGINE=InnoDB", PRICE_RATING_CACHE]
+        pending = pending_change("test_data")
+        if pending is not None and pending not in steps:
+            raise RuntimeError(
+                f"An unfinished online change of test_data ({pending!r}) from "
+                "another command is pending; rerun that command to finish it"
+            )
+        # A rerun resumes the step an interrupted shadow copy left pending and
+        # skips the ones before it, which had already finished.
+        if pending is not None:
+            steps = steps[steps.index(pending) :]
+        for clause in steps:
+            if clause == PRICE_RATING_CACHE and clause != pending:
+                with connection.cursor() as cursor:
+                    if has_column(cursor, "test_data", "price_rating_cache"):
+                        continue
+            online_alter("test_data", clause, **online_options)
+        console.print("[green]Schema optimization done.[/green]")
+        return
+
     with connection.cursor() as cursor:
         console.print("[bold]Altering table for InnoDB and cache columns...[/bold]")
         cursor.execute("ALTER TABLE test_data ENGINE=InnoDB;")
         try:
-            cursor.execute("""
-                ALTER TABLE test_data ADD COLUMN price_rating_cache FLOAT
-                GENERATED ALWAYS AS (price * rating) STORED;
-            """)
+            cursor.execute(f"ALTER TABLE test_data {PRICE_RATING_CACHE};")
         except Exception as e:
             if "Duplicate column" in str(e):
                 pass
         console.print("[green]Schema optimization done.[/green]")
 
 
-def run_benchmarks():
-    queries = [
-        {
-            "label": "Complex Query 1",
-            "sql": """
-                SELECT product_name, city, state, platform, device_type, AVG(price) AS avg_price
-                FROM test_data
-                WHERE price > 500 AND rating > 3 AND is_new_customer = TRUE AND status = 'delivered'
-                GROUP BY product_name, city, state, platform, device_type
-                ORDER BY avg_price DESC
-                LIMIT 20;
-            """,
-        },
-        {
-            "label": "Complex Query 2",
-            "sql": """
-                SELECT td1.product_name, td1.city, td1.price
-                FROM test_data td1
-                WHERE td1.price = (
-                    SELECT MAX(td2.price) FROM test_data td2 WHERE td2.city = td1.city
-                ) AND td1.rating >= 4
-                LIMIT 20;
-            """,
-        },
-    ]
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    rank = (len(sorted_samples) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (
+        sorted_samples[upper] - sorted_samples[lower]
+    ) * (rank - lower)
 
-    table = Table(title="Benchmark Results")
-    table.add_column("Query")
-    table.add_column("Execution Time (ms)")
 
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "min_ms": round(ordered[0], 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "stddev_ms": round(statistics.pstdev(ordered), 3) if ordered else 0.0,
+    }
+
+
+# Share of the cached pages that may survive a cold-run eviction.
+EVICTION_TOLERANCE = 0.05
+
+
+def _status_value(cursor, name):
+    cursor.execute("SHOW GLOBAL STATUS LIKE %s", [name])
+    row = cursor.fetchone()
+    return row[1] if row else None
+
+
+def _wait_for_buffer_pool_resize(cursor, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.2)
+        code = _status_value(cursor, "Innodb_buffer_pool_resize_status_code")
+        if code is not None:
+            if code == "0":
+                return
+        else:
+            status = _status_value(cursor, "Innodb_buffer_pool_resize_status") or ""
+            if not status or "Completed" in status:
+                return
+    console.print("[red]Warning:[/red] Timed out waiting for buffer pool resize")
+
+
+def evict_buffer_pool():
+    # InnoDB has no "drop caches" statement; shrinking the buffer pool to its
+    # minimum and growing it back discards the pages that don't fit. InnoDB
+    # rounds the size up to one chunk per instance, which on a small pool (or
+    # one with many instances) is everything, so the cached page count is
+    # checked rather than trusting the resize.
     with connection.cursor() as cursor:
-        for q in queries:
-            start = time.time()
-            cursor.execute(q["sql"])
-            cursor.fetchall()
-            duration = round((time.time() - start) * 1000, 2)
-            table.add_row(q["label"], str(duration))
+        cursor.execute(
+            "SELECT @@GLOBAL.innodb_buffer_pool_size, "
+            "@@GLOBAL.innodb_buffer_pool_chunk_size, "
+            "@@GLOBAL.innodb_buffer_pool_instances"
+        )
+        size, chunk_size, instances = cursor.fetchone()
+        before = int(_status_value(cursor, "Innodb_buffer_pool_pages_data") or 0)
+        try:
+            cursor.execute(
+                f"SET GLOBAL innodb_buffer_pool_size = {chunk_size * instances}"
+            )
+            _wait_for_buffer_pool_resize(cursor)
+            kept = int(_status_value(cursor, "Innodb_buffer_pool_pages_data") or 0)
+            cursor.execute(f"SET GLOBAL innodb_buffer_pool_size = {size}")
+            _wait_for_buffer_pool_resize(cursor)
+        except Exception as e:
+            raise RuntimeError(
+                f"Couldn't evict the buffer pool for a cold run — {e}"
+            ) from e
+    if before and kept > before * EVICTION_TOLERANCE:
+        raise RuntimeError(
+            f"Evicting the buffer pool kept {kept:,} of {before:,} pages: "
+            f"its minimum size ({chunk_size * instances / 1024 / 1024:.0f} MB, "
+            f"{instances} × innodb_buffer_pool_chunk_size) holds the data, so "
+            "cold runs would be warm. Lower innodb_buffer_pool_chunk_size or "
+            "innodb_buffer_pool_instances, or use --cache warm."
+        )
+
+
+def time_query(cursor, sql, fetch="buffered"):
+    # "sscursor" streams rows from the server instead of buffering the whole
+    # result client-side first.
+    if fetch == "sscursor":
+        return time_streamed(sql)
+    start = time.perf_counter_ns()
+    cursor.execute(sql)
+    cursor.fetchall()
+    return (time.perf_counter_ns() - start) / 1_000_000
+
+
+def run_benchmarks(
+    title="Benchmark Results",
+    workload="default",
+    warmup=1,
+    iterations=5,
+    cache="warm",
+    explain=False,
+    analyze=False,
+    trace=False,
+    show=True,
+    fetch="buffered",
+    collectors=None,
+):
+    # collectors names registered metrics collectors (benchmark/metrics.py);
+    # None means the defaults, [] turns counter collection off.
+    results = []
+
+    with connection.cursor() as cursor:
+        collectors, overhead = prepare_collectors(cursor, collectors)
+        for q in get_workload(workload)["queries"]:
+            # Cold runs measure the query against an empty buffer pool, so
+            # warmups would defeat the purpose.
+            for _ in range(warmup if cache == "warm" else 0):
+                time_query(cursor, q["sql"], fetch)
+
+            samples = []
+            totals = {}
+            for _ in range(iterations):
+                if cache == "cold":
+                    evict_buffer_pool()
+                elapsed, deltas = measure(
+                    cursor, collectors, lambda: time_query(cursor, q["sql"], fetch)
+                )
+                samples.append(elapsed)
+                for key, value in corrected(collectors, deltas, overhead).items():
+                    totals[key] = totals.get(key, 0) + value
+            requests = totals.get("Innodb_buffer_pool_read_requests", 0)
+            disk_reads = totals.get("Innodb_buffer_pool_reads", 0)
+
+            result = {
+                "label": q["label"],
+                "workload": workload,
+                "weight": q["weight"],
+                "cache": cache,
+                "fetch": fetch,
+                "warmup": warmup,
+                "iterations": iterations,
+                "samples_ms": [round(sample, 3) for sample in samples],
+                **summarize(samples),
+                "buffer_pool_read_requests": requests,
+                "buffer_pool_disk_reads": disk_reads,
+                "buffer_pool_hit_ratio": (
+                    round(1 - disk_reads / requests, 4) if requests else None
+                ),
+                # Means per measured run.
+                "counters": {
+                    key: round(total / iterations, 1) for key, total in totals.items()
+                },
+            }
+            # Plans are captured after timing so EXPLAIN never warms the
+            # buffer pool for a measured run.
+            if explain or analyze or trace:
+                result["plan"] = capture_plan(cursor, q["sql"], analyze, trace)
+            results.append(result)
+
+    if not show:
+        return results
+
+    table = Table(title=f"{title} ({cache} cache, {fetch}, {iterations} runs)")
+    table.add_column("Query")
+    for column in ["Min", "p50", "p95", "p99", "Stddev"]:
+        table.add_column(f"{column} (ms)", justify="right")
+    table.add_column("BP hit ratio", justify="right")
+    for r in results:
+        table.add_row(
+            r["label"],
+            *(
+                str(r[key])
+                for key in ["min_ms", "p50_ms", "p95_ms", "p99_ms", "stddev_ms"]
+            ),
+            str(r["buffer_pool_hit_ratio"]),
+        )
+
+    console.print(table)
+    print_counters(results, f"{title}: server counters per run")
+    return results
+
+
+def compare_results(before, after, names=("Before", "After")):
+    table = Table(title=f"{names[0]} vs {names[1]} (p50)")
+    table.add_column("Query")
+    table.add_column(f"{names[0]} p50 (ms)", justify="right")
+    table.add_column(f"{names[1]} p50 (ms)", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_column("BP hit ratio", justify="right")
+
+    after_by_label = {r["label"]: r for r in after}
+    for b in before:
+        a = after_by_label.get(b["label"])
+        if a is None:
+            continue
+        speedup = b["p50_ms"] / a["p50_ms"] if a["p50_ms"] else float("inf")
+        table.add_row(
+            b["label"],
+            str(b["p50_ms"]),
+            str(a["p50_ms"]),
+            f"{speedup:.2f}x",
+            f"{b['buffer_pool_hit_ratio']} -> {a['buffer_pool_hit_ratio']}",
+        )
 
     console.print(table)
+
+
+def run_matrix(workloads, on_result=None, **bench_options):
+    # on_result(workload, index_set, results) runs while the index set is
+    # still in place.
+    matrix = {}
+    for workload in workloads:
+        spec = get_workload(workload)
+        matrix[workload] = {}
+        for index_set in spec["index_sets"]:
+            console.rule(f"[bold blue]{workload} × {index_set}")
+            drop_indexes()
+            try:
+                setup_indexes(index_set)
+                matrix[workload][index_set] = run_benchmarks(
+                    f"{workload} × {index_set}", workload, **bench_options
+                )
+                if on_result is not None:
+                    on_result(workload, index_set, matrix[workload][index_set])
+            except DatabaseError as e:
+                # Optional layouts (split, partitioned) may not exist yet.
+                console.print(f"[red]Warning:[/red] Skipping {workload} — {e}")
+                break
+        if len(matrix[workload]) < len(spec["index_sets"]):
+            continue
+
+        table = Table(title=f"Workload {workload}: p50 (ms) per index set")
+        table.add_column("Query")
+        for index_set in spec["index_sets"]:
+            table.add_column(index_set, justify="right")
+        for i, q in enumerate(spec["queries"]):
+            table.add_row(
+                q["label"],
+                *(
+                    str(matrix[workload][index_set][i]["p50_ms"])
+                    for index_set in spec["index_sets"]
+                ),
+            )
+        console.print(table)
+
+    drop_indexes()
+    return matrix
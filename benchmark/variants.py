@@ -0,0 +1,218 @@
+import hashlib
+import time
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F, Max, OuterRef, Subquery, Window
+from rich.console import Console
+from rich.table import Table
+
+from benchmark.metrics import has_statement_memory, last_statement_stats
+from benchmark.models import TestData
+from benchmark.utils import summarize
+
+console = Console()
+
+VARIANT_SETS = {}
+
+
+def register_variants(name, variants):
+    # Each variant is {"label"} plus either "sql" or "queryset". Querysets
+    # should use values_list() so their rows compare with raw SQL tuples.
+    VARIANT_SETS[name] = list(variants)
+
+
+def get_variants(name):
+    try:
+        return VARIANT_SETS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown variant set {name!r}; choose from {sorted(VARIANT_SETS)}"
+        )
+
+
+def _canonical(value):
+    # Raw cursors and the ORM may return the same number as int, float or
+    # Decimal, so numbers are compared at a fixed precision.
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"{float(value):.6f}"
+    return str(value)
+
+
+def checksum(rows):
+    # Row hashes are summed rather than XORed so duplicate rows still count;
+    # the sum doesn't depend on row order.
+    total = 0
+    for row in rows:
+        digest = hashlib.sha1(
+            "\x1f".join(_canonical(v) for v in row).encode("utf-8")
+        ).digest()
+        total = (total + int.from_bytes(digest[:8], "big")) % (1 << 64)
+    return f"{total:016x}"
+
+
+def _execute(cursor, variant):
+    if "queryset" in variant:
+        return list(variant["queryset"].all())
+    cursor.execute(variant["sql"])
+    return cursor.fetchall()
+
+
+def _timed(cursor, variant):
+    start = time.perf_counter_ns()
+    rows = _execute(cursor, variant)
+    return (time.perf_counter_ns() - start) / 1_000_000, rows
+
+
+def run_variants(name, warmup=1, iterations=5):
+    variants = get_variants(name)
+    results = []
+    with connection.cursor() as cursor:
+        with_memory = has_statement_memory(cursor)
+        for variant in variants:
+            try:
+                for _ in range(warmup):
+                    _execute(cursor, variant)
+                samples = []
+                for _ in range(iterations):
+                    elapsed, rows = _timed(cursor, variant)
+                    samples.append(elapsed)
+                stats = last_statement_stats(cursor, with_memory)
+            except Exception as e:
+                # LATERAL needs MySQL 8.0.14; an unsupported variant is
+                # reported, not fatal.
+                console.print(
+                    f"[red]Warning:[/red] Variant {variant['label']} failed — {e}"
+                )
+                continue
+            results.append(
+                {
+                    "label": variant["label"],
+                    "kind": "orm" if "queryset" in variant else "sql",
+                    "rows": len(rows),
+                    "checksum": checksum(rows),
+                    "samples_ms": [round(sample, 3) for sample in samples],
+                    **summarize(samples),
+                    **stats,
+                }
+            )
+
+    if results:
+        reference = results[0]["checksum"]
+        for r in results:
+            r["equivalent"] = r["checksum"] == reference
+    print_variants(name, results)
+    return results
+
+
+def print_variants(name, results):
+    table = Table(title=f"Variants of {name}, fastest first")
+    table.add_column("#", justify="right")
+    table.add_column("Variant")
+    for column in ["p50 (ms)", "p95 (ms)", "Rows", "Rows examined", "Memory (KB)"]:
+        table.add_column(column, justify="right")
+    table.add_column("Checksum")
+    ranked = sorted(results, key=lambda r: (r["p50_ms"], r.get("rows_examined") or 0))
+    for position, r in enumerate(ranked, 1):
+        memory = r.get("memory_bytes")
+        table.add_row(
+            str(position),
+            f"{r['label']} ({r['kind']})",
+            str(r["p50_ms"]),
+            str(r["p95_ms"]),
+            str(r["rows"]),
+            str(r.get("rows_examined", "-")),
+            f"{memory / 1024:.0f}" if memory is not None else "-",
+            r["checksum"] if r["equivalent"] else f"[red]{r['checksum']} ≠[/red]",
+        )
+    console.print(table)
+
+    different = [r["label"] for r in results if not r["equivalent"]]
+    if different:
+        console.print(
+            f"[red]Warning:[/red] Results differ from {results[0]['label']}: "
+            f"{', '.join(different)}"
+        )
+    elif results:
+        console.print("[green]All variants return the same result set.[/green]")
+
+
+# Complex Query 2 without its LIMIT: a LIMIT without ORDER BY picks arbitrary
+# rows, so only the full result set can be compared across rewrites.
+register_variants(
+    "complex_query_2",
+    [
+        {
+            "label": "Correlated subquery",
+            "sql": """
+                SELECT td1.product_name, td1.city, td1.price
+                FROM test_data td1
+                WHERE td1.price = (
+                    SELECT MAX(td2.price) FROM test_data td2 WHERE td2.city = td1.city
+                ) AND td1.rating >= 4
+            """,
+        },
+        {
+            "label": "Window function",
+            "sql": """
+                SELECT product_name, city, price
+                FROM (
+                    SELECT product_name, city, price, rating,
+                           MAX(price) OVER (PARTITION BY city) AS city_max
+                    FROM test_data
+                ) ranked
+                WHERE price = city_max AND rating >= 4
+            """,
+        },
+        {
+            "label": "Derived-table join",
+            "sql": """
+                SELECT td.product_name, td.city, td.price
+                FROM test_data td
+                JOIN (
+                    SELECT city, MAX(price) AS max_price FROM test_data GROUP BY city
+                ) city_max ON city_max.city = td.city AND td.price = city_max.max_price
+                WHERE td.rating >= 4
+            """,
+        },
+        {
+            "label": "LATERAL join",
+            "sql": """
+                SELECT td.product_name, td.city, td.price
+                FROM test_data td
+                JOIN LATERAL (
+                    SELECT MAX(td2.price) AS max_price
+                    FROM test_data td2 WHERE td2.city = td.city
+                ) city_max ON td.price = city_max.max_price
+                WHERE td.rating >= 4
+            """,
+        },
+        {
+            "label": "ORM Subquery",
+            "queryset": TestData.objects.filter(
+                rating__gte=4,
+                price=Subquery(
+                    TestData.objects.filter(city=OuterRef("city"))
+                    .order_by()
+                    .values("city")
+                    .annotate(max_price=Max("price"))
+                    .values("max_price")
+                ),
+            ).values_list("product_name", "city", "price"),
+        },
+        {
+            "label": "ORM Window",
+            # Django evaluates plain filters below the window, which would take
+            # MAX over highly rated rows only, so the rating filter is applied
+            # outside the windowed subquery.
+            "queryset": TestData.objects.filter(
+                rating__gte=4,
+                pk__in=TestData.objects.annotate(
+                    city_max=Window(Max("price"), partition_by=[F("city")])
+                )
+                .filter(price=F("city_max"))
+                .values("pk"),
+            ).values_list("product_name", "city", "price"),
+        },
+    ],
+)
@@ -0,0 +1,161 @@
+from string import ascii_letters
+
+import numpy as np
+from faker import Faker
+
+from benchmark.datagen import COLUMNS
+
+BATCH_SIZE = 10000
+POOL_SIZE = 5000
+
+VOCABULARIES = {
+    "status": ["pending", "shipped", "delivered", "returned"],
+    "platform": ["web", "mobile", "app"],
+    "device_type": ["desktop", "tablet", "phone"],
+    "shipping_method": ["standard", "express", "overnight"],
+    "payment_method": ["credit_card", "paypal", "cash"],
+    "gift_wrap": ["yes", "no"],
+    "browser": ["Chrome", "Firefox", "Safari", "Edge"],
+    "os": ["Windows", "Linux", "macOS", "Android", "iOS"],
+    "membership_level": ["Bronze", "Silver", "Gold", "Platinum"],
+    "education_level": ["High School", "Bachelors", "Masters", "PhD"],
+    "income_range": ["<20K", "20K-50K", "50K-100K", ">100K"],
+    "marital_status": ["Single", "Married", "Divorced"],
+    "preferred_language": ["English", "Spanish", "French", "Mandarin"],
+}
+
+# Inclusive integer ranges, matching the Faker engine.
+INT_RANGES = {
+    "user_id": (1, 10000),
+    "product_id": (1, 100000),
+    "category_id": (1, 50),
+    "quantity": (1, 10),
+    "order_date": (1600000000, 1700000000),
+    "delivery_date": (1600000000, 1700000000),
+    "country_id": (1, 200),
+    "warehouse_id": (1, 50),
+    "batch_number": (1, 100),
+    "supplier_id": (1, 5000),
+    "shipment_id": (1, 10000),
+    "carrier_id": (1, 300),
+    "os_version": (1, 15),
+    "page_views": (1, 5000),
+    "clicks": (1, 1000),
+    "impressions": (1, 10000),
+    "loyalty_points": (0, 1000),
+    "age": (18, 75),
+}
+
+# (low, high, decimals) for uniformly drawn floats.
+FLOAT_RANGES = {
+    "discount": (0, 0.3, 2),
+    "tax": (0, 0.2, 2),
+    "rating": (1, 5, 1),
+    "latitude": (-90, 90, 6),
+    "longitude": (-180, 180, 6),
+    "conversion_rate": (0, 1, 3),
+    "avg_order_value": (10, 1000, 2),
+    "lifetime_value": (100, 10000, 2),
+}
+
+# Columns whose values come from expensive Faker providers are sampled from a
+# pool generated once per seed instead of being created for every row.
+TEXT_POOLS = {
+    "product_name": "word",
+    "city": "city",
+    "state": "state",
+    "email": "email",
+    "phone": "phone",
+    "customer_name": "name",
+    "shipping_address": "address",
+    "billing_address": "address",
+    "notes": "notes",
+    "user_agent": "user_agent",
+    "timezone": "timezone",
+    "campaign_name": "word",
+    "referral_source": "word",
+    "occupation": "job",
+    "custom_field_1": "word",
+    "custom_field_2": "word",
+    "custom_field_3": "word",
+    "custom_field_4": "word",
+}
+
+_pools = {}
+
+
+def text_pools(seed):
+    if seed not in _pools:
+        fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
+        providers = {
+            "word": fake.word,
+            "city": fake.city,
+            "state": fake.state,
+            "email": fake.email,
+            "phone": fake.phone_number,
+            "name": fake.name,
+            "address": lambda: fake.address().replace("\n", ", "),
+            "notes": lambda: fake.text(max_nb_chars=50),
+            "user_agent": fake.user_agent,
+            "timezone": fake.timezone,
+            "job": fake.job,
+        }
+        _pools[seed] = {
+            name: np.array([provider() for _ in range(POOL_SIZE)], dtype=object)
+            for name, provider in providers.items()
+        }
+    return _pools[seed]
+
+
+def _codes(rng, size, prefix, letters, digits):
+    letter_idx = rng.integers(0, len(ascii_letters), size=(size, letters))
+    numbers = rng.integers(0, 10**digits, size=size)
+    return [
+        prefix + "".join(ascii_letters[i] for i in idx) + f"{number:0{digits}d}"
+        for idx, number in zip(letter_idx.tolist(), numbers.tolist())
+    ]
+
+
+def generate_batch(rng, pools, start, size):
+    columns = {"order_id": np.arange(start, start + size).tolist()}
+
+    for name, (low, high) in INT_RANGES.items():
+        columns[name] = rng.integers(low, high + 1, size=size).tolist()
+
+    for name, (low, high, decimals) in FLOAT_RANGES.items():
+        columns[name] = np.round(rng.uniform(low, high, size=size), decimals).tolist()
+
+    for name, vocabulary in VOCABULARIES.items():
+        columns[name] = np.array(vocabulary, dtype=object)[
+            rng.integers(0, len(vocabulary), size=size)
+        ].tolist()
+
+    for name, pool in TEXT_POOLS.items():
+        columns[name] = pools[pool][rng.integers(0, POOL_SIZE, size=size)].tolist()
+
+    columns["price"] = np.round(
+        rng.integers(0, 1000, size=size) + rng.random(size=size), 2
+    ).tolist()
+    columns["is_returned"] = (rng.random(size=size) < 0.1).tolist()
+    columns["is_new_customer"] = (rng.random(size=size) < 0.3).tolist()
+    columns["coupon_code"] = _codes(rng, size, "", 3, 3)
+    columns["invoice_number"] = _codes(rng, size, "INV", 0, 7)
+    columns["tracking_number"] = _codes(rng, size, "TRK", 0, 6)
+    columns["session_id"] = [
+        f"{value:08x}" for value in rng.integers(0, 2**32, size=size).tolist()
+    ]
+    octets = rng.integers(0, 256, size=(size, 4)).tolist()
+    columns["ip_address"] = [".".join(map(str, octet)) for octet in octets]
+
+    return columns
+
+
+def generate_rows(start, end, seed, batch_size=BATCH_SIZE):
+    rng = np.random.default_rng(None if seed is None else [seed, start])
+    pools = text_pools(seed)
+    for batch_start in range(start, end, batch_size):
+        size = min(batch_size, end - batch_start)
+        columns = generate_batch(rng, pools, batch_start, size)
+        yield from zip(*(columns[column] for column in COLUMNS))
@@ -1,3 +1,81 @@
-from django.shortcuts import render
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your views here.
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import Http404, JsonResponse
+from django.utils.text import slugify
+
+from benchmark.workloads import WORKLOADS
+
+# Database calls from the async views run on this bounded pool, so at most
+# QUERY_API_THREADS queries (and connections) are in flight per process.
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "QUERY_API_THREADS", 8),
+    thread_name_prefix="query-api",
+)
+
+
+def _find_query(workload, query):
+    spec = WORKLOADS.get(workload)
+    if spec is None:
+        raise Http404(f"Unknown workload {workload!r}")
+    for q in spec["queries"]:
+        if slugify(q["label"]) == query:
+            return q
+    raise Http404(f"Unknown query {query!r} in workload {workload!r}")
+
+
+def run_query(sql):
+    # Executor threads outlive requests, so they honour CONN_MAX_AGE and the
+    # health checks the way a request thread would.
+    close_old_connections()
+    try:
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        close_old_connections()
+    return {
+        "columns": columns,
+        "rows": [list(row) for row in rows],
+        "db_ms": round(elapsed_ms, 3),
+    }
+
+
+def _response(workload, q, result):
+    return JsonResponse({"workload": workload, "label": q["label"], **result})
+
+
+def workloads(request):
+    return JsonResponse(
+        {
+            name: [
+                {
+                    "label": q["label"],
+                    "weight": q["weight"],
+                    "url": f"/api/{name}/{slugify(q['label'])}/",
+                }
+                for q in spec["queries"]
+            ]
+            for name, spec in WORKLOADS.items()
+        }
+    )
+
+
+async def workload_query(request, workload, query):
+    q = _find_query(workload, query)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(executor, run_query, q["sql"])
+    return _response(workload, q, result)
+
+
+# The same endpoint as a plain sync view, which is what a WSGI server runs
+# without an event loop in the way.
+def workload_query_sync(request, workload, query):
+    q = _find_query(workload, query)
+    return _response(workload, q, run_query(q["sql"]))
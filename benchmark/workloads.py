@@ -0,0 +1,258 @@
+WORKLOADS = {}
+INDEX_SETS = {}
+
+
+def register_index_set(name, indexes):
+    # Each index is {"name", "columns"} plus an optional "table" (default
+    # test_data). Columns may be plain names or functional key parts such as
+    # "(ROUND(price, 0))".
+    INDEX_SETS[name] = [{"table": "test_data", **index} for index in indexes]
+
+
+def register_workload(name, queries, index_sets):
+    unknown = [s for s in index_sets if s not in INDEX_SETS]
+    if unknown:
+        raise ValueError(f"Workload {name!r} uses unknown index sets: {unknown}")
+    WORKLOADS[name] = {
+        "queries": [{"weight": 1, **query} for query in queries],
+        "index_sets": list(index_sets),
+    }
+
+
+def get_workload(name):
+    try:
+        return WORKLOADS[name]
+    except KeyError:
+        raise ValueError(f"Unknown workload {name!r}; choose from {sorted(WORKLOADS)}")
+
+
+def workload_tables(name):
+    # cache imports this module, hence the late import.
+    from benchmark.cache import tables_in
+
+    tables = set()
+    for query in get_workload(name)["queries"]:
+        tables.update(tables_in(query["sql"]))
+    return sorted(tables)
+
+
+def get_index_set(name):
+    try:
+        return INDEX_SETS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown index set {name!r}; choose from {sorted(INDEX_SETS)}"
+        )
+
+
+def time_window_queries(table):
+    # Windows end at the newest generated order_date (1700000000), the way a
+    # dashboard looks at the most recent days of orders.
+    return [
+        {
+            "label": "Daily Revenue (30d)",
+            "weight": 3,
+            "sql": f"""
+                SELECT FLOOR(order_date / 86400) AS day, COUNT(*) AS orders,
+                       SUM(price * quantity) AS revenue
+                FROM {table}
+                WHERE order_date >= 1697408000 AND order_date < 1700000000
+                GROUP BY day
+                ORDER BY day;
+            """,
+        },
+        {
+            "label": "Status by Platform (7d)",
+            "weight": 2,
+            "sql": f"""
+                SELECT status, platform, COUNT(*) AS orders, AVG(rating) AS avg_rating
+                FROM {table}
+                WHERE order_date BETWEEN 1699395200 AND 1700000000
+                GROUP BY status, platform;
+            """,
+        },
+        {
+            "label": "Top Cities (90d)",
+            "weight": 1,
+            "sql": f"""
+                SELECT city, SUM(price * quantity) AS revenue
+                FROM {table}
+                WHERE order_date >= 1692224000 AND rating >= 4
+                GROUP BY city
+                ORDER BY revenue DESC
+                LIMIT 20;
+            """,
+        },
+    ]
+
+
+def create_index_sql(index):
+    return (
+        f"CREATE INDEX {index['name']} ON {index['table']} "
+        f"({', '.join(index['columns'])})"
+    )
+
+
+register_index_set("none", [])
+
+register_index_set(
+    "baseline",
+    [
+        {
+            "name": "idx_q1_composite",
+            "columns": [
+                "price",
+                "rating",
+                "is_new_customer",
+                "status",
+                "product_name",
+                "city",
+                "state",
+                "platform",
+                "device_type",
+            ],
+        },
+        {"name": "idx_q2_city_price", "columns": ["city", "price"]},
+        {"name": "idx_rating", "columns": ["rating"]},
+    ],
+)
+
+register_workload(
+    "default",
+    queries=[
+        {
+            "label": "Complex Query 1",
+            "weight": 1,
+            "sql": """
+                SELECT product_name, city, state, platform, device_type, AVG(price) AS avg_price
+                FROM test_data
+                WHERE price > 500 AND rating > 3 AND is_new_customer = TRUE AND status = 'delivered'
+                GROUP BY product_name, city, state, platform, device_type
+                ORDER BY avg_price DESC
+                LIMIT 20;
+            """,
+        },
+        {
+            "label": "Complex Query 2",
+            "weight": 1,
+            "sql": """
+                SELECT td1.product_name, td1.city, td1.price
+                FROM test_data td1
+                WHERE td1.price = (
+                    SELECT MAX(td2.price) FROM test_data td2 WHERE td2.city = td1.city
+                ) AND td1.rating >= 4
+                LIMIT 20;
+            """,
+        },
+    ],
+    index_sets=["none", "baseline"],
+)
+
+register_index_set(
+    "split_baseline",
+    [
+        {
+            "name": "idx_hot_q1_composite",
+            "table": "test_data_hot",
+            "columns": [
+                "price",
+                "rating",
+                "is_new_customer",
+                "status",
+                "product_name",
+                "city",
+                "state",
+                "platform",
+                "device_type",
+            ],
+        },
+        {
+            "name": "idx_hot_q2_city_price",
+            "table": "test_data_hot",
+            "columns": ["city", "price"],
+        },
+        {"name": "idx_hot_rating", "table": "test_data_hot", "columns": ["rating"]},
+    ],
+)
+
+# The default workload against the narrow hot table of the split layout. The
+# labels match the default workload so results can be compared side by side.
+register_workload(
+    "split",
+    queries=[
+        {
+            "label": "Complex Query 1",
+            "weight": 1,
+            "sql": """
+                SELECT product_name, city, state, platform, device_type, AVG(price) AS avg_price
+                FROM test_data_hot
+                WHERE price > 500 AND rating > 3 AND is_new_customer = TRUE AND status = 'delivered'
+                GROUP BY product_name, city, state, platform, device_type
+                ORDER BY avg_price DESC
+                LIMIT 20;
+            """,
+        },
+        {
+            "label": "Complex Query 2",
+            "weight": 1,
+            "sql": """
+                SELECT td1.product_name, td1.city, td1.price
+                FROM test_data_hot td1
+                WHERE td1.price = (
+                    SELECT MAX(td2.price) FROM test_data_hot td2 WHERE td2.city = td1.city
+                ) AND td1.rating >= 4
+                LIMIT 20;
+            """,
+        },
+    ],
+    index_sets=["none", "split_baseline"],
+)
+
+register_index_set(
+    "order_date",
+    [{"name": "idx_order_date", "columns": ["order_date"]}],
+)
+
+register_index_set(
+    "partitioned_order_date",
+    [
+        {
+            "name": "idx_part_order_date",
+            "table": "test_data_partitioned",
+            "columns": ["order_date"],
+        }
+    ],
+)
+
+register_workload(
+    "time_window",
+    queries=time_window_queries("test_data"),
+    index_sets=["none", "order_date"],
+)
+
+# The same windows against test_data RANGE-partitioned by order_date (see
+# benchmark/partitioning.py), where pruning can skip most partitions.
+register_workload(
+    "time_window_partitioned",
+    queries=time_window_queries("test_data_partitioned"),
+    index_sets=["none", "partitioned_order_date"],
+)
+
+# Complex Query 1 answered from the incrementally maintained summary table
+# (see benchmark/summary.py); AVG is derived from the stored SUM and COUNT.
+register_workload(
+    "summary",
+    queries=[
+        {
+            "label": "Complex Query 1",
+            "sql": """
+                SELECT product_name, city, state, platform, device_type,
+                       price_sum / row_count AS avg_price
+                FROM test_data_q1_summary
+                ORDER BY avg_price DESC
+                LIMIT 20;
+            """,
+        },
+    ],
+    index_sets=["none"],
+)
@@ -0,0 +1,187 @@
+import random
+import time
+
+from django.db import connection
+from rich.console import Console
+from rich.table import Table
+
+from benchmark.cache import bump_table_version
+from benchmark.datagen import COLUMNS, faker_rows, ip_is_packed, pack_ips
+from benchmark.utils import summarize
+
+console = Console()
+
+# Each update changes the column on every run; InnoDB skips rows whose values
+# don't change, which would leave the indexes untouched.
+UPDATES = {
+    "Update price": "UPDATE test_data SET price = price + 1 WHERE order_id = %s",
+    "Update rating": (
+        "UPDATE test_data SET rating = IF(rating >= 4.5, rating - 3, rating + 0.5) "
+        "WHERE order_id = %s"
+    ),
+    "Update status": (
+        "UPDATE test_data SET status = "
+        "IF(status = 'delivered', 'returned', 'delivered') WHERE order_id = %s"
+    ),
+}
+
+
+def write_counters(cursor):
+    cursor.execute(
+        "SHOW GLOBAL STATUS WHERE variable_name IN "
+        "('Innodb_os_log_written', 'Innodb_data_written')"
+    )
+    counters = {name: int(value) for name, value in cursor.fetchall()}
+    # Unpurged undo logs; purge runs concurrently, so this is a lower bound.
+    cursor.execute(
+        "SELECT count FROM information_schema.innodb_metrics "
+        "WHERE name = 'trx_rseg_history_len'"
+    )
+    row = cursor.fetchone()
+    counters["undo_history_len"] = int(row[0]) if row else 0
+    return counters
+
+
+def _measure(cursor, label, statements):
+    before = write_counters(cursor)
+    samples = []
+    rows = 0
+    started = time.perf_counter()
+    for sql, params, many in statements:
+        start = time.perf_counter_ns()
+        if many:
+            cursor.executemany(sql, params)
+        else:
+            cursor.execute(sql, params)
+        samples.append((time.perf_counter_ns() - start) / 1_000_000)
+        rows += cursor.rowcount
+    elapsed = time.perf_counter() - started
+    after = write_counters(cursor)
+
+    redo = after["Innodb_os_log_written"] - before["Innodb_os_log_written"]
+    return {
+        "label": label,
+        "statements": len(samples),
+        "rows": rows,
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+        "samples_ms": [round(sample, 3) for sample in samples],
+        **summarize(samples),
+        "redo_bytes": redo,
+        "redo_bytes_per_row": round(redo / rows, 1) if rows else 0.0,
+        "data_written_bytes": (
+            after["Innodb_data_written"] - before["Innodb_data_written"]
+        ),
+        "undo_history_delta": after["undo_history_len"] - before["undo_history_len"],
+    }
+
+
+def run_writes(
+    title="Write Benchmark",
+    single_rows=500,
+    batches=20,
+    batch_size=500,
+    updates=500,
+    delete_batch=1000,
+    seed=42,
+    show=True,
+):
+    # Everything happens on scratch rows above the current max order_id, which
+    # the range deletes remove again, so the benchmarked data is unchanged.
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM test_data")
+        first_id = cursor.fetchone()[0] + 1
+        total = single_rows + batches * batch_size
+        rows = faker_rows(first_id, first_id + total, seed)
+        if ip_is_packed(cursor):
+            rows = pack_ips(rows)
+        rows = list(rows)
+        ids = [row[0] for row in rows]
+        rng = random.Random(seed)
+
+        column_list = ", ".join(f"`{column}`" for column in COLUMNS)
+        placeholders = ", ".join(["%s"] * len(COLUMNS))
+        insert = f"INSERT INTO test_data ({column_list}) VALUES ({placeholders})"
+
+        results = [
+            _measure(
+                cursor,
+                "Single-row insert",
+                [(insert, row, False) for row in rows[:single_rows]],
+            ),
+            _measure(
+                cursor,
+                f"Batched insert ({batch_size} rows)",
+                [
+                    (insert, rows[start : start + batch_size], True)
+                    for start in range(single_rows, total, batch_size)
+                ],
+            ),
+        ]
+        for label, sql in UPDATES.items():
+            results.append(
+                _measure(
+                    cursor,
+                    label,
+                    [(sql, [rng.choice(ids)], False) for _ in range(updates)],
+                )
+            )
+        results.append(
+            _measure(
+                cursor,
+                f"Range delete ({delete_batch} rows)",
+                [
+                    (
+                        "DELETE FROM test_data WHERE order_id >= %s AND order_id < %s",
+                        [start, min(start + delete_batch, first_id + total)],
+                        False,
+                    )
+                    for start in range(first_id, first_id + total, delete_batch)
+                ],
+            )
+        )
+    bump_table_version("test_data")
+
+    if show:
+        print_writes(title, results)
+    return results
+
+
+def print_writes(title, results):
+    table = Table(title=title)
+    table.add_column("Operation")
+    for column in ["Rows/sec", "p50 (ms)", "p95 (ms)", "p99 (ms)"]:
+        table.add_column(column, justify="right")
+    table.add_column("Redo (KB)", justify="right")
+    table.add_column("Redo/row (B)", justify="right")
+    table.add_column("Undo history Δ", justify="right")
+    for r in results:
+        table.add_row(
+            r["label"],
+            f"{r['rows_per_sec']:,.0f}",
+            str(r["p50_ms"]),
+            str(r["p95_ms"]),
+            str(r["p99_ms"]),
+            f"{r['redo_bytes'] / 1024:.1f}",
+            str(r["redo_bytes_per_row"]),
+            str(r["undo_history_delta"]),
+        )
+    console.print(table)
+
+
+def compare_writes(runs):
+    # runs maps a configuration name to run_writes() results.
+    names = list(runs)
+    table = Table(title="Write throughput (rows/sec) and redo per row")
+    table.add_column("Operation")
+    for name in names:
+        table.add_column(name, justify="right")
+    for i, r in enumerate(runs[names[0]]):
+        table.add_row(
+            r["label"],
+            *(
+                f"{runs[name][i]['rows_per_sec']:,.0f} "
+                f"({runs[name][i]['redo_bytes_per_row']:.0f} B)"
+                for name in names
+            ),
+        )
+    console.print(table)
@@ -75,7 +75,9 @@ WSGI_APPLICATION = "mysql_optimisation.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        # The stock MySQL backend plus a per-process connection pool; see
+        # benchmark/pooled_mysql. Set "pool" to False to connect per request.
+        "ENGINE": "benchmark.pooled_mysql",
         "NAME": "test_performance",
         "USER": "root",
         "PASSWORD": "root",
@@ -83,11 +85,52 @@ DATABASES = {
         "PORT": "3306",
         "OPTIONS": {
             "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
+            # Required by `generate_data --loader infile` (LOAD DATA LOCAL INFILE).
+            "local_infile": True,
+            "pool": {
+                "max_size": 20,
+                "timeout": 10,
+                "max_lifetime": 1800,
+                "check_after": 30,
+            },
         },
     }
 }
 
 
+# Query result cache
+# "results" is the in-process LRU tier: LocMemCache evicts least-recently-used
+# entries beyond MAX_ENTRIES and expires them after TIMEOUT seconds. Point
+# RESULT_CACHE_SHARED_ALIAS at another alias (e.g. a RedisCache or
+# PyMemcacheCache backend) to add a shared tier across processes. The table
+# version counters live in that tier, or in the _result_cache_versions table
+# without one, so writes from any process invalidate every process's entries.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "results": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "query-results",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000, "CULL_FREQUENCY": 10},
+    },
+}
+
+RESULT_CACHE_ALIAS = "results"
+RESULT_CACHE_SHARED_ALIAS = None
+# Results larger than this (approximate bytes) are returned but never cached.
+RESULT_CACHE_MAX_ENTRY_BYTES = 1024 * 1024
+
+# Threads serving database calls for the async query API (benchmark/views.py).
+QUERY_API_THREADS = 8
+
+# Every benchmark run is appended to this JSON-lines file, and latency trend
+# charts are regenerated from it into BENCHMARK_CHART_DIR.
+BENCHMARK_HISTORY = BASE_DIR / "benchmark_history.jsonl"
+BENCHMARK_CHART_DIR = BASE_DIR / "benchmark_charts"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 